@@ -0,0 +1,64 @@
+"""
+Compares load times of a ticker's history from csv and from SQLite, as suggested in IDEAS.md:
+
+- csv: a DataModel reading the csv with inferred types followed by its cleaning
+- typed csv: a DataModel reading the csv with the fast path, with the columns, dtypes and date format known up front
+- sqlite: the full history from a SQLiteStore
+- sqlite window: a 2 year window pushed down to SQLite as a range query
+
+    python benchmarks/csv_vs_sqlite.py
+"""
+# standard lib
+import os
+import tempfile
+import time
+
+# local
+from swing_trader_env.core.data import DataModel, SQLiteStore
+from synthetic import write_synthetic_csvs
+
+# external
+import pandas as pd
+
+
+N_DAYS = 30 * 252
+REPEATS = 20
+
+
+def best_of(fn, repeats: int = REPEATS) -> float:
+    """Best wall time of several runs, in milliseconds"""
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) * 1e3
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        write_synthetic_csvs(root, "SYN", N_DAYS, freqs=["daily"])
+
+        data = DataModel("SYN", ["daily"], data_path=root, cache=False)
+        store = SQLiteStore(os.path.join(root, "bars.sqlite"))
+        store.ingest_data_model(data)
+
+        end = data.daily.index[-1]
+        start = end - pd.DateOffset(years=2)
+
+        results = {
+            # lazy=False, as models otherwise only read the csv on first access
+            "csv": best_of(lambda: DataModel("SYN", ["daily"], data_path=root, cache=False, lazy=False)),
+            "typed csv": best_of(lambda: DataModel("SYN", ["daily"], data_path=root, cache=False, fast=True, lazy=False)),
+            "sqlite": best_of(lambda: store.load("SYN", "daily")),
+            "sqlite window": best_of(lambda: DataModel.from_sqlite(store, "SYN", ["daily"], start=start, end=end)),
+        }
+        store.close()
+
+    print(f"{N_DAYS} daily bars")
+    for name, ms in results.items():
+        print(f"{name:>14} {ms:>8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Refreshes a universe of tickers from a LocalBarServer standing in for a remote provider with per-request latency,
+showing that the wall time of a refresh is bounded by concurrency rather than by latency:
+sequential requests take about n_tickers * latency, concurrent ones about n_tickers * latency / concurrency
+
+    python benchmarks/data_source.py [n_tickers]
+"""
+# standard lib
+import sys
+import tempfile
+import time
+
+# local
+from swing_trader_env.core.data import HTTPDataSource, LocalBarServer
+
+
+N_TICKERS = 3000
+LATENCY = 0.05  # seconds per request
+N_DAYS = 252  # one year of daily bars per ticker
+
+
+def main(n_tickers: int):
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+
+    with LocalBarServer(latency=LATENCY, error_rate=0.01, n_days=N_DAYS) as server:
+        print(f"{n_tickers} tickers, {LATENCY * 1e3:.0f}ms latency, 1% transient errors")
+        print(f"{'concurrency':>12} {'seconds':>8} {'requests':>9} {'connections':>12}")
+
+        for concurrency in [1, 16, 64, 256]:
+            if concurrency == 1:
+                n = min(n_tickers, 100)  # sequential is extrapolated from a sample
+            else:
+                n = n_tickers
+
+            source = HTTPDataSource(server.url, concurrency=concurrency, backoff=0.05)
+            requests, connections = server.requests, server.connections
+            with tempfile.TemporaryDirectory() as data_path:
+                t0 = time.perf_counter()
+                results = source.refresh(tickers[:n], ["daily"], data_path)
+                elapsed = (time.perf_counter() - t0) * n_tickers / n
+
+            failed = sum(isinstance(r, Exception) for r in results.values())
+            assert failed == 0, f"{failed} tickers failed"
+            print(
+                f"{concurrency:>12} {elapsed:>8.2f} {server.requests - requests:>9} "
+                f"{server.connections - connections:>12}" + ("  (extrapolated)" if n < n_tickers else "")
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else N_TICKERS)
@@ -0,0 +1,54 @@
+"""
+Benchmarks whole episodes of SingleStockEnv.step as the episode length grows, for each observation mode:
+
+- window: a read-only (lookback, 5) view into a padded OHLCV array, the default
+- frame: the dataframe up through the current date, sliced by position
+- mask: the original full-history boolean mask, for reference
+
+With constant cost per step, episode time grows linearly in the number of steps.
+
+    python benchmarks/step_observation.py
+"""
+# standard lib
+import tempfile
+import time
+
+# local
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.env import SingleStockEnv
+from synthetic import write_synthetic_csvs
+
+
+N_DAYS = 30 * 252
+EPISODE_LENGTHS = [250, 1_000, 4_000]
+
+
+def time_episode(env: SingleStockEnv, n_steps: int, mask: bool = False) -> float:
+    """Seconds to run an episode of n_steps steps from the env's start date"""
+    env.reset()
+    df = getattr(env._data, env.frequency)
+
+    t0 = time.perf_counter()
+    for _ in range(n_steps):
+        env.step()
+        if mask:
+            df[df.index <= env.cur_date.as_timestamp]
+    return time.perf_counter() - t0
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        write_synthetic_csvs(root, "SYN", N_DAYS, freqs=["daily"])
+        data = DataModel("SYN", freqs=["daily"], data_path=root, cache=False)
+        start = data.daily.index[100]
+
+        print(f"{'steps':>8} {'window s':>10} {'frame s':>10} {'mask s':>10}")
+        for n_steps in EPISODE_LENGTHS:
+            window = SingleStockEnv("SYN", start, 10000, data=data, observation="window")
+            frame = SingleStockEnv("SYN", start, 10000, data=data, observation="frame")
+            times = [time_episode(window, n_steps), time_episode(frame, n_steps), time_episode(window, n_steps, mask=True)]
+            print(f"{n_steps:>8} " + " ".join(f"{t:>10.3f}" for t in times))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Breaks the cost of loading a DataModel and of SingleStockEnv.step down by phase with the built-in instrumentation,
+and measures what the disabled instrumentation costs per step:
+
+- DataModel: csv read, clean, sidecar cache read and write, resampling, with cache hit and miss counters
+- step: order recording, next tick lookup, open and close price lookups, fill, valuation and observation
+
+Also writes the timed calls as Chrome trace-event JSON, viewable in chrome://tracing or ui.perfetto.dev.
+
+    python benchmarks/step_phases.py [trace.json]
+"""
+# standard lib
+import sys
+import tempfile
+import time
+
+# local
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.utils import instruments, enable_instrumentation, disable_instrumentation, instrumentation_summary, write_chrome_trace
+from swing_trader_env.env import SingleStockEnv
+from swing_trader_env.types import BuyAction, SellAction
+from synthetic import write_synthetic_csvs
+
+# external
+import pandas as pd
+
+
+N_DAYS = 30 * 252
+N_STEPS = 5_000
+
+
+def run_episode(env: SingleStockEnv, n_steps: int) -> float:
+    """Seconds to run n_steps steps from the env's start date, trading every 20th step"""
+    env.reset()
+    t0 = time.perf_counter()
+    for k in range(n_steps):
+        if k % 40 == 0:
+            env.step(BuyAction(ticker=env.ticker, shares=1))
+        elif k % 40 == 20:
+            env.step(SellAction(ticker=env.ticker, shares=1))
+        else:
+            env.step()
+    return time.perf_counter() - t0
+
+
+def main(trace_path: str):
+    with tempfile.TemporaryDirectory() as root:
+        write_synthetic_csvs(root, "SYN", N_DAYS, freqs=["daily"])
+
+        # disabled instrumentation, best of a few runs. Leaves the sidecar cache unwritten for the cold load below
+        data = DataModel("SYN", freqs=["daily"], data_path=root, cache=False)
+        env = SingleStockEnv("SYN", data.daily.index[100], 10000, data=data)
+        disabled = min(run_episode(env, N_STEPS) for _ in range(5))
+
+        # enabled, from a cold load: the first model misses the sidecar cache and writes it, the second hits it.
+        # weekly bars are resampled from daily, as only the daily csv was written
+        instruments.reset()
+        enable_instrumentation(trace=True)
+        for _ in range(2):
+            data = DataModel("SYN", freqs=["daily", "weekly"], data_path=root, derive=True)
+            data.weekly
+        env = SingleStockEnv("SYN", data.daily.index[100], 10000, data=data)
+        enabled = run_episode(env, N_STEPS)
+        disable_instrumentation()
+
+    with pd.option_context("display.width", 200, "display.max_columns", 10):
+        print(instrumentation_summary())
+    print(f"\n{N_STEPS} steps: {disabled / N_STEPS * 1e6:.1f} us/step disabled, {enabled / N_STEPS * 1e6:.1f} us/step enabled")
+
+    write_chrome_trace(trace_path)
+    print(f"trace written to {trace_path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "step_phases_trace.json")
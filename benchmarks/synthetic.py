@@ -0,0 +1,49 @@
+"""
+Writes synthetic yfinance-style csv files for benchmarking, laid out the way DataModel expects:
+{root}/{freq}/{ticker}-{freq}.csv
+"""
+# standard lib
+from typing import List
+import os
+
+# external
+import pandas as pd
+import numpy as np
+
+
+def synthetic_daily(n_days: int, seed: int = 0, end: str = "2024-12-31") -> pd.DataFrame:
+    """A geometric random walk of n_days business days ending on a given date"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=end, periods=n_days)
+
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+    open_ = close * (1 + rng.normal(0, 0.003, n_days))
+
+    return pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * 1.01,
+        "Low": np.minimum(open_, close) * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n_days),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def write_synthetic_csvs(root: str, ticker: str, n_days: int, freqs: List[str] = ("daily", "weekly", "monthly"), seed: int = 0) -> None:
+    """Writes the daily random walk and its weekly/monthly resamples to csv"""
+    daily = synthetic_daily(n_days, seed=seed)
+    agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum", "Dividends": "sum", "Stock Splits": "sum"}
+    frames = {
+        "daily": daily,
+        "weekly": daily.resample("W-MON", label="left", closed="left").agg(agg).dropna(),
+        "monthly": daily.resample("MS").agg(agg).dropna(),
+    }
+
+    for freq in freqs:
+        df = frames[freq].copy()
+        df.index = df.index.strftime("%Y-%m-%d 00:00:00-05:00")
+        df.index.name = "Date"
+
+        os.makedirs(os.path.join(root, freq), exist_ok=True)
+        df.to_csv(os.path.join(root, freq, f"{ticker}-{freq}.csv"))
@@ -0,0 +1,47 @@
+"""
+Benchmarks the per-step cost of DataModel tick navigation as the length of the price history grows.
+
+Each simulated step performs the same three lookups SingleStockEnv.step does: get_next_tick, get_price_on_open
+and get_price_on_close. With searchsorted-based navigation the cost per step should stay flat.
+
+    python benchmarks/tick_navigation.py
+"""
+# standard lib
+import tempfile
+import time
+
+# local
+from swing_trader_env.core.data import DataModel
+from synthetic import write_synthetic_csvs
+
+
+HISTORY_LENGTHS = [1_000, 2_500, 5_000, 10_000, 20_000]
+N_STEPS = 500
+
+
+def time_episode(data: DataModel, n_steps: int) -> float:
+    """Returns the mean seconds per step of an episode over the last n_steps ticks"""
+    date = data.daily.index[-n_steps - 1]
+
+    t0 = time.perf_counter()
+    for _ in range(n_steps):
+        date = data.get_next_tick("daily", date)
+        data.get_price_on_open(date)
+        data.get_price_on_close(date)
+    return (time.perf_counter() - t0) / n_steps
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{'bars':>8} {'us/step':>10}")
+        for n_days in HISTORY_LENGTHS:
+            ticker = f"SYN{n_days}"
+            write_synthetic_csvs(root, ticker, n_days, freqs=["daily"])
+            data = DataModel(ticker, freqs=["daily"], data_path=root, cache=False)
+
+            time_episode(data, 50)  # warm up the tick index
+            print(f"{n_days:>8} {time_episode(data, N_STEPS) * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
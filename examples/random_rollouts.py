@@ -0,0 +1,40 @@
+"""
+Random rollouts from a stock pool: a long-lived SingleStockEnv is switched to a randomly sampled ticker and start
+date for every episode, on data loaded once up front
+
+    python examples/random_rollouts.py [data_path]
+"""
+# standard lib imports
+import sys
+
+# local imports
+from swing_trader_env.env import EpisodeSampler
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.types import BuyAction, SellAction
+
+# external dependencies
+import numpy as np
+
+
+def main(data_path: str, n_episodes: int = 1000, horizon: int = 60):
+    pool = [DataModel(ticker, ["daily"], data_path=data_path) for ticker in ["AAPL", "MSFT", "GOOG"]]
+    sampler = EpisodeSampler(pool, lookback=32, horizon=horizon, seed=0)
+    env = sampler.make_env(principal=10000)
+
+    performance = np.empty(n_episodes)
+    for i in range(n_episodes):
+        sampler.reset(env)
+
+        # buy with 90% of the cash on the first step, sell everything on the last
+        env.step(BuyAction(ticker=env.ticker, shares=0.9 * env.cash / env.cur_price))
+        for _ in range(horizon - 2):
+            env.step()
+        env.step(SellAction(ticker=env.ticker, shares=env.shares_held))
+        performance[i] = env.performance
+
+    print(f"{n_episodes} random {horizon} day episodes over {len(sampler)} possible starts")
+    print(f"performance: mean {performance.mean():.3f}, 5th percentile {np.percentile(performance, 5):.3f}, 95th percentile {np.percentile(performance, 95):.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "swing-trader-old/data")
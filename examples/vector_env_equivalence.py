@@ -0,0 +1,91 @@
+"""
+Checks that VectorSingleStockEnv matches SingleStockEnv exactly: runs the same random orders through N scalar
+envs and one vector env and compares cash, holdings, prices, net worth and observations after every step.
+Also checks that invalid orders raise in both, and that skipped invalid orders behave like no order
+
+    python examples/vector_env_equivalence.py [data_path]
+"""
+# standard lib imports
+import sys
+
+# local imports
+from swing_trader_env.env import SingleStockEnv, VectorSingleStockEnv
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.types import BuyAction, SellAction
+
+# external dependencies
+import numpy as np
+
+
+def random_orders(rng: np.random.Generator, cash: np.ndarray, shares_held: np.ndarray, prices: np.ndarray, invalid: float) -> np.ndarray:
+    """Signed share orders: buys of a fraction of cash, sells of a fraction of holdings, some oversized"""
+    size = rng.uniform(0, 1, len(cash)) + (rng.uniform(0, 1, len(cash)) < invalid)
+    side = rng.choice([-1, 0, 1], len(cash))
+    buys = size * 0.9 * cash / prices
+    sells = size * shares_held
+    return np.where(side > 0, buys, np.where(side < 0, -sells, 0.0))
+
+
+def to_action(ticker: str, order: float) -> BuyAction|SellAction|None:
+    if order > 0:
+        return BuyAction(ticker=ticker, shares=order)
+    if order < 0:
+        return SellAction(ticker=ticker, shares=-order)
+    return None
+
+
+def check(envs, vec, step: int) -> None:
+    for name in ["cash", "shares_held", "cur_price", "net_worth"]:
+        scalar = np.array([getattr(env, name) for env in envs])
+        assert np.array_equal(scalar, getattr(vec, name)), f"{name} differs at step {step}"
+    assert np.array_equal(np.stack([env.observe() for env in envs]), vec.observe(), equal_nan=True), f"observations differ at step {step}"
+    assert np.array_equal([env.done for env in envs], vec.done), f"done differs at step {step}"
+
+
+def main(data_path: str, n_episodes: int = 16, n_steps: int = 300, frequency: str = "daily"):
+    rng = np.random.default_rng(0)
+    models = [DataModel(ticker, freqs=[frequency], data_path=data_path) for ticker in ["AAPL", "MSFT", "GOOG"]]
+
+    # random episodes, some starting close enough to the end of the data to finish early
+    data, starts = [], []
+    for i in range(n_episodes):
+        model = models[i % len(models)]
+        index = getattr(model, frequency).index
+        data.append(model)
+        starts.append(index[rng.integers(0, len(index) - 10 if i % 4 else len(index) - 1)])
+    data[-1], starts[-1] = models[0], getattr(models[0], frequency).index[-5]
+
+    # skipped invalid orders behave like no order
+    envs = [SingleStockEnv(m.ticker, s, 10000, frequency=frequency, data=m) for m, s in zip(data, starts)]
+    vec = VectorSingleStockEnv(data, starts, 10000, frequency=frequency, invalid_orders="skip")
+    check(envs, vec, 0)
+
+    rejected = 0
+    for step in range(1, n_steps + 1):
+        orders = random_orders(rng, vec.cash, vec.shares_held, vec.cur_price, invalid=0.1)
+        done = vec.done
+        vec.step(orders)
+        rejected += vec.rejected.sum()
+        for env, order, skip, finished in zip(envs, orders, vec.rejected, done):
+            if not finished:
+                env.step(None if skip else to_action(env.ticker, order))
+        check(envs, vec, step)
+
+    print(f"{n_episodes} episodes x {n_steps} steps match exactly, {rejected} invalid orders skipped, {vec.done.sum()} episodes done")
+
+    # invalid orders raise in both
+    vec = VectorSingleStockEnv(data, starts, 10000, frequency=frequency)
+    env = SingleStockEnv(data[0].ticker, starts[0], 10000, frequency=frequency, data=data[0])
+    orders = np.zeros(n_episodes)
+    orders[0] = 2 * 10000 / vec.cur_price[0]
+    for stepper, order in [(vec.step, orders), (env.step, BuyAction(ticker=env.ticker, shares=orders[0]))]:
+        try:
+            stepper(order)
+        except AssertionError as e:
+            print(f"raised: {e}")
+        else:
+            raise RuntimeError("invalid order did not raise")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "swing-trader-old/data")
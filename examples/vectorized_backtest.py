@@ -0,0 +1,70 @@
+"""
+Scores a grid of 10,000 moving average crossover strategies with the vectorized backtest engine, after checking
+that it reproduces SingleStockEnv step for step
+
+    python examples/vectorized_backtest.py [data_path]
+"""
+# standard lib imports
+import sys
+import time
+
+# local imports
+from swing_trader_env.env import SingleStockEnv, backtest
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.indicators import sma
+from swing_trader_env.types import BuyAction, SellAction
+
+# external dependencies
+import numpy as np
+
+
+def check_against_env(data: DataModel, start, n_steps: int = 500) -> None:
+    """Runs random orders through the env and the backtest engine and compares them exactly"""
+    rng = np.random.default_rng(0)
+    env = SingleStockEnv(data.ticker, start, 10000, data=data)
+
+    orders = np.zeros(n_steps)
+    for k in range(n_steps):
+        if rng.uniform() < 0.2:
+            orders[k] = rng.uniform(0, 0.9) * env.cash / env.cur_price
+        elif rng.uniform() < 0.2:
+            orders[k] = -rng.uniform(0, 1) * env.shares_held
+        if orders[k] > 0:
+            env.step(BuyAction(ticker=data.ticker, shares=orders[k]))
+        elif orders[k] < 0:
+            env.step(SellAction(ticker=data.ticker, shares=-orders[k]))
+        else:
+            env.step()
+
+    result = backtest(data, orders, principal=10000, start=start)
+    assert result.net_worth[-1] == env.net_worth and result.cash[-1] == env.cash
+    assert result.events() == env.events()
+    assert (result.net_worth == env.ledger.equity()["net_worth"]).all()
+    print(f"backtest matches SingleStockEnv over {n_steps} steps and {len(env.ledger)} fills")
+
+
+def main(data_path: str):
+    data = DataModel("AAPL", ["daily"], data_path=data_path)
+    start = data.daily.index[-2521]  # ten years of trading
+    check_against_env(data, start)
+
+    # moving averages of every period, computed once
+    periods = np.arange(2, 202, 2)
+    closes = data.daily.iloc[-2521:]
+    averages = np.stack([sma(p)(closes).to_numpy() for p in periods])
+
+    # hold 50 shares while the fast average is above the slow one, decided at each step's close
+    fast, slow = np.meshgrid(np.arange(len(periods)), np.arange(len(periods)), indexing="ij")
+    fast, slow = fast.ravel(), slow.ravel()
+    t0 = time.perf_counter()
+    signal = np.nan_to_num(averages[fast, :-1] > averages[slow, :-1]).astype(np.float64)
+    result = backtest(data, 50 * signal, start=start, target=True)
+    elapsed = time.perf_counter() - t0
+
+    best = result.performance.argmax()
+    print(f"scored {len(signal)} strategies in {elapsed:.2f}s")
+    print(f"best: sma({periods[fast[best]]}) over sma({periods[slow[best]]}), performance {result.performance[best]:.3f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "swing-trader-old/data")
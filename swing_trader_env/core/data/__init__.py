@@ -1 +1,7 @@
-from swing_trader_env.core.data.data_model import DataModel
\ No newline at end of file
+from swing_trader_env.core.data.data_model import DataModel, DataWindow, NoDataException, LoadResult
+from swing_trader_env.core.data.universe import UniverseData
+from swing_trader_env.core.data.sqlite import SQLiteStore
+from swing_trader_env.core.data.shared import SharedDataModel
+from swing_trader_env.core.data.memory import set_memory_budget, memory_report
+from swing_trader_env.core.data.sources import DataSource, HTTPDataSource, DataSourceError
+from swing_trader_env.core.data.local_server import LocalBarServer
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Growable columnar storage for bars that are appended over time
+"""
+# standard lib
+from typing import *
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['BarBuffer']
+
+
+class BarBuffer:
+    """
+    Holds the columns of a date-indexed frame in arrays with spare capacity, doubling the capacity whenever it runs
+    out so that appending a bar is amortized O(1). frame() returns a frame over the filled prefix without copying.
+
+    A 'Date' column mirroring the index is rebuilt by frame() rather than stored, and dates keep the resolution of
+    the frame's index. Columns other than OHLCV (e.g. indicators) are extended with missing values for appended bars.
+    """
+
+    columns: List[str]  # buffered columns, in frame order
+    length: int  # number of filled rows
+
+    def __init__(self, df: pd.DataFrame, capacity: Optional[int] = None):
+        self.length = len(df)
+        self.capacity = max(capacity or 2 * self.length, 16)
+        self.columns = [c for c in df.columns if c != "Date"]
+        self.has_date_column = "Date" in df.columns
+        self.index_name = df.index.name
+        self.attrs = dict(df.attrs)
+
+        index = df.index.to_numpy()
+        self._dates = np.empty(self.capacity, dtype=index.dtype)
+        self._dates[:self.length] = index
+
+        self._arrays = {}
+        for c in self.columns:
+            values = np.asarray(df[c].to_numpy())
+            array = np.empty(self.capacity, dtype=values.dtype)
+            array[:self.length] = values
+            self._arrays[c] = array
+
+        self._frame = None
+
+    @property
+    def dates(self) -> np.ndarray:
+        """datetime64 dates of the filled rows, in the unit of the frame's index"""
+        return self._dates[:self.length]
+
+    @property
+    def spare_nbytes(self) -> int:
+        """Bytes allocated for rows that have not been filled yet"""
+        row_nbytes = self._dates.itemsize + sum(a.itemsize for a in self._arrays.values())
+        return (self.capacity - self.length) * row_nbytes
+
+    def owns(self, df: pd.DataFrame) -> bool:
+        """Whether a frame is the current output of this buffer"""
+        return df is self._frame
+
+    def _grow(self, needed: int) -> None:
+        """Reallocates to at least the needed capacity, doubling"""
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+
+        dates = np.empty(capacity, dtype=self._dates.dtype)
+        dates[:self.length] = self.dates
+        self._dates = dates
+
+        for c, array in self._arrays.items():
+            grown = np.empty(capacity, dtype=array.dtype)
+            grown[:self.length] = array[:self.length]
+            self._arrays[c] = grown
+        self.capacity = capacity
+
+    def append(self, dates: np.ndarray, values: Dict[str, np.ndarray]) -> None:
+        """
+        Appends rows. Columns missing from values are filled with NaN (or None for non-float columns)
+
+        dates: np.ndarray, int64 nanosecond dates, all later than the current last date
+        values: Dict[str, np.ndarray], column values of the new rows
+        """
+        n = len(dates)
+        if self.length + n > self.capacity:
+            self._grow(self.length + n)
+
+        sl = slice(self.length, self.length + n)
+        self._dates[sl] = dates.view("datetime64[ns]")
+        for c, array in self._arrays.items():
+            if c in values:
+                array[sl] = values[c]
+            else:
+                array[sl] = np.nan if array.dtype.kind == "f" else None
+        self.length += n
+        self._frame = None
+
+    def set_last(self, values: Dict[str, Any]) -> None:
+        """Overwrites columns of the last row in place, e.g. to update a partial weekly bar"""
+        for c, v in values.items():
+            if c in self._arrays:
+                self._arrays[c][self.length - 1] = v
+        self._frame = None
+
+    def rescale(self, column: str, step: int) -> None:
+        """
+        Divides a column by step, rounding to its dtype. The column is rewritten into a new array, so frames returned
+        earlier keep their values
+        """
+        array = self._arrays[column]
+        scaled = np.zeros_like(array)
+        scaled[:self.length] = np.rint(array[:self.length] / step)
+        self._arrays[column] = scaled
+        self._frame = None
+
+    def frame(self) -> pd.DataFrame:
+        """Date-indexed frame over the filled rows. Shares memory with the buffer"""
+        if self._frame is None:
+            index = pd.DatetimeIndex(self.dates, name=self.index_name)
+            df = pd.DataFrame({c: self._arrays[c][:self.length] for c in self.columns}, index=index, copy=False)
+            if self.has_date_column:
+                df["Date"] = index
+            df.attrs.update(self.attrs)
+            self._frame = df
+        return self._frame
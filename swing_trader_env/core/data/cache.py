@@ -0,0 +1,158 @@
+"""
+Binary sidecar cache for cleaned ticker data. Cleaned frames are written once as an uncompressed
+.npz file next to the csv they were parsed from and reloaded from there on subsequent constructions
+"""
+# standard lib
+from typing import *
+import hashlib
+import os
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['cache_path', 'read_cache', 'write_cache', 'append_journal']
+
+
+CACHE_VERSION = 1  # bump whenever the layout of the cached frame changes
+
+# bars appended after the cache was written are journaled as fixed-size records next to it
+_JOURNAL_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+_JOURNAL_DTYPE = np.dtype([("date", "<i8")] + [(c, "<f8") for c in _JOURNAL_COLUMNS])
+
+
+def cache_path(csv_path: os.PathLike, variant: str = "") -> str:
+    """Path of the sidecar cache belonging to a csv file. Variants cache different layouts of the same data side by side"""
+    stem = os.path.splitext(csv_path)[0]
+    return f"{stem}.{variant}.npz" if variant else f"{stem}.npz"
+
+
+def journal_path(csv_path: os.PathLike, variant: str = "") -> str:
+    """Path of the append journal belonging to a sidecar cache"""
+    return cache_path(csv_path, variant)[:-len(".npz")] + ".journal"
+
+
+def _signature(csv_path: os.PathLike, verify_hash: bool) -> np.ndarray:
+    """
+    Encodes the state of the csv file the cache was built from: modification time, size, cache version
+    and optionally a content hash
+    """
+    stat = os.stat(csv_path)
+    header = np.array([stat.st_mtime_ns, stat.st_size, CACHE_VERSION], dtype=np.int64).view(np.uint8)
+
+    if not verify_hash:
+        return header
+
+    with open(csv_path, "rb") as f:
+        digest = hashlib.blake2b(f.read(), digest_size=16).digest()
+    return np.concatenate([header, np.frombuffer(digest, dtype=np.uint8)])
+
+
+def read_cache(csv_path: os.PathLike, verify_hash: bool = False, variant: str = "") -> Optional[pd.DataFrame]:
+    """
+    Loads the cached frame for a csv file. Returns None if there is no cache or if the csv has changed since it was written
+
+    csv_path: PathLike, the csv the cache was built from
+    verify_hash: bool, also compare a hash of the csv contents, not just its mtime and size
+    variant: str, which layout of the data to read
+    """
+    path = cache_path(csv_path, variant)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            signature = npz["__signature__"]
+            if len(signature) == 24 and verify_hash:  # cache was written without a hash
+                return None
+            if not np.array_equal(signature, _signature(csv_path, verify_hash=len(signature) > 24)):
+                return None
+
+            columns = npz["__columns__"].tolist()
+            index = pd.DatetimeIndex(npz["__index__"], name=str(npz["__index_name__"]))
+            data = {c: npz[f"col_{i}"] for i, c in enumerate(columns)}
+
+    except (OSError, KeyError, ValueError):  # unreadable or stale layout - treat as a miss
+        return None
+
+    df = pd.DataFrame(data, index=index, columns=columns)
+
+    journal = journal_path(csv_path, variant)
+    if os.path.exists(journal):
+        df = _apply_journal(df, np.fromfile(journal, dtype=_JOURNAL_DTYPE))
+    return df
+
+
+def _apply_journal(df: pd.DataFrame, records: np.ndarray) -> pd.DataFrame:
+    """Applies journaled bars to a cached frame. A record on an existing date replaces that bar"""
+    if len(records) == 0:
+        return df
+
+    index = pd.DatetimeIndex(records["date"].view("datetime64[ns]"), name=df.index.name).as_unit(df.index.unit)
+    appended = pd.DataFrame({c: records[c] for c in _JOURNAL_COLUMNS}, index=index)
+    if "Date_str" in df.columns:
+        appended["Date_str"] = index.strftime("%Y-%m-%d")
+    if "Date" in df.columns:
+        appended["Date"] = index
+
+    df = pd.concat([df, appended[df.columns].astype(df.dtypes.to_dict())])
+    return df[~df.index.duplicated(keep="last")]
+
+
+def append_journal(csv_path: os.PathLike, df: pd.DataFrame, variant: str = "") -> bool:
+    """
+    Appends bars to the journal of an existing sidecar cache without rewriting the cache. They are applied on top of
+    the cached frame by read_cache, and discarded together with the cache once the csv changes
+
+    df: pd.DataFrame, date-indexed bars with Open, High, Low, Close, Volume. Volume in shares
+    :returns bool, whether the bars were journaled. False if there is no cache to journal onto
+    """
+    if not os.path.exists(cache_path(csv_path, variant)):
+        return False
+
+    records = np.empty(len(df), dtype=_JOURNAL_DTYPE)
+    records["date"] = df.index.to_numpy().astype("datetime64[ns]").view(np.int64)
+    for c in _JOURNAL_COLUMNS:
+        records[c] = df[c].to_numpy(dtype=np.float64)
+
+    try:
+        with open(journal_path(csv_path, variant), "ab") as f:
+            f.write(records.tobytes())
+    except OSError:
+        return False
+    return True
+
+
+def write_cache(csv_path: os.PathLike, df: pd.DataFrame, verify_hash: bool = False, variant: str = "") -> bool:
+    """
+    Writes a cleaned frame to the sidecar cache of a csv file. The write is atomic, and failures (e.g. a read-only
+    data directory) are swallowed since the cache is only an optimization
+
+    :returns bool, whether the cache was written
+    """
+    path = cache_path(csv_path, variant)
+    arrays = {
+        "__signature__": _signature(csv_path, verify_hash),
+        "__columns__": np.array([str(c) for c in df.columns]),
+        "__index__": df.index.to_numpy(),
+        "__index_name__": np.array(df.index.name or ""),
+    }
+    for i, c in enumerate(df.columns):
+        values = df[c].to_numpy()
+        if values.dtype == object or not isinstance(values, np.ndarray):
+            values = np.asarray(values, dtype=str)
+        arrays[f"col_{i}"] = values
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        if os.path.exists(journal_path(csv_path, variant)):  # the journal belonged to the replaced cache
+            os.remove(journal_path(csv_path, variant))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+    return True
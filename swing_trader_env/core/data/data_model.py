@@ -4,58 +4,475 @@ Data Model contains all the data needed for the environment
 # standard lib
 from typing import *
 from typing_extensions import Self
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 import os
 
 # local
-from swing_trader_env.core.utils import Date
+from swing_trader_env.core.utils import Date, instruments
+from swing_trader_env.core.data.cache import read_cache, write_cache, append_journal
+from swing_trader_env.core.data.buffer import BarBuffer
+from swing_trader_env.core.data.memory import registry
+from swing_trader_env.core.data.resample import is_frequency, bucket_labels, resample
+from swing_trader_env.core.data.ingest import read_csv_fast, compact, volume_step
 
 # external
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime
 
 
-__all__ = ['DataModel', 'NoDataException']
+__all__ = ['DataModel', 'DataWindow', 'NoDataException', 'LoadResult']
 
 
 class NoDataException(Exception):
     pass
 
 
+@dataclass
+class LoadResult:
+    """Outcome of loading one ticker in DataModel.load_many. Exactly one of data_model and error is set"""
+    ticker: str
+    data_model: Optional["DataModel"] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class DataModel:
     """
     Core data access for ticker information for a single ticker. Wraps pandas dataframes of different tick frequencies
     """
 
-    # TODO handle loading non-existent data from yfinance
     # TODO handle loading data from a database
     # TODO how to optimize caching data in databases
     # TODO how to handle caching computations for different indicators
 
     ticker: str
+    freqs: List[str]  # the frequencies this model was constructed with
     daily: pd.DataFrame
     weekly: pd.DataFrame
     monthly: pd.DataFrame
 
+    FREQUENCIES = ('daily', 'weekly', 'monthly')  # frequencies with their own csv files
+
     data_path = "data"  # from root  # TODO figure out a more elegant way to handle this
+    cache = True  # whether to read and write the binary sidecar cache next to each csv
+    verify_hash = False  # whether cache invalidation also compares a hash of the csv contents
+    derive = False  # whether weekly and monthly bars are resampled from daily instead of read from their own csv
+    fast = False  # whether csv files are read with the typed fast path, which drops the Date_str column
+    compact = False  # whether prices are held as float32 and volume as uint32. Implies fast
+    source = None  # optional DataSource that missing csv files are fetched from, see sources.py
 
     _synthetic_data: Dict[str, pd.DataFrame] = None
 
-    def __init__(self, ticker: os.PathLike, freqs: List[str], data_path: Optional[str] = None):
-
+    def __init__(
+            self,
+            ticker: os.PathLike,
+            freqs: List[str],
+            data_path: Optional[str] = None,
+            cache: Optional[bool] = None,
+            verify_hash: Optional[bool] = None,
+            lazy: bool = True,
+            derive: Optional[bool] = None,
+            fast: Optional[bool] = None,
+            compact: Optional[bool] = None,
+            source: Optional["DataSource"] = None,
+    ):
+        """
+        ticker: str, the ticker to load
+        freqs: List[str], the frequencies to load, e.g. ['daily', 'weekly', '3d', '2w']. See resample.parse_frequency
+        data_path: str, root of the data directory, laid out as {data_path}/{freq}/{ticker}-{freq}.csv
+        cache: bool, load cleaned data from (and save it to) a binary .npz file next to each csv.
+            The cache is rebuilt whenever the csv's modification time or size changes
+        verify_hash: bool, additionally invalidate the cache on a change of the csv contents' hash
+        lazy: bool, defer reading each frequency until it is first accessed. Frequencies outside of freqs
+            (e.g. 'daily' for the price lookups) are loaded on demand either way
+        derive: bool, build weekly and monthly bars from the daily frame rather than reading their csv files.
+            Derived bars are labeled with the date of their first trading day, which differs from the csv labels
+            (e.g. monthly csv bars fall on the first of the month, trading day or not), so the tick dates change.
+            Custom frequencies such as '3d' or '2w' are always derived from daily
+        fast: bool, parse only the needed csv columns with explicit dtypes and a fixed date format, and skip the
+            redundant Date_str column
+        compact: bool, hold prices as float32 and volume as uint32 (see ingest.compact), roughly halving memory
+        source: DataSource, fetch csv files that do not exist locally from this source and write them to data_path
+        """
     
         self.ticker = ticker
         if data_path is not None:
             self.data_path = data_path
-        
-        for f in freqs:
-            df = pd.read_csv(self._csv_path(ticker, f))
+        if cache is not None:
+            self.cache = cache
+        if verify_hash is not None:
+            self.verify_hash = verify_hash
+        if derive is not None:
+            self.derive = derive
+        if fast is not None:
+            self.fast = fast
+        if compact is not None:
+            self.compact = compact
+        if source is not None:
+            self.source = source
+
+        self.freqs = list(freqs)
+        self._tick_indices = {}
+        self._buffers = {}
+        self._pinned = set()
+        self._loadable = True
+        registry.register(self)
+
+        if not lazy:
+            self.load()
+
+    def __getattr__(self, name: str) -> Any:
+        """
+        Loads a frequency on first access. Only invoked for attributes that are not already set. Models built from
+        frames cannot read files, but can still derive frequencies from their daily frame
+        """
+        if "_loadable" in self.__dict__ and is_frequency(name):
+            if self._loadable or (name != "daily" and "daily" in self.__dict__):
+                df = self._load(name)
+                setattr(self, name, df)
+                registry.refresh(self, _frame_nbytes(df) if registry.budget is not None else 0)
+                return df
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def load(self, freqs: Optional[List[str]] = None) -> Self:
+        """
+        Eagerly loads frequencies that have not been loaded yet. Defaults to the frequencies the model was constructed with
+        """
+        for f in self.freqs if freqs is None else freqs:
+            getattr(self, f)
+        return self
+
+    def is_loaded(self, freq: str) -> bool:
+        """Whether a frequency is held in memory, without triggering a load"""
+        return freq in self.__dict__
+
+    def loaded_freqs(self) -> List[str]:
+        """The frequencies currently held in memory"""
+        return [f for f in self.__dict__ if is_frequency(f)]
+
+    def memory_usage(self) -> pd.Series:
+        """
+        Bytes held by this model, indexed by (ticker, freq, kind, name). kind is 'index', 'column' for the OHLCV and
+        date columns, 'indicator' for any other column attached to a frame, or 'cache' for the tick index arrays and
+        spare append capacity
+        """
+        usage = {}
+        for freq in self.loaded_freqs():
+            df = self.__dict__[freq]
+            usage[(self.ticker, freq, "index", "index")] = df.index.nbytes
+            for c, nbytes in df.memory_usage(index=False, deep=True).items():
+                kind = "column" if c in _FRAME_COLUMNS else "indicator"
+                usage[(self.ticker, freq, kind, c)] = nbytes
+
+            ticks = self._tick_indices.get(freq)
+            if ticks is not None and ticks.frame is df:
+                usage[(self.ticker, freq, "cache", "tick_index")] = ticks.nbytes
+            buffer = self._buffers.get(freq)
+            if buffer is not None and buffer.owns(df):
+                usage[(self.ticker, freq, "cache", "append_capacity")] = buffer.spare_nbytes
+
+        index = pd.MultiIndex.from_tuples(list(usage), names=["ticker", "freq", "kind", "name"])
+        return pd.Series(list(usage.values()), index=index, name="bytes", dtype=np.int64)
+
+    def evict(self, freqs: Optional[List[str]] = None) -> None:
+        """
+        Drops loaded frames and their caches so the memory can be reclaimed. Evicted frequencies are reloaded or
+        re-derived on next access. Frames that could not be recovered are kept: those a model was built from with
+        from_frames, those holding appended bars that were not persisted, those narrowed by set_date_bounds and
+        those with columns attached by hand, e.g. indicators
+        """
+        for freq in self.loaded_freqs() if freqs is None else freqs:
+            if not self.is_loaded(freq) or freq in self._pinned:
+                continue
+            if not self._loadable and (freq in self.freqs or not self.is_loaded("daily")):
+                continue
+            if any(c not in _FRAME_COLUMNS for c in self.__dict__[freq].columns):
+                continue
+
+            del self.__dict__[freq]
+            self._tick_indices.pop(freq, None)
+            self._buffers.pop(freq, None)
+
+        if registry.budget is not None:
+            registry.measure(self)
+
+
+    @classmethod
+    def load_many(
+            cls,
+            tickers: Iterable[str],
+            freqs: List[str],
+            workers: Optional[int] = None,
+            **kwargs,
+    ) -> Iterator[LoadResult]:
+        """
+        Loads many tickers on a thread pool, yielding each result as soon as it finishes so work can start early.
+        csv parsing and cleaning spend most of their time in pandas/numpy code that releases the GIL.
+        A failing ticker (e.g. NoDataException, a missing file) is reported in its LoadResult without aborting the batch
+
+            for result in DataModel.load_many(tickers, ["daily"], workers=8):
+                if result.ok:
+                    ...
+
+        tickers: Iterable[str], the tickers to load
+        freqs: List[str], the frequencies to load eagerly for each ticker
+        workers: int, number of threads. Defaults to the ThreadPoolExecutor default
+        kwargs: passed through to the DataModel constructor, e.g. data_path, fast, compact, source.
+            With a source, all missing csv files are fetched up front in one concurrent refresh per frequency. A
+            ticker that fails to fetch is reported with the first error of the refresh and is not fetched again
+        """
+        tickers = list(tickers)
+        failed = {}  # ticker -> the error of its prefetch
+        source = kwargs.get("source") or cls.source
+        if source is not None:
+            data_path = kwargs.get("data_path") or cls.data_path
+            derive = cls.derive if kwargs.get("derive") is None else kwargs["derive"]
+            csv_freqs = ["daily"] + [f for f in freqs if f in cls.FREQUENCIES and f != "daily" and not derive]
+            for f in csv_freqs:
+                missing = [
+                    t for t in tickers
+                    if t not in failed and not os.path.exists(os.path.join(data_path, f, f"{t}-{f}.csv"))
+                ]
+                if missing:
+                    for (ticker, _), result in source.refresh(missing, [f], data_path).items():
+                        if isinstance(result, Exception):
+                            failed[ticker] = result
+
+        def load(ticker: str) -> LoadResult:
+            try:
+                return LoadResult(ticker, data_model=cls(ticker, freqs, lazy=False, **kwargs))
+            except Exception as e:
+                return LoadResult(ticker, error=e)
+
+        for ticker in tickers:
+            if ticker in failed:
+                yield LoadResult(ticker, error=failed[ticker])
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(load, t) for t in tickers if t not in failed]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def from_frames(cls, ticker: str, frames: Dict[str, pd.DataFrame]) -> Self:
+        """
+        Builds a DataModel around already cleaned frames keyed by frequency, without reading from disk.
+        The frames are used as-is, not copied
+        """
+        self = cls.__new__(cls)
+        self.ticker = ticker
+        self.freqs = list(frames)
+        self._tick_indices = {}
+        self._buffers = {}
+        self._pinned = set()
+        self._loadable = False
+        registry.register(self)
 
+        for freq, df in frames.items():
+            setattr(self, freq, df)
+        return self
+
+    @classmethod
+    def from_sqlite(
+            cls,
+            store: "SQLiteStore",
+            ticker: str,
+            freqs: List[str],
+            start: Optional[Date] = None,
+            end: Optional[Date] = None,
+    ) -> Self:
+        """
+        Builds a DataModel from a SQLiteStore, reading only the bars between start and end (inclusive)
+        """
+        frames = {}
+        for f in freqs:
+            df = store.load(ticker, f, start=start, end=end)
             if df.empty:
                 raise NoDataException(f"No data! {ticker} - {f}")
-            df = self._clean(df)
-            setattr(self, f, df)
-    
+            frames[f] = df
+        return cls.from_frames(ticker, frames)
+
+    def _load(self, freq: str) -> pd.DataFrame:
+        """
+        Loads the cleaned data of a single frequency. Frequencies other than daily are resampled from the daily frame
+        if they have no csv of their own or derive is set, otherwise data comes from the sidecar cache or the csv
+        """
+        if self._derived(freq):
+            daily = self.daily
+            with instruments.span("DataModel.resample"):
+                df = resample(daily, freq)
+        else:
+            df = self._read(freq)
+
+        if self.compact:
+            with instruments.span("DataModel.compact"):
+                df = compact(df)
+        return df
+
+    def _derived(self, freq: str) -> bool:
+        """
+        Whether a frequency is resampled from daily, and so labeled by its first trading day, rather than read from
+        its own csv (or given to from_frames) with calendar labels
+        """
+        return freq != "daily" and (self.derive or freq not in self.FREQUENCIES or not (self._loadable or freq in self.freqs))
+
+    def _read(self, freq: str) -> pd.DataFrame:
+        """Reads the cleaned frame of a frequency from the sidecar cache, falling back to parsing the csv"""
+        csv_path = self._csv_path(self.ticker, freq)
+        variant = "fast" if self.fast or self.compact else ""
+
+        if self.source is not None and not os.path.exists(csv_path):
+            with instruments.span("DataModel.fetch"):
+                error = self.source.refresh([self.ticker], [freq], self.data_path)[(self.ticker, freq)]
+            if isinstance(error, Exception):
+                raise error
+
+        if self.cache:
+            with instruments.span("DataModel.read_cache"):
+                df = read_cache(csv_path, verify_hash=self.verify_hash, variant=variant)
+            if instruments.enabled:
+                instruments.count("DataModel.cache.miss" if df is None else "DataModel.cache.hit")
+            if df is not None:
+                return df
+
+        with instruments.span("DataModel.read_csv"):
+            if variant == "fast":
+                df = read_csv_fast(csv_path)
+            else:
+                df = pd.read_csv(csv_path)
+
+        if df.empty:
+            raise NoDataException(f"No data! {self.ticker} - {freq}")
+        if variant != "fast":
+            with instruments.span("DataModel.clean"):
+                df = self._clean(df)
+
+        if self.cache:
+            with instruments.span("DataModel.write_cache"):
+                write_cache(csv_path, df, verify_hash=self.verify_hash, variant=variant)
+        return df
+
+
+    def append_bars(self, bars: pd.DataFrame, persist: bool = True) -> int:
+        """
+        Appends new daily bars, e.g. from a nightly refresh, and brings every loaded frequency up to date: the last
+        (partial) weekly/monthly bar is updated in place and new bars are added after it. Frames grow inside
+        BarBuffers with doubling capacity rather than by concatenation. Indicator columns are extended with NaN
+
+        bars: pd.DataFrame, daily bars indexed by date (or with a Date column) with Open, High, Low, Close, Volume.
+            A bar on the current last date replaces it, older bars are rejected
+        persist: bool, journal the bars next to the sidecar cache so they survive a reload, without rewriting it
+
+        :returns int, the number of daily bars added
+        """
+        dates, values = _conform_bars(bars)
+        if len(dates) == 0:
+            return 0
+
+        last = self._ticks("daily").dates[-1]
+        if dates[0] < last:
+            raise ValueError(f"Cannot append bars before the last daily bar {Date(pd.Timestamp(last))}")
+
+        sizes = self._sizes() if registry.budget is not None else None
+        added = self._append("daily", dates, values)
+        persisted = {"daily": (dates, values)}
+
+        for freq in [f for f in self.__dict__ if is_frequency(f) and f != "daily"]:
+            tail = self._refresh_tail(freq)
+            if not self._derived(freq):  # read from its own csv, so it has its own cache
+                persisted[freq] = tail
+
+        variant = "fast" if self.fast or self.compact else ""
+        for freq, (freq_dates, freq_values) in persisted.items():
+            journaled = persist and self._loadable and self.cache and append_journal(
+                self._csv_path(self.ticker, freq), _bars_frame(freq_dates, freq_values), variant=variant
+            )
+            if not journaled:
+                self._pinned.add(freq)
+
+        registry.refresh(self, self._grown_nbytes(sizes) if sizes is not None else 0)
+        return added
+
+    def _sizes(self) -> Dict[str, Tuple[int, int]]:
+        """The number of rows and the spare buffer capacity in bytes of every loaded frame"""
+        sizes = {}
+        for freq in self.loaded_freqs():
+            buffer = self._buffers.get(freq)
+            owned = buffer is not None and buffer.owns(self.__dict__[freq])
+            sizes[freq] = (len(self.__dict__[freq]), buffer.spare_nbytes if owned else 0)
+        return sizes
+
+    def _grown_nbytes(self, sizes: Dict[str, Tuple[int, int]]) -> int:
+        """The bytes added to the loaded frames since _sizes, measuring only the new rows"""
+        nbytes = 0
+        for freq, (length, spare) in self._sizes().items():
+            before = sizes.get(freq, (0, 0))
+            nbytes += _frame_nbytes(self.__dict__[freq].iloc[before[0]:]) + spare - before[1]
+        return nbytes
+
+    def _buffer(self, freq: str) -> BarBuffer:
+        """The growable buffer backing a frequency, created from the current frame if it is not already buffer-backed"""
+        df = getattr(self, freq)
+        buffer = self._buffers.get(freq)
+        if buffer is None or not buffer.owns(df):
+            buffer = BarBuffer(df)
+            self._buffers[freq] = buffer
+        return buffer
+
+    def _append(self, freq: str, dates: np.ndarray, values: Dict[str, np.ndarray]) -> int:
+        """Writes bars into a frequency's buffer, replacing the last bar if the first new bar falls on its date"""
+        buffer = self._buffer(freq)
+        values = dict(values)
+
+        if "volume_scale" in buffer.attrs:  # compact frames hold volume in units of volume_scale shares
+            scale = buffer.attrs["volume_scale"]
+            step = volume_step(np.max(values["Volume"]) / scale if len(dates) else 0)
+            if step > 1:  # grow the scale as compact does, rather than clipping volumes beyond uint32
+                buffer.rescale("Volume", step)
+                scale = buffer.attrs["volume_scale"] = scale * step
+            values["Volume"] = np.rint(values["Volume"] / scale)
+        if "Date_str" in buffer.columns:
+            values["Date_str"] = pd.DatetimeIndex(dates.view("datetime64[ns]")).strftime("%Y-%m-%d").to_numpy()
+
+        replaced = buffer.length > 0 and dates[:1].view("datetime64[ns]")[0] == buffer.dates[-1]
+        if replaced:
+            buffer.set_last({c: v[0] for c, v in values.items() if c != "Date_str"})
+            dates = dates[1:]
+            values = {c: v[1:] for c, v in values.items()}
+
+        buffer.append(dates, values)
+        setattr(self, freq, buffer.frame())
+        return len(dates)
+
+    def _refresh_tail(self, freq: str) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Re-aggregates a coarser frequency from daily, starting at its last bar, after daily bars were appended
+
+        :returns Tuple[np.ndarray, Dict[str, np.ndarray]], dates and OHLCV of the updated last bar and any new bars
+        """
+        df = getattr(self, freq)
+        daily = self.daily
+        start = int(self._ticks("daily").dates.searchsorted(_as_int(df.index[-1]), side="left"))
+
+        tail = resample(daily.iloc[start:], freq)
+        dates = tail.index.to_numpy()
+        if not self._derived(freq):  # csv bars are labeled on the Monday or the 1st, trading day or not
+            dates = bucket_labels(dates, freq)
+        dates = dates.astype("datetime64[ns]").view(np.int64).copy()
+        dates[0] = _as_int(df.index[-1])  # keep the existing label of the partial bar
+
+        values = {c: tail[c].to_numpy() for c in _BAR_COLUMNS}
+        self._append(freq, dates, values)
+        return dates, values
 
     def _csv_path(self, ticker: str, freq: str) -> os.PathLike:
         return os.path.join(self.data_path, freq, f"{ticker}-{freq}.csv")
@@ -75,24 +492,52 @@ class DataModel:
         df["Date"] = df.index
         return df
     
-    def access(self, freq: str, date: Date, attrs: Optional[List[str]] = None, length: Optional[int] = None) -> Tuple[Dict, List[Dict]]:
-        """
-        Access the latest tick(s) of the frequency data based on date
-        """
-        date = Date(date)
+    def _ticks(self, freq: str) -> "_TickIndex":
+        """Returns the tick index of a frequency, rebuilding it if the frame has been replaced since it was last built"""
         df = getattr(self, freq)
+        if registry.budget is not None:
+            registry.touch(self)
 
-        df = df[df.index <= date.as_timestamp]
+        ticks = self._tick_indices.get(freq)
+        if ticks is None or ticks.frame is not df:
+            ticks = _TickIndex(df)
+            self._tick_indices[freq] = ticks
+            if instruments.enabled:
+                instruments.count("DataModel.tick_index.miss")
+        elif instruments.enabled:
+            instruments.count("DataModel.tick_index.hit")
+        return ticks
+
+    def tick_position(self, freq: str, date: Date) -> int:
+        """
+        Integer position of the latest tick of a frequency on or before a date. -1 if the date precedes all data
+        """
+        ticks = self._ticks(freq)
+        return int(ticks.dates.searchsorted(_as_int(date), side="right")) - 1
 
-        if attrs is None:
-            attrs = df.columns
+    def lookback(self, freq: str, date: Date, length: int) -> np.ndarray:
+        """
+        The OHLCV values of the `length` latest ticks of a frequency on or before a date, as a read-only
+        (length, 5) array. Rows before the first tick are NaN. Returns a view, so the cost does not depend on the
+        length of the history
+        """
+        ticks = self._ticks(freq)
+        return ticks.window(length, ticks.position_on_or_before(date))
 
-        df = df[attrs]
+    def access(self, freq: str, date: Date, attrs: Optional[List[str]] = None, length: Optional[int] = None) -> Tuple[Dict, List[Dict]]:
+        """
+        Access the latest tick(s) of the frequency data based on date
+        """
+        ticks = self._ticks(freq)
+        end = int(ticks.dates.searchsorted(_as_int(date), side="right"))
 
         if length is None:
             length = 1
-        
-        df = df.iloc[-length:, :]
+
+        df = ticks.frame.iloc[max(end - length, 0):end]
+
+        if attrs is not None:
+            df = df[attrs]
 
         return df
 
@@ -100,26 +545,32 @@ class DataModel:
         """
         Get the open price on the next tick following a given tick
         """
-        
-        df = self.access(
-            freq="daily",
-            attrs=["Open"],
-            date=Date(date),
-            length=1
-        )
-        return df.iloc[0, 0]
+        ticks = self._ticks("daily")
+        return ticks.open[ticks.position_on_or_before(date)]
 
     def get_price_on_close(self, date: Date) -> float:
         """
         Get the price at the close
         """
-        df = self.access(
-            freq="daily",
-            attrs=["Close"],
-            date=date,
-            length=1
-        )
-        return df.iloc[0, 0]
+        ticks = self._ticks("daily")
+        return ticks.close[ticks.position_on_or_before(date)]
+
+    def tick_prices(self, freq: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The ticks of a frequency as int64 nanosecond dates, along with the prices get_price_on_open and
+        get_price_on_close return on each of them. Lets simulations look up every fill price at once.
+
+        Weekly and monthly csv bars are labeled on the Monday or the 1st, so the first of them can precede the first
+        daily bar of a ticker listed mid-week or mid-month. Such leading ticks have NaN prices
+        """
+        ticks = self._ticks(freq)
+        daily = self._ticks("daily")
+        i = daily.dates.searchsorted(ticks.dates, side="right") - 1
+        missing = i < 0
+        open_prices, close_prices = daily.open[i], daily.close[i]
+        if missing.any():
+            open_prices[missing] = close_prices[missing] = np.nan
+        return ticks.dates, open_prices, close_prices
 
     def get_next_tick(self, freq: str, date: Date) -> Date:
         """
@@ -129,54 +580,53 @@ class DataModel:
     
     def get_n_ticks_after(self, freq: str, date: Date, n: int) -> Date:
         """Get the date N ticks later"""
-        df = getattr(self, freq)
-        i1 = list(df.index).index(Date(date).as_timestamp)
-        i2 = i1 + n
-        ts2 = df.index[i2]
-        return Date(ts2)
+        ticks = self._ticks(freq)
+        i2 = ticks.position_of(date, freq) + n
+        if not 0 <= i2 < len(ticks.dates):
+            raise IndexError(f"{n} ticks after {Date(date)} is out of bounds for {self.ticker} - {freq}")
+        return Date(ticks.frame.index[i2])
     
+    def _bounded_freqs(self, freq: Optional[str]) -> List[str]:
+        """The frequencies date bounds apply to: the given one, otherwise those constructed with or already loaded"""
+        if freq is not None:
+            return [freq]
+        loaded = [f for f in self.__dict__ if is_frequency(f) and f not in self.freqs]
+        return self.freqs + loaded
+
     def get_date_bounds(self, freq: Optional[str] = None) -> Tuple[Date, Date]:
         """Returns the earliest and latest date contained within all specified frequencies. """
-        if freq is None:
-            freqs = ['daily', 'weekly', 'monthly']
-        else:
-            freqs = [freq]
-
         maxs, mins = [], []
+        freqs = self._bounded_freqs(freq)
         for freq in freqs:
-            if hasattr(self, freq):
-                df = getattr(self, freq)
-                
-                if df.empty:
-                    continue
-                df_dates = [d for d in df.index]
-                maxs.append(max(df_dates))
-                mins.append(min(df_dates))
-        
+            df = getattr(self, freq)
+            
+            if df.empty:
+                continue
+            maxs.append(df.index[-1])
+            mins.append(df.index[0])
+
+        if not mins:
+            raise NoDataException(f"No data! {self.ticker} - {', '.join(freqs)} has no ticks to bound")
         return Date(max(mins)), Date(min(maxs))
 
     def set_date_bounds(self, start: Date, end: Date, freq: Optional[str] = None):
         """Sets the date bounds (inclusive). Option to specify frequency"""
         
-        start = Date(start)
-        end = Date(end)
+        start = _as_int(start)
+        end = _as_int(end)
         
-        if freq is None:
-            freqs = ['daily', 'weekly', 'monthly']
-        else:
-            freqs = [freq]
-        
-        for freq in freqs:
-            if hasattr(self, freq):
-                df = getattr(self, freq)
-                
-                if df.empty:
-                    continue
+        for freq in self._bounded_freqs(freq):
+            df = getattr(self, freq)
+            
+            if df.empty:
+                continue
 
-                df = df[df.index >= start.as_timestamp]
-                df = df[df.index <= end.as_timestamp]
+            dates = self._ticks(freq).dates
+            lo = dates.searchsorted(start, side="left")
+            hi = dates.searchsorted(end, side="right")
 
-                setattr(self, freq, df)
+            setattr(self, freq, df.iloc[lo:hi])
+            self._pinned.add(freq)  # evicting would reload the full history
     
     def buy_and_hold(self, start: Date, end: Date) -> float:
         return self.get_price_on_close(end) / self.get_price_on_open(start)
@@ -185,4 +635,208 @@ class DataModel:
         """
         Gets the end date
         """
-        return self.get_date_bounds()[1]
\ No newline at end of file
+        return self.get_date_bounds()[1]
+
+    def window(self, start: Date, end: Date) -> "DataWindow":
+        """
+        A read-only view of this model restricted to dates between start and end (inclusive). Unlike set_date_bounds,
+        no data is copied or dropped, so any number of overlapping windows can coexist over one model
+        """
+        return DataWindow(self, start, end)
+
+
+class DataWindow(DataModel):
+    """
+    A date-bounded view over a DataModel, e.g. a train/validation/test split or a walk-forward fold. Holds only the
+    bounds - every frequency is resolved to integer positions over the parent's arrays on first use - and supports
+    the same access methods, which never see data outside of the window. Frames are slices of the parent's frames
+
+        train = data.window("2000-01-01", "2015-12-31")
+        test = data.window("2016-01-01", "2020-12-31")
+        env = SingleStockEnv("AAPL", "2016-01-04", 10000, data=test)
+    """
+
+    parent: DataModel  # the model being viewed
+    start: int  # inclusive lower bound, nanoseconds since the epoch
+    end: int  # inclusive upper bound, nanoseconds since the epoch
+
+    def __init__(self, parent: DataModel, start: Date, end: Date):
+        start, end = _as_int(start), _as_int(end)
+        if isinstance(parent, DataWindow):  # windows of windows view the same parent
+            start, end = max(start, parent.start), min(end, parent.end)
+            parent = parent.parent
+
+        self.parent = parent
+        self.ticker = parent.ticker
+        self.freqs = parent.freqs
+        self.start = start
+        self.end = end
+        self._tick_indices = {}
+
+    def __getattr__(self, name: str) -> Any:
+        """Frequencies resolve to slices of the parent's frames"""
+        if "parent" in self.__dict__ and is_frequency(name):
+            return self._ticks(name).frame
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def _ticks(self, freq: str) -> "_TickIndex":
+        """The parent's tick index of a frequency, sliced to the window. Re-sliced if the parent's index was rebuilt"""
+        parent_ticks = self.parent._ticks(freq)
+        ticks = self._tick_indices.get(freq)
+        if ticks is None or ticks.parent is not parent_ticks:
+            lo = int(parent_ticks.dates.searchsorted(self.start, side="left"))
+            hi = int(parent_ticks.dates.searchsorted(self.end, side="right"))
+            ticks = parent_ticks.slice(lo, hi)
+            self._tick_indices[freq] = ticks
+        return ticks
+
+    def set_date_bounds(self, start: Date, end: Date, freq: Optional[str] = None):
+        """Narrows the window. The parent's data is never modified"""
+        self.start = max(_as_int(start), self.start)
+        self.end = min(_as_int(end), self.end)
+        self._tick_indices = {}
+
+    def memory_usage(self) -> pd.Series:
+        """A window holds no data of its own"""
+        index = pd.MultiIndex.from_tuples([], names=["ticker", "freq", "kind", "name"])
+        return pd.Series([], index=index, name="bytes", dtype=np.int64)
+
+    def append_bars(self, bars: pd.DataFrame, persist: bool = True) -> int:
+        raise TypeError("DataWindow is a read-only view. Append bars to its parent DataModel")
+
+    def evict(self, freqs: Optional[List[str]] = None) -> None:
+        raise TypeError("DataWindow is a read-only view. Evict data from its parent DataModel")
+
+
+_BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+_FRAME_COLUMNS = set(_BAR_COLUMNS + ["Date", "Date_str"])
+
+
+def _frame_nbytes(df: pd.DataFrame) -> int:
+    """Bytes held by a frame's index and columns"""
+    return int(df.index.nbytes + df.memory_usage(index=False, deep=True).sum())
+
+
+def _conform_bars(bars: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """Sorted int64 nanosecond dates and float OHLCV arrays of externally supplied bars"""
+    if isinstance(bars.index, pd.DatetimeIndex):
+        index = bars.index
+    else:
+        index = pd.DatetimeIndex(pd.to_datetime(bars["Date"].astype(str).str.slice(0, 10), format="%Y-%m-%d"))
+    if index.tz is not None:
+        index = index.tz_localize(None)
+
+    order = np.argsort(index.to_numpy(), kind="stable")
+    dates = index.normalize().to_numpy().astype("datetime64[ns]").view(np.int64)[order]
+    values = {c: bars[c].to_numpy(dtype=np.float64)[order] for c in _BAR_COLUMNS}
+    return dates, values
+
+
+def _bars_frame(dates: np.ndarray, values: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Date-indexed OHLCV frame from int64 nanosecond dates and column arrays"""
+    return pd.DataFrame(values, index=pd.DatetimeIndex(dates.view("datetime64[ns]"), name="Date"))
+
+
+class _TickIndex:
+    """
+    Sorted int64 (nanosecond) view of a frame's dates with contiguous open/close arrays. Lets the DataModel
+    answer navigation and price lookups with a binary search instead of scanning or masking the frame
+    """
+    __slots__ = ("frame", "dates", "open", "close", "nbytes", "parent", "offset", "_padded", "_windows")
+
+    def __init__(self, frame: pd.DataFrame):
+        if not frame.index.is_monotonic_increasing:
+            raise ValueError("Tick data must be sorted by date")
+
+        self.frame = frame
+        self.dates = frame.index.to_numpy().astype("datetime64[ns]", copy=False).view(np.int64)
+        self.open = np.ascontiguousarray(frame["Open"].to_numpy(dtype=np.float64)) if "Open" in frame else None
+        self.close = np.ascontiguousarray(frame["Close"].to_numpy(dtype=np.float64)) if "Close" in frame else None
+
+        # bytes held beyond the frame itself, i.e. arrays that had to be converted rather than viewed
+        sources = [(self.dates, frame.index.to_numpy())]
+        sources += [(a, frame[c].to_numpy()) for a, c in [(self.open, "Open"), (self.close, "Close")] if a is not None]
+        self.nbytes = sum(a.nbytes for a, source in sources if not np.may_share_memory(a, source))
+        self.parent = None
+        self.offset = 0
+        self._padded = None
+        self._windows = {}
+
+    def slice(self, lo: int, hi: int) -> "_TickIndex":
+        """A tick index over positions [lo, hi) that views this one's arrays"""
+        if self.parent is not None:  # slices of slices view the same parent
+            return self.parent.slice(self.offset + lo, self.offset + hi)
+
+        ticks = _TickIndex.__new__(_TickIndex)
+        ticks.frame = self.frame.iloc[lo:hi]
+        ticks.dates = self.dates[lo:hi]
+        ticks.open = None if self.open is None else self.open[lo:hi]
+        ticks.close = None if self.close is None else self.close[lo:hi]
+        ticks.nbytes = 0
+        ticks.parent = self
+        ticks.offset = lo
+        ticks._padded = None
+        ticks._windows = {}  # length -> windows over the first length - 1 ticks, which must not see the parent's
+        return ticks
+
+    def windows(self, length: int) -> np.ndarray:
+        """
+        Read-only (ticks, length, 5) array whose i-th entry holds the OHLCV rows of the `length` ticks ending at
+        position i. Every length is a strided view over one NaN-padded copy of the OHLCV columns, which is only
+        rebuilt when a longer window needs more padding. Not available on slices, see window
+        """
+        assert self.parent is None, "windows are built over the parent's tick index"
+        windows = self._windows.get(length)
+        if instruments.enabled:
+            instruments.count("DataModel.windows.miss" if windows is None else "DataModel.windows.hit")
+        if windows is None:
+            if self._padded is None or len(self._padded) - len(self.dates) < length - 1:
+                padded = np.full((len(self.dates) + length - 1, len(_BAR_COLUMNS)), np.nan)
+                padded[length - 1:] = self.frame[_BAR_COLUMNS].to_numpy(dtype=np.float64)
+                padded.flags.writeable = False
+                self.nbytes += padded.nbytes - (0 if self._padded is None else self._padded.nbytes)
+                self._padded = padded
+                self._windows = {}  # views of the previous copy
+
+            start = len(self._padded) - len(self.dates) - (length - 1)
+            windows = sliding_window_view(self._padded[start:], length, axis=0).transpose(0, 2, 1)
+            self._windows[length] = windows
+        return windows
+
+    def window(self, length: int, i: int) -> np.ndarray:
+        """
+        Read-only (length, 5) OHLCV rows of the `length` ticks ending at position i, NaN before the first tick.
+        A view of the parent's windows, except within length - 1 ticks of the start of a slice
+        """
+        if self.parent is None:
+            return self.windows(length)[i]
+        if i >= length - 1:
+            return self.parent.windows(length)[self.offset + i]
+
+        head = self._windows.get(length)
+        if head is None:
+            n = min(length - 1, len(self.dates))
+            padded = np.full((n + length - 1, len(_BAR_COLUMNS)), np.nan)
+            padded[length - 1:] = self.frame[_BAR_COLUMNS].iloc[:n].to_numpy(dtype=np.float64)
+            head = self._windows[length] = sliding_window_view(padded, length, axis=0).transpose(0, 2, 1)
+        return head[i]
+
+    def position_on_or_before(self, date: Date) -> int:
+        """Position of the latest tick on or before a date"""
+        i = int(self.dates.searchsorted(_as_int(date), side="right")) - 1
+        if i < 0:
+            raise IndexError(f"No data on or before {Date(date)}")
+        return i
+
+    def position_of(self, date: Date, freq: str) -> int:
+        """Position of the tick falling exactly on a date"""
+        ts = _as_int(date)
+        i = int(self.dates.searchsorted(ts, side="left"))
+        if i == len(self.dates) or self.dates[i] != ts:
+            raise ValueError(f"{Date(date)} is not a {freq} tick")
+        return i
+
+
+def _as_int(date: Date) -> int:
+    """Converts a date-like to integer nanoseconds since the epoch, comparable with _TickIndex.dates"""
+    return Date(date).as_timestamp.value
@@ -0,0 +1,68 @@
+"""
+Fast typed csv ingestion and compact in-memory representations of tick data
+"""
+# standard lib
+from typing import *
+import os
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['read_csv_fast', 'compact', 'volume_step']
+
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+DTYPES = {"Date": str, "Open": np.float64, "High": np.float64, "Low": np.float64, "Close": np.float64, "Volume": np.float64}
+
+_UINT32_MAX = np.iinfo(np.uint32).max
+
+
+def read_csv_fast(csv_path: os.PathLike) -> pd.DataFrame:
+    """
+    Reads and cleans a yfinance-style csv in one pass. Only the Date and OHLCV columns are parsed, with explicit dtypes
+    and a fixed date format, and no Date_str column is produced. Rows with missing values or a zero open or
+    close are dropped, as in DataModel._clean
+
+    :returns pd.DataFrame, indexed by date with columns Open, High, Low, Close, Volume, Date
+    """
+    df = pd.read_csv(csv_path, usecols=list(DTYPES), dtype=DTYPES)
+
+    values = df[COLUMNS].to_numpy()
+    keep = ~np.isnan(values).any(axis=1) & df["Date"].notna().to_numpy()
+    keep &= (values[:, 0] != 0) & (values[:, 3] != 0)
+
+    index = pd.DatetimeIndex(pd.to_datetime(df["Date"].str.slice(0, 10)[keep], format="%Y-%m-%d"), name="Date")
+    data = {c: values[keep, i] for i, c in enumerate(COLUMNS)}
+    data["Volume"] = data["Volume"].astype(np.int64)
+
+    df = pd.DataFrame(data, index=index)
+    df["Date"] = index
+    return df
+
+
+def compact(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts prices to float32 and volume to uint32, halving the memory of a frame. Volumes too large for uint32
+    are divided by a power of ten, stored in df.attrs['volume_scale']: shares = Volume * volume_scale
+    """
+    out = df.astype({c: np.float32 for c in COLUMNS[:4]})
+
+    volume = df["Volume"].to_numpy()
+    scale = df.attrs.get("volume_scale", 1)
+    if volume.dtype != np.uint32:
+        step = volume_step(np.nanmax(volume) if len(volume) else 0)
+        out["Volume"] = np.rint(volume / step).astype(np.uint32)
+        scale *= step
+
+    out.attrs["volume_scale"] = scale
+    return out
+
+
+def volume_step(peak: float) -> int:
+    """The smallest power of ten that a volume peak can be divided by to fit uint32"""
+    step = 1
+    while peak / step > _UINT32_MAX:
+        step *= 10
+    return step
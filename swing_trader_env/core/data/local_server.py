@@ -0,0 +1,200 @@
+"""
+A local HTTP server serving canned bars, standing in for a remote data provider so that HTTPDataSource can be
+exercised and benchmarked offline
+"""
+# standard lib
+from typing import *
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+import random
+import threading
+import time
+import zlib
+
+# local
+from swing_trader_env.core.data.resample import resample, is_frequency
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['LocalBarServer', 'synthetic_bars']
+
+
+def synthetic_bars(ticker: str, freq: str = "daily", n_days: int = 2520, end: str = "2024-12-31") -> pd.DataFrame:
+    """
+    A deterministic geometric random walk seeded by the ticker, as a yfinance-style frame with a Date column.
+    Frequencies other than daily are resampled from the daily bars
+
+    n_days: int, number of business days ending on end
+    """
+    rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+    index = pd.DatetimeIndex(pd.bdate_range(end=end, periods=n_days), name="Date")
+
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))
+    open_ = close * (1 + rng.normal(0, 0.003, n_days))
+    df = pd.DataFrame({
+        "Open": open_,
+        "High": np.maximum(open_, close) * 1.01,
+        "Low": np.minimum(open_, close) * 0.99,
+        "Close": close,
+        "Volume": rng.integers(100_000, 10_000_000, n_days).astype(np.float64),
+    }, index=index)
+
+    if freq != "daily":
+        df = resample(df, freq)[["Open", "High", "Low", "Close", "Volume"]]
+
+    df.insert(0, "Date", df.index.strftime("%Y-%m-%d 00:00:00-05:00"))
+    return df.reset_index(drop=True)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # the default backlog of 5 drops connections when many clients open at once
+
+
+class LocalBarServer:
+    """
+    Serves csv bars on localhost from a background thread, in the layout HTTPDataSource requests by default:
+
+        GET /{freq}/{ticker}.csv            one ticker
+        GET /{freq}?tickers=AAPL,MSFT       several tickers in one csv with a Ticker column
+
+        with LocalBarServer(latency=0.02) as server:
+            HTTPDataSource(server.url, concurrency=64).refresh(tickers, ["daily"], data_path)
+
+    Bars come from `frames` when given, otherwise every ticker is served the same canned synthetic_bars, generated
+    once per frequency so that serving stays cheap. Tickers in `missing` answer 404. latency and error_rate simulate
+    a slow and flaky provider; connections are kept alive.
+    """
+
+    def __init__(
+            self,
+            frames: Optional[Dict[Tuple[str, str], pd.DataFrame]] = None,
+            latency: float = 0.0,
+            error_rate: float = 0.0,
+            missing: Iterable[str] = (),
+            n_days: int = 2520,
+            port: int = 0,
+    ):
+        """
+        frames: Dict[Tuple[str, str], pd.DataFrame], canned yfinance-style frames keyed by (ticker, freq)
+        latency: float, seconds each response is delayed by
+        error_rate: float, probability of answering 503 instead of the bars
+        missing: Iterable[str], tickers that do not exist
+        n_days: int, length of the synthetic daily history
+        port: int, port to listen on. 0 picks a free one
+        """
+        self.frames = dict(frames or {})
+        self.latency = latency
+        self.error_rate = error_rate
+        self.missing = set(missing)
+        self.n_days = n_days
+
+        self.requests = 0
+        self.connections = 0
+        self._canned: Dict[str, pd.DataFrame] = {}
+        self._bodies: Dict[Tuple[str, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._httpd = _Server(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def frame(self, ticker: str, freq: str) -> Optional[pd.DataFrame]:
+        """The frame served for a ticker and frequency, or None if it does not exist"""
+        if ticker in self.missing or not is_frequency(freq):
+            return None
+        if (ticker, freq) in self.frames:
+            return self.frames[(ticker, freq)]
+        if freq not in self._canned:
+            self._canned[freq] = synthetic_bars("canned", freq, n_days=self.n_days)
+        return self._canned[freq]
+
+    def _body(self, ticker: str, freq: str) -> Optional[bytes]:
+        if ticker in self.missing or not is_frequency(freq):
+            return None
+        key = (ticker, freq) if (ticker, freq) in self.frames else ("canned", freq)
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is None:
+                body = self._bodies[key] = self.frame(ticker, freq).to_csv(index=False).encode()
+        return body
+
+    def _batch_body(self, tickers: List[str], freq: str) -> bytes:
+        frames = []
+        for ticker in tickers:
+            df = self.frame(ticker, freq)
+            if df is not None:
+                frames.append(df.assign(Ticker=ticker))
+        if len(frames) == 0:
+            return b"Ticker,Date,Open,High,Low,Close,Volume\n"
+        return pd.concat(frames).to_csv(index=False).encode()
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True  # headers and body are written separately
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.error_rate and random.random() < server.error_rate:
+                    return self._respond(503, b"unavailable")
+
+                url = urlsplit(self.path)
+                parts = [unquote(p) for p in url.path.strip("/").split("/")]
+                query = parse_qs(url.query)
+
+                body = None
+                if len(parts) == 1 and "tickers" in query:
+                    body = server._batch_body(query["tickers"][0].split(","), parts[0])
+                elif len(parts) == 2 and parts[1].endswith(".csv"):
+                    body = server._body(parts[1][:-len(".csv")], parts[0])
+
+                if body is None:
+                    return self._respond(404, b"not found")
+                self._respond(200, body)
+
+            def _respond(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "LocalBarServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "LocalBarServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
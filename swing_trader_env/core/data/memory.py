@@ -0,0 +1,136 @@
+"""
+Process-wide accounting of the memory held by DataModels, with an optional budget enforced by evicting the least
+recently used ticker data
+"""
+# standard lib
+from typing import *
+from collections import OrderedDict
+import threading
+import weakref
+
+# external
+import pandas as pd
+
+
+__all__ = ['MemoryRegistry', 'registry', 'set_memory_budget', 'memory_report']
+
+
+class MemoryRegistry:
+    """
+    Tracks live DataModels in least-recently-used order along with the bytes each held when it last loaded data.
+    When a budget is set, loading data evicts the frames of the least recently used models until the tracked total
+    fits. Evicted frames are reloaded transparently on next access.
+
+    Totals are only tracked while a budget is set: setting one measures every live model, after which loads and
+    appends add the bytes they allocated and evictions re-measure the model. Columns attached to frames by hand
+    (e.g. indicators) are picked up at the model's next measurement; memory_report always measures exactly.
+    """
+
+    budget: Optional[int]  # bytes, None for unlimited
+
+    def __init__(self):
+        self.budget = None
+        self._models: "OrderedDict[int, weakref.ref]" = OrderedDict()
+        self._nbytes: Dict[int, int] = {}
+        self._lock = threading.RLock()  # models may be loaded concurrently, see DataModel.load_many
+
+    def register(self, data_model: "DataModel") -> None:
+        key = id(data_model)
+        with self._lock:
+            self._models[key] = weakref.ref(data_model, lambda _, key=key: self._forget(key))
+            self._nbytes[key] = 0
+
+    def _forget(self, key: int) -> None:
+        with self._lock:
+            self._models.pop(key, None)
+            self._nbytes.pop(key, None)
+
+    def models(self) -> List["DataModel"]:
+        """Live registered models, least recently used first"""
+        with self._lock:
+            refs = list(self._models.values())
+        return [m for m in (ref() for ref in refs) if m is not None]
+
+    def touch(self, data_model: "DataModel") -> None:
+        """Marks a model as most recently used"""
+        key = id(data_model)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+
+    def total(self) -> int:
+        """Tracked bytes across all live models"""
+        with self._lock:
+            return sum(self._nbytes.values())
+
+    def measure(self, data_model: "DataModel") -> None:
+        """Re-measures the bytes held by a model"""
+        nbytes = int(data_model.memory_usage().sum())
+        with self._lock:
+            if id(data_model) in self._models:
+                self._nbytes[id(data_model)] = nbytes
+
+    def refresh(self, data_model: "DataModel", nbytes: Optional[int] = None) -> None:
+        """
+        Accounts for data a model loaded or appended and enforces the budget, sparing that model. Without a budget
+        the model is only marked as most recently used
+
+        nbytes: int, the bytes the model grew by. The model is re-measured when omitted
+        """
+        self.touch(data_model)
+        if self.budget is None:
+            return
+
+        if nbytes is None:
+            self.measure(data_model)
+        with self._lock:
+            if nbytes is not None and id(data_model) in self._models:
+                self._nbytes[id(data_model)] += nbytes
+            self.enforce(keep=data_model)
+
+    def enforce(self, keep: Optional["DataModel"] = None) -> int:
+        """
+        Evicts least recently used models until the tracked total is within budget
+
+        keep: DataModel, a model that must not be evicted, e.g. the one currently loading
+        :returns int, bytes freed
+        """
+        freed = 0
+        for data_model in self.models():
+            if self.budget is None or self.total() <= self.budget:
+                break
+            if data_model is keep:
+                continue
+
+            before = self._nbytes.get(id(data_model), 0)
+            data_model.evict()
+            freed += before - self._nbytes.get(id(data_model), 0)
+        return freed
+
+    def report(self) -> pd.DataFrame:
+        """
+        Measured bytes of every live model, one row per ticker, frequency and item. kind is one of
+        'column' (OHLCV and date columns), 'indicator' (any other column), 'index' or 'cache'
+        """
+        frames = [m.memory_usage() for m in self.models()]
+        if len(frames) == 0:
+            return pd.DataFrame(columns=["ticker", "freq", "kind", "name", "bytes"])
+        return pd.concat(frames).reset_index()
+
+
+registry = MemoryRegistry()
+
+
+def set_memory_budget(nbytes: Optional[int]) -> None:
+    """Sets the process-wide DataModel memory budget in bytes. None disables eviction"""
+    if nbytes is not None and registry.budget is None:  # totals are not tracked without a budget
+        for data_model in registry.models():
+            registry.measure(data_model)
+    registry.budget = nbytes
+    if nbytes is not None:
+        registry.enforce()
+
+
+def memory_report() -> pd.DataFrame:
+    """Bytes held per ticker, frequency, column and cache across all live DataModels. See MemoryRegistry.report"""
+    return registry.report()
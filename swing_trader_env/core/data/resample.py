@@ -0,0 +1,119 @@
+"""
+Derives coarser bar frequencies from daily bars in memory
+"""
+# standard lib
+from typing import *
+import re
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['parse_frequency', 'is_frequency', 'bucket_starts', 'bucket_labels', 'resample']
+
+
+_NAMED = {"daily": (1, "d"), "weekly": (1, "w"), "monthly": (1, "m")}
+_SPEC = re.compile(r"^([1-9][0-9]*)([dwm])$")
+
+
+def parse_frequency(freq: str) -> Tuple[int, str]:
+    """
+    Parses a frequency spec into (n, unit) where unit is one of d (trading days), w (weeks), m (months)
+
+        'daily' -> (1, 'd'), 'weekly' -> (1, 'w'), 'monthly' -> (1, 'm')
+        '3d' -> (3, 'd'), '2w' -> (2, 'w'), '6m' -> (6, 'm')
+    """
+    if freq in _NAMED:
+        return _NAMED[freq]
+
+    match = _SPEC.match(freq) if isinstance(freq, str) else None
+    if match is None:
+        raise ValueError(f"Unrecognized frequency '{freq}'. Expected one of {list(_NAMED)} or a spec like '3d', '2w', '6m'")
+    return int(match.group(1)), match.group(2)
+
+
+def is_frequency(freq: str) -> bool:
+    """Whether a string is a valid frequency spec"""
+    try:
+        parse_frequency(freq)
+    except ValueError:
+        return False
+    return True
+
+
+def bucket_starts(dates: np.ndarray, freq: str) -> np.ndarray:
+    """
+    Positions of the first daily bar of each bucket of a frequency
+
+    N-day buckets count trading days from the first bar. N-week buckets are Monday-based and N-month buckets are
+    calendar months, both counted from the epoch so bucket edges do not depend on where the data starts
+
+    dates: np.ndarray, sorted datetime64 dates of the daily bars
+    """
+    n, unit = parse_frequency(freq)
+    if len(dates) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    if unit == "d":
+        return np.arange(0, len(dates), n)
+
+    if unit == "w":
+        days = dates.astype("datetime64[D]").view(np.int64)
+        ids = (days + 3) // 7  # 1970-01-01 was a Thursday, so this counts Monday-based weeks
+    else:
+        ids = dates.astype("datetime64[M]").view(np.int64)
+
+    ids = ids // n
+    return np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+
+
+def bucket_labels(dates: np.ndarray, freq: str) -> np.ndarray:
+    """
+    Calendar start of the bucket each date falls in: the Monday of N-week buckets and the 1st of N-month buckets,
+    trading day or not, as weekly and monthly csv bars are labeled. N-day buckets have no calendar start, so their
+    dates are returned as they are
+
+    dates: np.ndarray, datetime64 dates
+    """
+    n, unit = parse_frequency(freq)
+    if unit == "w":
+        weeks = (dates.astype("datetime64[D]").view(np.int64) + 3) // 7 // n * n
+        return (weeks * 7 - 3).astype("datetime64[D]")
+    if unit == "m":
+        months = dates.astype("datetime64[M]").view(np.int64) // n * n
+        return months.astype("datetime64[M]").astype("datetime64[D]")
+    return dates
+
+
+def resample(daily: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """
+    Aggregates cleaned daily bars into a coarser frequency with vectorized reductions: first open, max high,
+    min low, last close and summed volume. Each bar is labeled with the date of its first trading day
+
+    daily: pd.DataFrame, cleaned daily bars indexed by date
+    freq: str, a frequency spec understood by parse_frequency
+    """
+    if daily.empty:
+        return daily.copy()
+
+    starts = bucket_starts(daily.index.to_numpy(), freq)
+    ends = np.r_[starts[1:], len(daily)] - 1
+
+    volume = daily["Volume"].to_numpy()
+    if "volume_scale" in daily.attrs:  # compact volumes are summed in shares so the totals cannot overflow uint32
+        volume = volume.astype(np.int64) * daily.attrs["volume_scale"]
+
+    index = daily.index[starts]
+    df = pd.DataFrame({
+        "Open": daily["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(daily["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(daily["Low"].to_numpy(), starts),
+        "Close": daily["Close"].to_numpy()[ends],
+        "Volume": np.add.reduceat(volume, starts),
+    }, index=index)
+
+    if "Date_str" in daily:
+        df["Date_str"] = daily["Date_str"].to_numpy()[starts]
+    df["Date"] = index
+    return df
@@ -0,0 +1,140 @@
+"""
+Publishes DataModel frames into shared memory so process-pool workers can attach to them without copying
+"""
+# standard lib
+from typing import *
+from multiprocessing import shared_memory
+
+# local
+from swing_trader_env.core.data.data_model import DataModel
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['SharedDataModel']
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Attaches to an existing block without registering it for cleanup in this process, where supported"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # python < 3.13
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedDataModel:
+    """
+    A picklable handle to DataModel frames published in shared memory. The parent publishes once, then sends the
+    handle to workers, which attach read-only DataModels backed by the same pages:
+
+        with SharedDataModel.publish(DataModel("AAPL", ["daily", "weekly"])) as shared:
+            pool.map(run_backtest, [shared] * n_jobs)
+
+        def run_backtest(shared):
+            env = SingleStockEnv("AAPL", "2020-03-20", 10000, data=shared.attach())
+
+    Each frequency lives in one block holding its dates followed by one contiguous array per column. Only numeric
+    and datetime columns are published - string columns such as Date_str are dropped. Dates are published as
+    datetime64[ns], so the attached index and the tick index built over it also view the block rather than copying.
+    The publishing handle owns the blocks and unlinks them on close; attached models must not outlive it.
+    """
+
+    ticker: str
+    layouts: Dict[str, Dict[str, Any]]  # per frequency: block name, length and (column, dtype, offset) triples
+
+    def __init__(self, ticker: str, layouts: Dict[str, Dict[str, Any]]):
+        self.ticker = ticker
+        self.layouts = layouts
+        self._owned: List[shared_memory.SharedMemory] = []
+
+    @classmethod
+    def publish(cls, data_model: DataModel, freqs: Optional[List[str]] = None) -> "SharedDataModel":
+        """
+        Copies frames of a DataModel into new shared memory blocks
+
+        freqs: List[str], frequencies to publish. Defaults to the model's frequencies plus 'daily', which the price lookups need
+        """
+        if freqs is None:
+            freqs = list(dict.fromkeys(["daily"] + data_model.freqs))
+
+        owned, layouts = [], {}
+        try:
+            for freq in freqs:
+                shm, layout = cls._publish_frame(getattr(data_model, freq))
+                owned.append(shm)
+                layouts[freq] = layout
+        except BaseException:
+            for shm in owned:
+                shm.close()
+                shm.unlink()
+            raise
+
+        shared = cls(data_model.ticker, layouts)
+        shared._owned = owned
+        return shared
+
+    @staticmethod
+    def _publish_frame(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+        """Writes one frame into a new block and returns the block with its layout"""
+        arrays = [("__index__", df.index.to_numpy().astype("datetime64[ns]"))]
+        for c in df.columns:
+            values = df[c].to_numpy()
+            if isinstance(values, np.ndarray) and values.dtype.kind in "iufbM":
+                arrays.append((str(c), values))
+
+        columns, offset = [], 0
+        for name, values in arrays:
+            offset = -(-offset // values.dtype.alignment) * values.dtype.alignment
+            columns.append((name, values.dtype.str, offset))
+            offset += values.nbytes
+
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (name, dtype, offset), (_, values) in zip(columns, arrays):
+            np.ndarray(values.shape, dtype=dtype, buffer=shm.buf, offset=offset)[:] = values
+
+        return shm, {"name": shm.name, "length": len(df), "columns": columns, "attrs": dict(df.attrs)}
+
+    def attach(self) -> DataModel:
+        """
+        Builds a DataModel whose frames are read-only views of the shared blocks. Safe to call in any process
+        """
+        frames, blocks = {}, []
+        for freq, layout in self.layouts.items():
+            shm = _open_shared_memory(layout["name"])
+            blocks.append(shm)
+
+            views = {}
+            for name, dtype, offset in layout["columns"]:
+                view = np.ndarray((layout["length"],), dtype=dtype, buffer=shm.buf, offset=offset)
+                view.flags.writeable = False
+                views[name] = view
+
+            index = pd.DatetimeIndex(views.pop("__index__"), name="Date", copy=False)
+            df = pd.DataFrame(views, index=index, copy=False)
+            df.attrs.update(layout["attrs"])
+            frames[freq] = df
+
+        data_model = DataModel.from_frames(self.ticker, frames)
+        data_model._shared_memory = blocks  # keeps the mappings alive for as long as the model is
+        return data_model
+
+    def close(self) -> None:
+        """Releases and unlinks the blocks owned by this handle. No-op on unpickled copies"""
+        for shm in self._owned:
+            shm.close()
+            shm.unlink()
+        self._owned = []
+
+    def __enter__(self) -> "SharedDataModel":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"ticker": self.ticker, "layouts": self.layouts}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["ticker"], state["layouts"])
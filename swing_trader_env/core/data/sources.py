@@ -0,0 +1,409 @@
+"""
+Remote data sources. A DataSource fetches raw yfinance-style bars for tickers that are missing or stale locally
+and writes them through to the data directory DataModel reads from
+"""
+# standard lib
+from typing import *
+from urllib.parse import urlsplit, quote
+import abc
+import asyncio
+import io
+import os
+import random
+import ssl
+import threading
+import time
+
+# local
+from swing_trader_env.core.data.data_model import NoDataException
+
+# external
+import pandas as pd
+
+
+__all__ = ['DataSource', 'HTTPDataSource', 'DataSourceError', 'write_through']
+
+
+class DataSourceError(Exception):
+    pass
+
+
+def write_through(data_path: os.PathLike, ticker: str, freq: str, bars: Union[bytes, pd.DataFrame]) -> str:
+    """
+    Writes fetched bars to {data_path}/{freq}/{ticker}-{freq}.csv, the layout DataModel reads. The write is atomic,
+    and the csv's new modification time invalidates any sidecar cache built from an older version
+
+    bars: bytes|pd.DataFrame, csv contents or a yfinance-style frame with a Date column
+
+    :returns str, the csv path
+    """
+    directory = os.path.join(data_path, freq)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{ticker}-{freq}.csv")
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    if isinstance(bars, pd.DataFrame):
+        bars.to_csv(tmp_path, index=False)
+    else:
+        with open(tmp_path, "wb") as f:
+            f.write(bars)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _to_csv(df: pd.DataFrame) -> bytes:
+    return df.to_csv(index=False).encode()
+
+
+class DataSource(abc.ABC):
+    """
+    Base class for asynchronous sources of raw bars. Subclasses implement fetch; fetch_many fans requests out
+    concurrently and refresh wraps it for synchronous callers such as DataModel
+    """
+
+    concurrency: int = 32  # maximum requests in flight
+
+    @abc.abstractmethod
+    async def fetch(self, ticker: str, freq: str) -> pd.DataFrame:
+        """
+        Fetches the bars of one ticker and frequency
+
+        :returns pd.DataFrame, yfinance-style frame with a Date column and Open, High, Low, Close, Volume,
+            in the same format as the csv files DataModel reads
+        """
+        raise NotImplementedError
+
+    async def fetch_csv(self, ticker: str, freq: str) -> bytes:
+        """
+        Fetches the bars of one ticker and frequency as csv contents. Sources that receive csv should override this
+        to skip parsing and re-serializing the data when it is only written through to disk
+        """
+        df = await self.fetch(ticker, freq)
+        return await asyncio.get_running_loop().run_in_executor(None, _to_csv, df)
+
+    async def fetch_batch(
+            self,
+            tickers: List[str],
+            freq: str,
+            csv: bool = False,
+    ) -> Dict[str, Union[pd.DataFrame, bytes, Exception]]:
+        """
+        Fetches several tickers of one frequency, as frames or as csv contents. Sources with a multi-ticker endpoint
+        override this
+        """
+        fetch = self.fetch_csv if csv else self.fetch
+        results = await asyncio.gather(*[fetch(t, freq) for t in tickers], return_exceptions=True)
+        return dict(zip(tickers, results))
+
+    async def open(self) -> None:
+        """Acquires resources such as connection pools. Called by fetch_many"""
+
+    async def close(self) -> None:
+        """Releases resources acquired by open"""
+
+    async def __aenter__(self) -> "DataSource":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _batches(self, tickers: List[str]) -> List[List[str]]:
+        return [[t] for t in tickers]
+
+    async def fetch_many(
+            self,
+            tickers: Iterable[str],
+            freqs: List[str],
+            data_path: Optional[os.PathLike] = None,
+    ) -> Dict[Tuple[str, str], Union[pd.DataFrame, str, Exception]]:
+        """
+        Fetches every ticker and frequency with at most `concurrency` requests in flight. Failures are returned in
+        place of the result rather than raised, so one bad ticker does not abort the refresh
+
+        data_path: PathLike, write the bars through to csv files in this data directory instead of returning frames
+        :returns Dict[Tuple[str, str], pd.DataFrame|str|Exception], frames, or the csv paths written to data_path,
+            keyed by (ticker, freq)
+        """
+        tickers = list(tickers)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        results = {}
+
+        async def run(batch: List[str], freq: str) -> None:
+            async with semaphore:
+                try:
+                    fetched = await self.fetch_batch(batch, freq, csv=data_path is not None)
+                except Exception as e:
+                    fetched = {t: e for t in batch}
+
+            for ticker, result in fetched.items():
+                if data_path is not None and not isinstance(result, Exception):
+                    try:
+                        result = await loop.run_in_executor(None, write_through, data_path, ticker, freq, result)
+                    except OSError as e:
+                        result = e
+                results[(ticker, freq)] = result
+
+        await self.open()
+        try:
+            await asyncio.gather(*[run(batch, f) for f in freqs for batch in self._batches(tickers)])
+        finally:
+            await self.close()
+        return results
+
+    def refresh(
+            self,
+            tickers: Iterable[str],
+            freqs: List[str],
+            data_path: os.PathLike,
+    ) -> Dict[Tuple[str, str], Union[str, Exception]]:
+        """
+        Synchronous fetch_many that writes through to data_path, returning the csv paths written or the errors
+        raised. Must not be called from a running event loop
+        """
+        return asyncio.run(self.fetch_many(tickers, freqs, data_path=data_path))
+
+
+class _RateLimiter:
+    """
+    Token bucket allowing `rate` acquisitions per second with bursts of up to `burst`. Thread-safe, so event loops
+    running on several threads share one limit
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+class _ConnectionPool:
+    """
+    A pool of persistent HTTP/1.1 connections to one host. Connections are reused across requests as long as the
+    server keeps them alive, so a refresh of thousands of tickers pays for a handful of TCP/TLS handshakes
+    """
+
+    def __init__(self, host: str, port: int, size: int, use_ssl: bool):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def get(self, path: str, timeout: float) -> Tuple[int, bytes]:
+        """Performs a GET request and returns the status code and body"""
+        async with self._semaphore:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=self.ssl), timeout)
+
+            try:
+                status, keep_alive, body = await asyncio.wait_for(self._roundtrip(reader, writer, path), timeout)
+            except BaseException:
+                writer.close()
+                raise
+
+            if keep_alive:
+                self._idle.append((reader, writer))
+            else:
+                writer.close()
+            return status, body
+
+    async def _roundtrip(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, path: str) -> Tuple[int, bool, bytes]:
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nConnection: keep-alive\r\nAccept-Encoding: identity\r\n\r\n".encode()
+        )
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by server")
+        version, status = status_line.split()[:2]
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        keep_alive = version == b"HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+        if "content-length" in headers:
+            body = await reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            body = b"".join(chunks)
+        else:
+            body = await reader.read()
+            keep_alive = False
+
+        return int(status), keep_alive, body
+
+    async def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
+
+
+class HTTPDataSource(DataSource):
+    """
+    Fetches csv bars over HTTP with pooled keep-alive connections, a request rate limit, and retries with
+    exponential backoff on connection errors, 429 and 5xx responses. A 404 is reported as NoDataException.
+
+        source = HTTPDataSource("http://localhost:8000", concurrency=64, rate_limit=200)
+        source.refresh(tickers, ["daily"], data_path="data")
+
+    Single tickers are requested from `path_template`. With batch_size > 1, tickers are requested in groups from
+    `batch_template`, which must return one csv with a Ticker column.
+
+    Every event loop the source is used from gets its own connection pool, opened by the first open and closed by
+    the last matching close on that loop, so refreshes may run concurrently on several threads. The rate limit is
+    shared by all of them.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            path_template: str = "/{freq}/{ticker}.csv",
+            batch_template: str = "/{freq}?tickers={tickers}",
+            batch_size: int = 1,
+            concurrency: int = 32,
+            rate_limit: Optional[float] = None,
+            retries: int = 3,
+            backoff: float = 0.25,
+            timeout: float = 30.0,
+    ):
+        """
+        base_url: str, scheme, host and port of the server, e.g. 'http://localhost:8000'
+        path_template: str, path of a single ticker's csv, formatted with ticker and freq
+        batch_template: str, path of a multi-ticker csv, formatted with a comma separated tickers list and freq
+        batch_size: int, tickers per request. 1 uses path_template
+        concurrency: int, maximum requests in flight, which is also the connection pool size
+        rate_limit: float, optional maximum requests per second
+        retries: int, attempts after the first one for retryable failures
+        backoff: float, seconds before the first retry, doubled on each further attempt
+        timeout: float, seconds allowed per request attempt
+        """
+        url = urlsplit(base_url)
+        self.scheme = url.scheme or "http"
+        self.host = url.hostname
+        self.port = url.port or (443 if self.scheme == "https" else 80)
+        self.prefix = url.path.rstrip("/")
+
+        self.path_template = path_template
+        self.batch_template = batch_template
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        self.requests = 0  # attempts made, including retries
+        self._sessions: Dict[asyncio.AbstractEventLoop, List] = {}  # event loop -> [connection pool, open count]
+        self._lock = threading.Lock()
+        self._limiter = _RateLimiter(rate_limit) if rate_limit else None
+
+    async def open(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None:
+                pool = _ConnectionPool(self.host, self.port, self.concurrency, use_ssl=self.scheme == "https")
+                session = self._sessions[loop] = [pool, 0]
+            session[1] += 1
+
+    async def close(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._sessions.get(loop)
+            if session is None:
+                return
+            session[1] -= 1
+            if session[1] > 0:
+                return
+            del self._sessions[loop]
+        await session[0].close()
+
+    async def _get(self, path: str) -> bytes:
+        """GET with rate limiting and retries. Returns the body of a 200 response"""
+        session = self._sessions.get(asyncio.get_running_loop())
+        if session is None:
+            raise DataSourceError("HTTPDataSource must be opened first, e.g. with 'async with source:'")
+        pool = session[0]
+
+        for attempt in range(self.retries + 1):
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            with self._lock:
+                self.requests += 1
+
+            try:
+                status, body = await pool.get(self.prefix + path, self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                error = DataSourceError(f"GET {path} failed: {e!r}")
+            else:
+                if status == 200:
+                    return body
+                if status == 404:
+                    raise NoDataException(f"No data! {path}")
+                error = DataSourceError(f"GET {path} returned {status}")
+                if status != 429 and status < 500:
+                    raise error
+
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt * (1 + 0.1 * random.random()))
+        raise error
+
+    async def fetch_csv(self, ticker: str, freq: str) -> bytes:
+        return await self._get(self.path_template.format(ticker=quote(ticker), freq=quote(freq)))
+
+    async def fetch(self, ticker: str, freq: str) -> pd.DataFrame:
+        body = await self.fetch_csv(ticker, freq)
+        return await asyncio.get_running_loop().run_in_executor(None, pd.read_csv, io.BytesIO(body))
+
+    def _batches(self, tickers: List[str]) -> List[List[str]]:
+        return [tickers[i:i + self.batch_size] for i in range(0, len(tickers), self.batch_size)]
+
+    async def fetch_batch(
+            self,
+            tickers: List[str],
+            freq: str,
+            csv: bool = False,
+    ) -> Dict[str, Union[pd.DataFrame, bytes, Exception]]:
+        if self.batch_size <= 1:
+            return await super().fetch_batch(tickers, freq, csv=csv)
+
+        path = self.batch_template.format(tickers=",".join(quote(t) for t in tickers), freq=quote(freq))
+        body = await self._get(path)
+        df = await asyncio.get_running_loop().run_in_executor(None, pd.read_csv, io.BytesIO(body))
+
+        results = {t: NoDataException(f"No data! {t} - {freq}") for t in tickers}
+        for ticker, group in df.groupby("Ticker", sort=False):
+            group = group.drop(columns="Ticker").reset_index(drop=True)
+            results[ticker] = _to_csv(group) if csv else group
+        return results
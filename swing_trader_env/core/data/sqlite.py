@@ -0,0 +1,151 @@
+"""
+SQLite storage backend for tick data. Bars are keyed by (ticker, freq, date) so date ranges can be read
+without parsing a ticker's whole history
+"""
+# standard lib
+from typing import *
+import sqlite3
+import os
+
+# local
+from swing_trader_env.core.utils import Date
+from swing_trader_env.core.data.data_model import DataModel
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['SQLiteStore']
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    ticker TEXT NOT NULL,
+    freq TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    volume REAL NOT NULL,
+    PRIMARY KEY (ticker, freq, date)
+) WITHOUT ROWID
+"""
+
+
+class SQLiteStore:
+    """
+    Stores cleaned OHLCV bars of many tickers and frequencies in a single SQLite file. Dates are stored as integer
+    nanoseconds since the epoch, and every read is a range scan over the (ticker, freq, date) primary key
+
+        store = SQLiteStore("data/bars.sqlite")
+        store.ingest_data_model(DataModel("AAPL", ["daily", "weekly"]))
+        data = DataModel.from_sqlite(store, "AAPL", ["daily"], start="2020-01-01", end="2021-12-31")
+    """
+
+    COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+    path: str  # the database file, or ':memory:'
+
+    def __init__(self, path: os.PathLike = ":memory:"):
+        self.path = str(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def ingest(self, ticker: str, freq: str, df: pd.DataFrame) -> int:
+        """
+        Writes the bars of a cleaned, date-indexed frame in a single transaction. Existing bars on the same dates are replaced
+
+        :returns int, the number of bars written
+        """
+        dates = df.index.to_numpy().astype("datetime64[ns]").view(np.int64).tolist()
+        values = df[self.COLUMNS].to_numpy(dtype=np.float64).tolist()
+        rows = [(ticker, freq, d, *v) for d, v in zip(dates, values)]
+
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def ingest_data_model(self, data_model: DataModel, freqs: Optional[List[str]] = None) -> int:
+        """Writes the listed frequencies of a DataModel, by default those it was constructed with"""
+        if freqs is None:
+            freqs = data_model.freqs
+        return sum(self.ingest(data_model.ticker, f, getattr(data_model, f)) for f in freqs)
+
+    def load(
+            self,
+            ticker: str,
+            freq: str,
+            start: Optional[Date] = None,
+            end: Optional[Date] = None,
+            last: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        Reads bars in the cleaned DataModel layout. Bounds are inclusive and evaluated by SQLite
+
+        start: Date, optional earliest date
+        end: Date, optional latest date
+        last: int, optional - only the last N bars within the bounds
+        """
+        query = "SELECT date, open, high, low, close, volume FROM bars WHERE ticker = ? AND freq = ?"
+        params = [ticker, freq]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(Date(start).as_timestamp.value)
+        if end is not None:
+            query += " AND date <= ?"
+            params.append(Date(end).as_timestamp.value)
+
+        if last is None:
+            rows = self._conn.execute(query + " ORDER BY date", params).fetchall()
+        else:
+            rows = self._conn.execute(query + " ORDER BY date DESC LIMIT ?", params + [last]).fetchall()[::-1]
+
+        if len(rows) == 0:
+            return pd.DataFrame(columns=self.COLUMNS + ["Date_str", "Date"], index=pd.DatetimeIndex([], name="Date"))
+
+        array = np.array(rows, dtype=np.float64)
+        index = pd.DatetimeIndex(np.array([r[0] for r in rows], dtype="datetime64[ns]"), name="Date")
+
+        df = pd.DataFrame(array[:, 1:], index=index, columns=self.COLUMNS)
+        df["Date_str"] = index.strftime("%Y-%m-%d")
+        df["Date"] = index
+        return df
+
+    def clear(self, ticker: Optional[str] = None, freq: Optional[str] = None) -> int:
+        """
+        Evicts stored bars - everything, a ticker, a frequency, or one ticker's frequency
+
+        :returns int, the number of bars deleted
+        """
+        query = "DELETE FROM bars WHERE 1 = 1"
+        params = []
+        if ticker is not None:
+            query += " AND ticker = ?"
+            params.append(ticker)
+        if freq is not None:
+            query += " AND freq = ?"
+            params.append(freq)
+
+        with self._conn:
+            deleted = self._conn.execute(query, params).rowcount
+        return deleted
+
+    def tickers(self, freq: Optional[str] = None) -> List[str]:
+        """The tickers with stored bars, optionally only those of a given frequency"""
+        if freq is None:
+            rows = self._conn.execute("SELECT DISTINCT ticker FROM bars ORDER BY ticker")
+        else:
+            rows = self._conn.execute("SELECT DISTINCT ticker FROM bars WHERE freq = ? ORDER BY ticker", [freq])
+        return [r[0] for r in rows]
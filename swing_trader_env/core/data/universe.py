@@ -0,0 +1,155 @@
+"""
+Universe Data stores the bars of many tickers as one aligned (ticker, time, field) array
+"""
+# standard lib
+from typing import *
+from typing_extensions import Self
+import json
+import os
+
+# local
+from swing_trader_env.core.data.data_model import DataModel, NoDataException
+
+# external
+import pandas as pd
+import numpy as np
+
+
+__all__ = ['UniverseData']
+
+
+class UniverseData:
+    """
+    OHLCV bars of many tickers laid out on a shared trading-day axis as one float array of shape (ticker, time, field).
+    Bars a ticker does not have (before listing, after delisting, gaps) are NaN and flagged False in the validity mask.
+
+    The store can live in memory or in a directory of .npy files, in which case it is memory mapped: opening is
+    instant and pages are only read from disk when touched.
+
+        universe = UniverseData.build([DataModel(t, ["daily"]) for t in tickers], path="data/universe")
+        universe = UniverseData.open("data/universe")
+        closes = universe.field("Close")  # (ticker, time) view
+    """
+
+    FIELDS = ["Open", "High", "Low", "Close", "Volume"]
+
+    tickers: List[str]  # tickers in slot order
+    freq: str  # the frequency of the bars
+    dates: np.ndarray  # (time,) datetime64[ns], the shared trading-day axis
+    bars: np.ndarray  # (ticker, time, field) bar values
+    valid: np.ndarray  # (ticker, time) whether the ticker has a bar on that date
+
+    def __init__(self, tickers: List[str], dates: np.ndarray, bars: np.ndarray, valid: np.ndarray, freq: str = "daily"):
+        assert bars.shape == (len(tickers), len(dates), len(self.FIELDS)), "bars must be shaped (ticker, time, field)"
+        assert valid.shape == bars.shape[:2], "valid must be shaped (ticker, time)"
+
+        self.tickers = list(tickers)
+        self.freq = freq
+        self.dates = dates
+        self.bars = bars
+        self.valid = valid
+        self._slots = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._slots
+
+    @classmethod
+    def build(
+            cls,
+            data_models: Iterable[DataModel],
+            freq: str = "daily",
+            path: Optional[os.PathLike] = None,
+            dtype: np.dtype = np.float64,
+    ) -> Self:
+        """
+        Aligns the bars of several DataModels onto the union of their dates
+
+        data_models: Iterable[DataModel], one per ticker, each with the frequency loaded
+        freq: str, the frequency to take from each DataModel
+        path: PathLike, optional directory to write the store to. The returned store is memory mapped from it
+        dtype: np.dtype, the float type of the bar array
+        """
+        data_models = list(data_models)
+        if len(data_models) == 0:
+            raise NoDataException("Cannot build a universe without tickers")
+
+        frames = [getattr(dm, freq) for dm in data_models]
+        frame_dates = [df.index.to_numpy().astype("datetime64[ns]") for df in frames]
+        dates = np.unique(np.concatenate(frame_dates))
+
+        shape = (len(frames), len(dates), len(cls.FIELDS))
+        if path is None:
+            bars = np.full(shape, np.nan, dtype=dtype)
+            valid = np.zeros(shape[:2], dtype=bool)
+        else:
+            os.makedirs(path, exist_ok=True)
+            bars = np.lib.format.open_memmap(os.path.join(path, "bars.npy"), mode="w+", dtype=dtype, shape=shape)
+            bars[:] = np.nan
+            valid = np.lib.format.open_memmap(os.path.join(path, "valid.npy"), mode="w+", dtype=bool, shape=shape[:2])
+
+        for i, (df, df_dates) in enumerate(zip(frames, frame_dates)):
+            positions = dates.searchsorted(df_dates)
+            bars[i, positions] = df[cls.FIELDS].to_numpy(dtype=dtype)
+            valid[i, positions] = True
+
+        tickers = [dm.ticker for dm in data_models]
+        if path is None:
+            return cls(tickers, dates, bars, valid, freq=freq)
+
+        bars.flush()
+        valid.flush()
+        np.save(os.path.join(path, "dates.npy"), dates)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"tickers": tickers, "freq": freq, "fields": cls.FIELDS}, f)
+
+        del bars, valid
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: os.PathLike, mode: str = "r") -> Self:
+        """
+        Memory maps a store written by UniverseData.build
+
+        mode: str, numpy memmap mode. 'r' for read-only, 'r+' to modify the bars in place
+        """
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["fields"] != cls.FIELDS:
+            raise ValueError(f"Unexpected universe fields {meta['fields']}")
+
+        return cls(
+            tickers=meta["tickers"],
+            dates=np.load(os.path.join(path, "dates.npy")),
+            bars=np.load(os.path.join(path, "bars.npy"), mmap_mode=mode),
+            valid=np.load(os.path.join(path, "valid.npy"), mmap_mode=mode),
+            freq=meta["freq"],
+        )
+
+    def slot(self, ticker: str) -> int:
+        """Index of a ticker along the first axis"""
+        return self._slots[ticker]
+
+    def field(self, name: str) -> np.ndarray:
+        """(ticker, time) view of a single field, e.g. 'Close'"""
+        return self.bars[:, :, self.FIELDS.index(name)]
+
+    def data_model(self, ticker: str) -> DataModel:
+        """
+        A DataModel over one ticker's valid bars. Dates the ticker has no bar on are not ticks of the model. The
+        frame wraps the underlying array without copying, unless interior gaps in the ticker's history must be dropped
+        """
+        i = self.slot(ticker)
+        valid = np.flatnonzero(self.valid[i])
+        if len(valid) == 0:
+            raise NoDataException(f"No data! {ticker} - {self.freq}")
+        lo, hi = valid[0], valid[-1] + 1
+        rows = slice(lo, hi) if len(valid) == hi - lo else valid
+
+        index = pd.DatetimeIndex(self.dates[rows], name="Date")
+        df = pd.DataFrame(self.bars[i, rows], index=index, columns=self.FIELDS, copy=False)
+        df["Date"] = index
+
+        return DataModel.from_frames(ticker, {self.freq: df})
@@ -1,2 +1,2 @@
-from swing_trader_env.core.indicators.common import sma, macd, ema, macd_hist, atr, vwap, obv, bollinger_lower, bollinger_upper
+from swing_trader_env.core.indicators.common import sma, macd, ema, macd_hist, atr, vwap, obv, bollinger_lower, bollinger_upper, rsi, stochastic_oscillator
 
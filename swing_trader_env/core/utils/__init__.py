@@ -1,2 +1,3 @@
 from swing_trader_env.core.utils.date import Date
-from swing_trader_env.core.utils.performance import revenue
\ No newline at end of file
+from swing_trader_env.core.utils.performance import revenue
+from swing_trader_env.core.utils.instrument import instruments, enable_instrumentation, disable_instrumentation, instrumentation_summary, write_chrome_trace
\ No newline at end of file
@@ -0,0 +1,204 @@
+"""
+Process-wide, opt-in timers and counters for the hot paths of the environments and the data model. Instrumented
+code checks instruments.enabled before doing any work, so instrumentation costs a single attribute check while it
+is disabled
+"""
+# standard lib
+from typing import *
+from time import perf_counter_ns
+import json
+import os
+import threading
+
+# external
+import pandas as pd
+
+
+__all__ = ['Instruments', 'instruments', 'enable_instrumentation', 'disable_instrumentation', 'instrumentation_summary', 'write_chrome_trace']
+
+
+class _Span:
+    """Times a block of code as one call of a named timer"""
+    __slots__ = ("_instruments", "_name", "_start")
+
+    def __init__(self, instruments: "Instruments", name: str):
+        self._instruments = instruments
+        self._name = name
+
+    def __enter__(self) -> "_Span":
+        self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._instruments.record(self._name, self._start, perf_counter_ns() - self._start)
+
+
+class _NullSpan:
+    """Stands in for a span while instrumentation is disabled"""
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Phases:
+    """
+    Times the consecutive phases of one call: each mark records the time since the previous mark, or since the
+    phases were started, under '{prefix}.{phase}'
+    """
+    __slots__ = ("_instruments", "_prefix", "_last")
+
+    def __init__(self, instruments: "Instruments", prefix: str):
+        self._instruments = instruments
+        self._prefix = prefix
+        self._last = perf_counter_ns()
+
+    def mark(self, phase: str) -> None:
+        now = perf_counter_ns()
+        self._instruments.record(f"{self._prefix}.{phase}", self._last, now - self._last)
+        self._last = now
+
+
+class Instruments:
+    """
+    Named timers and counters. Timers keep the number of calls and the total, minimum and maximum duration of each
+    name; with trace set, every timed call is also kept as an event for write_chrome_trace, up to max_events.
+
+        enable_instrumentation(trace=True)
+        for _ in range(1000):
+            env.step()
+        print(instrumentation_summary())
+        write_chrome_trace("step.json")  # open in chrome://tracing or ui.perfetto.dev
+
+    Instrumented code follows the pattern
+
+        phases = instruments.phases("SingleStockEnv.step") if instruments.enabled else None
+        ...
+        if phases is not None:
+            phases.mark("fill")
+
+    or, outside of hot paths, `with instruments.span("DataModel.read_csv"):`, which is a no-op while disabled.
+    """
+
+    enabled: bool  # whether instrumented code records anything
+    trace: bool  # whether timed calls are kept as trace events
+    max_events: int  # the maximum number of trace events kept
+
+    def __init__(self):
+        self.enabled = False
+        self.trace = False
+        self.max_events = 1_000_000
+        self._lock = threading.Lock()  # data may be loaded from several threads, see DataModel.load_many
+        self._origin = perf_counter_ns()
+        self.reset()
+
+    def reset(self) -> None:
+        """Discards everything recorded so far"""
+        with self._lock:
+            self._timers: Dict[str, List[int]] = {}  # name -> [calls, total, min, max] nanoseconds
+            self._counters: Dict[str, int] = {}
+            self._events: List[Tuple[str, int, int, int]] = []  # (name, start, duration, thread)
+
+    def enable(self, trace: bool = False, max_events: Optional[int] = None) -> None:
+        self.trace = trace
+        if max_events is not None:
+            self.max_events = max_events
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Adds n to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def record(self, name: str, start: int, duration: int) -> None:
+        """Records one call of a timer, in perf_counter_ns nanoseconds"""
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is None:
+                self._timers[name] = [1, duration, duration, duration]
+            else:
+                timer[0] += 1
+                timer[1] += duration
+                if duration < timer[2]:
+                    timer[2] = duration
+                if duration > timer[3]:
+                    timer[3] = duration
+
+            if self.trace and len(self._events) < self.max_events:
+                self._events.append((name, start, duration, threading.get_ident()))
+
+    def span(self, name: str) -> _Span|_NullSpan:
+        """A context manager timing its block under name. Does nothing while disabled"""
+        return _Span(self, name) if self.enabled else _NULL_SPAN
+
+    def phases(self, prefix: str) -> Phases:
+        """Starts timing the phases of a call, see Phases"""
+        return Phases(self, prefix)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        One row per timer and counter, indexed by name. kind is 'timer' or 'counter', calls the number of timed
+        calls or the value of the counter. Durations are in microseconds, total in milliseconds
+        """
+        with self._lock:
+            timers = {name: list(timer) for name, timer in self._timers.items()}
+            counters = dict(self._counters)
+
+        rows = [
+            {"name": name, "kind": "timer", "calls": calls, "total_ms": total / 1e6, "mean_us": total / calls / 1e3, "min_us": lo / 1e3, "max_us": hi / 1e3}
+            for name, (calls, total, lo, hi) in sorted(timers.items())
+        ]
+        rows += [{"name": name, "kind": "counter", "calls": value} for name, value in sorted(counters.items())]
+        columns = ["name", "kind", "calls", "total_ms", "mean_us", "min_us", "max_us"]
+        return pd.DataFrame(rows, columns=columns).set_index("name")
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """
+        The trace events and final counter values in the Chrome trace-event format, loadable by chrome://tracing
+        and ui.perfetto.dev. Only holds timed calls made while trace was set
+        """
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self._counters)
+
+        pid = os.getpid()
+        trace = [
+            {"name": name, "cat": name.split(".")[0], "ph": "X", "ts": (start - self._origin) / 1e3, "dur": duration / 1e3, "pid": pid, "tid": tid}
+            for name, start, duration, tid in events
+        ]
+        end = max([e["ts"] + e["dur"] for e in trace], default=0.0)
+        trace += [{"name": name, "ph": "C", "ts": end, "pid": pid, "args": {"value": value}} for name, value in counters.items()]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+
+instruments = Instruments()
+
+
+def enable_instrumentation(trace: bool = False, max_events: Optional[int] = None) -> None:
+    """Starts recording timers and counters, and with trace, trace events. See Instruments"""
+    instruments.enable(trace=trace, max_events=max_events)
+
+
+def disable_instrumentation() -> None:
+    """Stops recording. What was recorded is kept until instruments.reset()"""
+    instruments.disable()
+
+
+def instrumentation_summary() -> pd.DataFrame:
+    """Calls and durations of every timer and the value of every counter. See Instruments.summary"""
+    return instruments.summary()
+
+
+def write_chrome_trace(path: os.PathLike) -> None:
+    """Writes the recorded trace events as Chrome trace-event JSON. See Instruments.chrome_trace"""
+    with open(path, "w") as f:
+        json.dump(instruments.chrome_trace(), f)
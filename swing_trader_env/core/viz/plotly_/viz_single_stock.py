@@ -23,7 +23,7 @@ def viz_single_stock(
     events: List[BuyEvent|SellEvent],
     start_date: datetime,
     end_date: datetime,
-    
+    equity: pd.DataFrame|None = None,
 ) -> plotly.graph_objects.Figure:
     """
     Visualization function for buy and sell actions performed on a single stock
@@ -33,6 +33,7 @@ def viz_single_stock(
     events: List[BuyEvent|SellEvent], the list of filled buy and sell orders
     start_date: Date, the start date of the plot
     end_date: Date, the end date of the plot
+    equity: pd.DataFrame, optional net worth by date to plot on a secondary axis, e.g. TradeLedger.equity_frame()
 
     :returns plotly.graph_objects.Figure
     """
@@ -132,6 +133,17 @@ def viz_single_stock(
 
     ])
 
+    # Add the equity curve
+    if equity is not None:
+        fig.add_trace(go.Scatter(
+            x=equity.index,
+            y=equity["net_worth"],
+            mode="lines",
+            name="net worth",
+            yaxis="y2",
+        ))
+        fig.update_layout(yaxis2=dict(overlaying="y", side="right", title="net worth"))
+
     return fig
 
 
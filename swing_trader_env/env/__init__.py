@@ -1,2 +1,8 @@
 from swing_trader_env.env.single_stock import SingleStockEnv
-from swing_trader_env.env.portfolio import PortfolioEnv
\ No newline at end of file
+from swing_trader_env.env.portfolio import PortfolioEnv
+from swing_trader_env.env.vector import VectorSingleStockEnv
+from swing_trader_env.env.subproc import SubprocVectorEnv
+from swing_trader_env.env.backtest import backtest, BacktestResult
+from swing_trader_env.env.sampler import EpisodeSampler
+from swing_trader_env.env.features import IndicatorEnv
+from swing_trader_env.env.rewards import Reward, make_reward
\ No newline at end of file
@@ -0,0 +1,149 @@
+# standard lib
+from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+
+# local imports
+from swing_trader_env.types import BuyEvent, SellEvent
+from swing_trader_env.core.utils import Date
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.data.resample import is_frequency
+
+# external import
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class BacktestResult:
+    """
+    Trajectories of one or more backtests over the same ticks. Arrays of a batch of backtests have a leading
+    dimension with one row per order sequence. Position 0 holds the state at the start date, position k the state
+    after the k-th step, as SingleStockEnv would report it
+    """
+    ticker: str
+    principal: float
+    dates: np.ndarray  # (T + 1,) datetime64[ns] tick dates, starting at the start date
+    orders: np.ndarray  # (..., T) signed share orders, the k-th filled at the open of dates[k + 1]
+    fill_prices: np.ndarray  # (T,) the open price each step's order fills at
+    close_prices: np.ndarray  # (T + 1,) the close price of each tick
+    cash: np.ndarray  # (..., T + 1) the amount of cash
+    shares_held: np.ndarray  # (..., T + 1) the number of shares held
+    net_worth: np.ndarray  # (..., T + 1) liquid funds and assets
+    valid: np.ndarray  # (...,) whether every order of a sequence could be filled. Only False with invalid_orders='flag'
+
+    @property
+    def performance(self) -> np.ndarray:
+        """(...,) the final net worth relative to the principal"""
+        return self.net_worth[..., -1] / self.principal
+
+    def events(self, row: int|None = None) -> List[BuyEvent|SellEvent]:
+        """
+        The BuyEvent and SellEvent ledger of a backtest, one event per nonzero order
+
+        row: int, which backtest of a batch to build the ledger of
+        """
+        orders = self.orders if row is None else self.orders[row]
+        assert orders.ndim == 1, "pass the row of a batch of backtests to build events for"
+
+        events = []
+        for k in np.flatnonzero(orders):
+            event = BuyEvent if orders[k] > 0 else SellEvent
+            events.append(event(
+                ticker=self.ticker,
+                shares=abs(float(orders[k])),
+                price=float(self.fill_prices[k]),
+                date=pd.Timestamp(self.dates[k + 1]).to_pydatetime(),
+            ))
+        return events
+
+
+def backtest(
+        data_model: DataModel,
+        orders: np.ndarray,
+        freq: str = "daily",
+        principal: float = 10000,
+        start: str|datetime|Date|None = None,
+        target: bool = False,
+        invalid_orders: str = "raise",
+) -> BacktestResult:
+    """
+    Backtests whole sequences of orders at once, with the rules of SingleStockEnv: the order of each step is entered
+    after a close, filled at the next tick's open and the portfolio valued at that tick's close. Buying beyond the
+    available cash or selling more shares than held is invalid. The trajectories are computed with cumulative
+    array operations that perform the same floating point operations as stepping the env, so results match it exactly
+
+        signal = (fast_sma > slow_sma).astype(float)  # (combinations, T) from precomputed indicators
+        result = backtest(data, 10 * signal, start=start, target=True)
+        best = result.performance.argmax()
+
+    data_model: DataModel, the data of the ticker to trade
+    orders: (T,) or (combinations, T) array of signed share orders per step (positive buys, negative sells), or of the
+        shares to hold after each step if target is set
+    freq: str, the trading frequency. One of [daily, weekly, monthly] or a custom spec like '3d', '2w'
+    principal: float, the starting cash amount
+    start: Date, the tick the backtest starts from. Defaults to the first tick with a daily bar on or before it
+    target: bool, interpret orders as target holdings rather than orders
+    invalid_orders: str, 'raise' an AssertionError on the first invalid order as SingleStockEnv does, or 'flag'
+        sequences containing one as not valid. The trajectories of those sequences are not meaningful
+
+    :returns BacktestResult
+    """
+    assert is_frequency(freq), "frequency must be one of 'daily','weekly','monthly' or a spec like '3d', '2w'"
+    assert principal > 0, "principal must be non-negative"
+    assert invalid_orders in ("raise", "flag"), "invalid_orders must be one of 'raise', 'flag'"
+
+    orders = np.asarray(orders, dtype=np.float64)
+    if target:
+        orders = np.diff(orders, axis=-1, prepend=0.0)
+    n_steps = orders.shape[-1]
+
+    # the ticks of the episode
+    dates, open_prices, close_prices = data_model.tick_prices(freq)
+    first = int(np.argmax(~np.isnan(close_prices)))
+    if start is not None:
+        ts = Date(start).as_timestamp.value
+        first = int(dates.searchsorted(ts))
+        if first == len(dates) or dates[first] != ts:
+            raise ValueError(f"{Date(start)} is not a {freq} tick")
+    if first < len(dates) and np.isnan(close_prices[first]):
+        raise ValueError(f"{Date(pd.Timestamp(dates[first]))} precedes the first daily bar of {data_model.ticker}")
+    if first + n_steps >= len(dates):
+        raise IndexError(f"{n_steps} ticks after {Date(pd.Timestamp(dates[first]))} is out of bounds for {data_model.ticker} - {freq}")
+
+    dates = dates[first:first + n_steps + 1]
+    fill_prices = open_prices[first + 1:first + n_steps + 1]
+    close_prices = close_prices[first:first + n_steps + 1]
+
+    # cash and holdings after each step. Accumulating from the principal subtracts the fills in the env's order
+    shape = orders.shape[:-1]
+    values = np.concatenate([np.full(shape + (1,), float(principal)), fill_prices * orders], axis=-1)
+    cash = np.subtract.accumulate(values, axis=-1)
+    shares_held = np.add.accumulate(np.concatenate([np.zeros(shape + (1,)), orders], axis=-1), axis=-1)
+
+    # an order is valid if the holdings before it cover it
+    buys, sells = orders > 0, orders < 0
+    invalid = (buys & (cash[..., :-1] < values[..., 1:])) | (sells & (shares_held[..., :-1] < -orders))
+    valid = ~invalid.any(axis=-1)
+
+    if invalid_orders == "raise" and not valid.all():
+        k = np.argwhere(invalid)[0]
+        side = "buy" if buys[tuple(k)] else "sell"
+        reason = "insufficient funds" if side == "buy" else "insufficient shares held. Short selling is not permitted"
+        raise AssertionError(f"Unable to place {side} order on {Date(pd.Timestamp(dates[k[-1] + 1]))} - {reason}")
+
+    net_worth = shares_held * close_prices + cash
+    net_worth[..., 0] = principal
+
+    return BacktestResult(
+        ticker=data_model.ticker,
+        principal=principal,
+        dates=dates.view("datetime64[ns]"),
+        orders=orders,
+        fill_prices=fill_prices,
+        close_prices=close_prices,
+        cash=cash,
+        shares_held=shares_held,
+        net_worth=net_worth,
+        valid=valid,
+    )
@@ -0,0 +1,159 @@
+# standard lib
+from typing import Any, Dict, List, Tuple
+
+# local imports
+from swing_trader_env.env.base import BaseEnv
+from swing_trader_env.env.single_stock import SingleStockEnv
+from swing_trader_env.core.indicators.base import Indicator
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.utils import Date
+
+# external import
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+_BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class IndicatorEnv(BaseEnv):
+    """
+    Wraps a SingleStockEnv so that its observations include indicator values alongside the bars.
+
+    The indicators are computed once per data model over its whole frame, into one contiguous (time, features)
+    matrix, and every step returns a strided view of the lookback window ending at the current tick. Stepping
+    never touches pandas, so its cost does not depend on the number or the kind of indicators. Matrices are cached
+    per data model, so a wrapper switched between tickers by an EpisodeSampler computes each of them only once.
+
+    Indicators are NaN while they warm up. A reset moves a start date inside the warm-up period, or too close to it
+    for a full lookback window, forward to the first tick with a complete observation. See warmup for sampling
+    starts past it.
+
+        env = IndicatorEnv(SingleStockEnv("AAPL", "2010-01-04", 10000), [sma(50), rsi(14), macd_hist(12, 26, 9)])
+        obs = env.step(BuyAction("AAPL", 10))  # (lookback, 8) Open, High, Low, Close, Volume, sma-50, ...
+
+    Every other attribute, e.g. cash, net_worth or done, is that of the wrapped environment.
+    """
+
+    # public attributes
+    env: SingleStockEnv  # the wrapped environment
+    indicators: List[Indicator]  # the indicators, in feature order
+    features: List[str]  # the names of the columns of an observation
+    lookback: int  # the number of ticks in an observation
+    include_bars: bool  # whether observations start with the Open, High, Low, Close, Volume columns
+
+    # private attributes
+    _matrices: Dict[int, Tuple[DataModel, pd.DataFrame, np.ndarray, int]]  # id of a data model -> (data model, frame, windows, warm-up)
+
+
+    def __init__(
+            self,
+            env: SingleStockEnv,
+            indicators: List[Indicator],
+            lookback: int|None = None,
+            include_bars: bool = True,
+    ):
+        """
+        env: SingleStockEnv, the environment to wrap
+        indicators: List[Indicator], indicator instances from swing_trader_env.core.indicators, e.g. [sma(50), rsi(14)]
+        lookback: int, the number of ticks in an observation. Defaults to that of the wrapped environment
+        include_bars: bool, include the Open, High, Low, Close, Volume columns before the indicators
+        """
+        assert indicators or include_bars, "an observation needs indicators or bars"
+        self.env = env
+        self.indicators = list(indicators)
+        self.lookback = lookback or env.lookback
+        self.include_bars = include_bars
+        self.features = (_BAR_COLUMNS if include_bars else []) + [_name(indicator) for indicator in self.indicators]
+        self._matrices = {}
+        self.reset()
+
+
+    def __getattr__(self, name: str) -> Any:
+        """The state of the wrapped environment, e.g. cash, net_worth, done"""
+        if "env" in self.__dict__:
+            return getattr(self.env, name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+    def _matrix(self, data: DataModel) -> Tuple[np.ndarray, int]:
+        """The (ticks, lookback, features) windows and the warm-up of a data model, computed on first use"""
+        frame = data._ticks(self.env.frequency).frame
+        cached = self._matrices.get(id(data))
+        if cached is not None and cached[1] is frame:
+            return cached[2], cached[3]
+
+        columns = [frame[_BAR_COLUMNS].to_numpy(dtype=np.float64)] if self.include_bars else []
+        columns += [indicator(frame).to_numpy(dtype=np.float64)[:, None] for indicator in self.indicators]
+        matrix = np.hstack(columns)
+
+        # the first tick at which every feature is defined
+        missing = np.isnan(matrix).any(axis=1)
+        warmup = int(np.argmin(missing)) if not missing.all() else len(matrix)
+
+        padded = np.full((len(matrix) + self.lookback - 1, matrix.shape[1]), np.nan)
+        padded[self.lookback - 1:] = matrix
+        windows = sliding_window_view(padded, self.lookback, axis=0).transpose(0, 2, 1)
+
+        # the data model is kept alongside its id, so the id cannot be reused while cached
+        self._matrices[id(data)] = (data, frame, windows, warmup)
+        return windows, warmup
+
+
+    def warmup(self, data: DataModel|None = None) -> int:
+        """
+        The number of ticks of a data model, the wrapped environment's by default, before its indicators are all
+        defined. Pass it to EpisodeSampler to only sample starts with complete observations
+
+            env = IndicatorEnv(SingleStockEnv("AAPL", "2010-01-04", 10000, data=pool[0]), indicators)
+            sampler = EpisodeSampler(pool, lookback=32, horizon=250, warmup=[env.warmup(d) for d in pool])
+            obs = sampler.reset(env)
+        """
+        return self._matrix(self.env._data if data is None else data)[1]
+
+
+    def reset(self) -> np.ndarray:
+        """
+        Resets the wrapped environment, moving its start date past the warm-up of the indicators if needed.
+        Returns the first observation
+        """
+        env = self.env
+        data = env._data
+        first = self.warmup(data) + self.lookback - 1
+        if data.tick_position(env.frequency, env.start_date) < first:
+            dates = data._ticks(env.frequency).dates
+            if first >= len(dates):
+                raise ValueError(f"{data.ticker} has no {env.frequency} tick with {self.lookback} ticks of defined indicators")
+            env.set_start_date(Date(pd.Timestamp(dates[first])))
+
+        env.reset()
+        return self.observe()
+
+
+    def observe(self) -> np.ndarray:
+        """
+        A read-only (lookback, features) view of the features over the latest ticks, see features for the columns.
+        NaN-padded before the start of the data
+        """
+        env = self.env
+        windows = self._matrix(env._data)[0]
+        return windows[env._data.tick_position(env.frequency, env.cur_date)]
+
+
+    def step(self, action: Any = None) -> np.ndarray:
+        """
+        Steps the wrapped environment. Returns the observation at the new date, see observe
+        """
+        self.env.step(action)
+        return self.observe()
+
+
+    def render(self, mode: str = "plotly"):
+        self.env.render(mode=mode)
+
+
+def _name(indicator: Indicator) -> str:
+    """The column name of an indicator, following the {class_name}-{arg1}_{arg2} convention of the indicators module"""
+    args = "_".join(str(value) for value in vars(indicator).values())
+    return f"{type(indicator).__name__}-{args}" if args else type(indicator).__name__
@@ -0,0 +1,181 @@
+# standard lib
+from typing import Any, Dict, Tuple
+
+# local imports
+from swing_trader_env.env.single_stock import SingleStockEnv
+from swing_trader_env.env.sampler import EpisodeSampler
+from swing_trader_env.types import BuyAction, SellAction
+
+# external import
+import numpy as np
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:
+    raise ImportError("Cannot use the gymnasium wrapper - gymnasium has not been installed")
+
+
+class SingleStockGymEnv(gymnasium.Env):
+    """
+    Exposes a SingleStockEnv through the Gymnasium API with fixed-shape float32 observations. Requires the optional
+    gymnasium package.
+
+    The observation is a flat vector of 5 * lookback + 3 values, written into one preallocated buffer every step:
+
+        [0, 4 * lookback)               Open, High, Low, Close of the lookback window, relative to the current close - 1
+        [4 * lookback, 5 * lookback)    log volume of the window, relative to the current tick's volume
+        5 * lookback + 0                cash / net worth
+        5 * lookback + 1                value of the shares held / net worth
+        5 * lookback + 2                performance - 1
+
+    Ticks before the start of the data are 0. Every step returns a copy of the buffer, as Gymnasium requires; with
+    copy_obs=False the buffer itself is returned and overwritten by the next step, so copy it to keep an observation.
+
+    Actions are either continuous, a single value in [-1, 1] where a positive value buys with that fraction of the
+    cash and a negative one sells that fraction of the shares held, or discrete: 0 holds, 1 buys with trade_fraction
+    of the cash, 2 sells all shares. Buys are sized at the current close and capped at what the cash covers at the
+    next open, so they are always valid. Holding creates no action objects.
+
+    The reward is that of the wrapped environment, selected with its reward argument, e.g.
+    SingleStockEnv(..., reward="sharpe"). See swing_trader_env.env.rewards. An episode terminates when the
+    data runs out and is truncated after horizon steps. With a sampler, every reset starts a new random episode.
+
+        env = SingleStockGymEnv(SingleStockEnv("AAPL", "2010-01-04", 10000, reward="log_return"), horizon=250)
+        obs, info = env.reset()
+        obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+    """
+
+    metadata = {"render_modes": ["plotly"]}
+
+    # public attributes
+    env: SingleStockEnv  # the wrapped environment
+    sampler: EpisodeSampler|None  # optional source of random episodes for reset
+    horizon: int|None  # the maximum number of steps of an episode
+    discrete: bool  # whether actions are discrete
+    trade_fraction: float  # the fraction of the cash a discrete buy spends
+    copy_obs: bool  # whether to return a copy of the observation buffer
+
+    # private attributes
+    _obs: np.ndarray  # the observation buffer
+    _prices: np.ndarray  # (lookback, 4) view of the price part of _obs
+    _volume: np.ndarray  # (lookback,) view of the volume part of _obs
+    _account: np.ndarray  # (3,) view of the account part of _obs
+    _steps: int  # the number of steps taken this episode
+
+
+    def __init__(
+            self,
+            env: SingleStockEnv,
+            discrete: bool = False,
+            trade_fraction: float = 0.95,
+            horizon: int|None = None,
+            sampler: EpisodeSampler|None = None,
+            render_mode: str|None = None,
+            copy_obs: bool = True,
+    ):
+        """
+        env: SingleStockEnv, the environment to wrap. Must use the default 'window' observation
+        discrete: bool, use the discrete hold/buy/sell action space instead of the continuous one
+        trade_fraction: float, the fraction of the cash a discrete buy spends
+        horizon: int, optional maximum number of steps per episode
+        sampler: EpisodeSampler, optional pool of episodes to reset the environment onto
+        render_mode: str, 'plotly' or None
+        copy_obs: bool, return a copy of the observation buffer rather than the buffer itself
+        """
+        assert env.observation == "window", "the wrapped environment must use the 'window' observation"
+        self.env = env
+        self.discrete = discrete
+        self.trade_fraction = trade_fraction
+        self.horizon = horizon
+        self.sampler = sampler
+        self.render_mode = render_mode
+        self.copy_obs = copy_obs
+
+        lookback = env.lookback
+        self.observation_space = spaces.Box(-np.inf, np.inf, shape=(5 * lookback + 3,), dtype=np.float32)
+        if discrete:
+            self.action_space = spaces.Discrete(3)
+        else:
+            self.action_space = spaces.Box(-1.0, 1.0, shape=(1,), dtype=np.float32)
+
+        self._obs = np.zeros(5 * lookback + 3, dtype=np.float32)
+        self._prices = self._obs[:4 * lookback].reshape(lookback, 4)
+        self._volume = self._obs[4 * lookback:5 * lookback]
+        self._account = self._obs[5 * lookback:]
+        self._steps = 0
+
+
+    def reset(self, *, seed: int|None = None, options: Dict[str, Any]|None = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        Resets the wrapped environment, onto a newly sampled episode if there is a sampler
+        """
+        super().reset(seed=seed)
+        if self.sampler is None:
+            self.env.reset()
+        else:
+            if seed is not None:
+                self.sampler.seed(seed)
+            self.sampler.reset(self.env)
+
+        self._steps = 0
+        return self._observe(), self._info()
+
+
+    def step(self, action: np.ndarray|int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, Any]]:
+        """
+        Steps the wrapped environment with the order the action translates to
+        """
+        env = self.env
+        env.step(self._order(action))
+        self._steps += 1
+
+        reward = float(env.reward)
+        terminated = env.done
+        truncated = self.horizon is not None and self._steps >= self.horizon
+        return self._observe(), reward, terminated, truncated, self._info()
+
+
+    def _order(self, action: np.ndarray|int) -> BuyAction|SellAction|None:
+        """Translates an action to an order, or None to hold"""
+        env = self.env
+        if self.discrete:
+            fraction = (0.0, self.trade_fraction, -1.0)[int(action)]
+        else:
+            fraction = float(np.clip(action[0] if np.ndim(action) else action, -1.0, 1.0))
+
+        if fraction > 0 and env.cash > 0:
+            # size at the close, capped at what the cash covers at the next open
+            next_open = env._data.get_price_on_open(env._data.get_next_tick(env.frequency, env.cur_date))
+            shares = min(fraction * env.cash / env.cur_price, env.cash / next_open)
+            return BuyAction(ticker=env.ticker, shares=shares)
+        if fraction < 0 and env.shares_held > 0:
+            return SellAction(ticker=env.ticker, shares=-fraction * env.shares_held)
+        return None
+
+
+    def _observe(self) -> np.ndarray:
+        """Writes the current observation into the buffer"""
+        env = self.env
+        window = env.observe()
+
+        np.divide(window[:, :4], env.cur_price, out=self._prices, casting="same_kind")
+        self._prices -= 1
+
+        np.log1p(window[:, 4], out=self._volume, casting="same_kind")
+        self._volume -= self._volume[-1]
+        np.nan_to_num(self._obs[:5 * env.lookback], copy=False)
+
+        self._account[0] = env.cash / env.net_worth
+        self._account[1] = env.shares_held * env.cur_price / env.net_worth
+        self._account[2] = env.performance - 1
+        return self._obs.copy() if self.copy_obs else self._obs
+
+
+    def _info(self) -> Dict[str, Any]:
+        return {"net_worth": self.env.net_worth, "date": self.env.cur_date}
+
+
+    def render(self):
+        if self.render_mode == "plotly":
+            self.env.render(mode="plotly")
@@ -0,0 +1,281 @@
+# standard lib
+from typing import Any, Iterator, List, Tuple
+from datetime import datetime
+from itertools import islice
+
+# local imports
+from swing_trader_env.types import BuyAction, SellAction, BuyEvent, SellEvent
+
+# external import
+import numpy as np
+import pandas as pd
+
+
+_EPOCH = datetime(1970, 1, 1).toordinal()
+
+BUY = 1
+SELL = -1
+
+
+class _Columns:
+    """
+    Growable arrays of equal length. Once shared, rows are never modified, so a prefix of the arrays that was valid
+    when captured stays valid for as long as it is referenced
+    """
+    __slots__ = ("arrays", "written", "shared")
+
+    def __init__(self, dtypes: Tuple[Tuple[str, type], ...], capacity: int):
+        self.arrays = tuple(np.empty(capacity, dtype=dtype) for _, dtype in dtypes)
+        self.written = 0
+        self.shared = False  # whether rows may be referenced outside of the ledger, by a state, a copy or a view
+
+    def appendable(self, n: int, dtypes: Tuple[Tuple[str, type], ...]) -> "_Columns":
+        """
+        Columns to write row n to: these, if rows from n on are free to overwrite and there is room, otherwise a
+        copy of the first n rows
+        """
+        if n < len(self.arrays[0]) and (n == self.written or not self.shared):
+            self.written = n
+            return self
+
+        columns = _Columns(dtypes, max(2 * n, len(self.arrays[0]), 256))
+        for array, source in zip(columns.arrays, self.arrays):
+            array[:n] = source[:n]
+        columns.written = n
+        return columns
+
+
+class TradeLedger:
+    """
+    Columnar record of an episode: one row per filled order, with its date, side, shares and fill price, and one
+    row per tick, with the date, cash, shares held and net worth. Rows are appended to growable numpy arrays rather
+    than kept as objects, and export to DataFrames or Arrow tables without conversion. Dates are proleptic Gregorian
+    ordinals, see datetime.toordinal.
+
+    Capturing the ledger's state is O(1): rows that were captured are never overwritten, so a captured state keeps
+    viewing the arrays it was taken from. Appending after rolling back to an earlier state, or after a copy of the
+    ledger has appended to the same arrays, first copies the rows into fresh arrays. A reset keeps the arrays and
+    writes over them, unless they were captured, in which case the next episode starts in fresh arrays of the same
+    capacity.
+
+        ledger = env.ledger
+        ledger.trades_frame()  # date, side, shares, price
+        ledger.equity_frame()["net_worth"].plot()
+    """
+
+    TRADES = (("date", np.int64), ("side", np.int8), ("shares", np.float64), ("price", np.float64))
+    EQUITY = (("date", np.int64), ("cash", np.float64), ("shares_held", np.float64), ("net_worth", np.float64))
+
+    # private attributes
+    _trades: _Columns  # the arrays of filled orders
+    _n_trades: int  # the number of filled orders of the episode
+    _equity: _Columns  # the arrays of per-tick equity
+    _n_steps: int  # the number of equity rows of the episode
+
+
+    def __init__(self):
+        self._trades = _Columns(self.TRADES, 0)
+        self._equity = _Columns(self.EQUITY, 0)
+        self.reset()
+
+
+    def reset(self) -> None:
+        """
+        Starts a new, empty episode, keeping the capacity of the arrays. States captured before stay valid
+        """
+        self._n_trades = 0
+        self._n_steps = 0
+
+
+    def __copy__(self) -> "TradeLedger":
+        """A ledger sharing this one's rows, see state"""
+        ledger = TradeLedger.__new__(TradeLedger)
+        ledger.restore(self.state())
+        return ledger
+
+
+    def __len__(self) -> int:
+        """The number of filled orders"""
+        return self._n_trades
+
+
+    def record_trade(self, date: int, side: int, shares: float, price: float) -> None:
+        """
+        Appends a filled order
+
+        date: int, the ordinal of the fill date
+        side: int, BUY (1) or SELL (-1)
+        shares: float, the number of shares filled
+        price: float, the fill price
+        """
+        n = self._n_trades
+        columns = self._trades = self._trades.appendable(n, self.TRADES)
+        dates, sides, shares_, prices = columns.arrays
+        dates[n] = date
+        sides[n] = side
+        shares_[n] = shares
+        prices[n] = price
+        columns.written = self._n_trades = n + 1
+
+
+    def record_equity(self, date: int, cash: float, shares_held: float, net_worth: float) -> None:
+        """
+        Appends the equity at the close of a tick
+
+        date: int, the ordinal of the tick
+        """
+        n = self._n_steps
+        columns = self._equity = self._equity.appendable(n, self.EQUITY)
+        dates, cash_, shares_held_, net_worth_ = columns.arrays
+        dates[n] = date
+        cash_[n] = cash
+        shares_held_[n] = shares_held
+        net_worth_[n] = net_worth
+        columns.written = self._n_steps = n + 1
+
+
+    def trades(self) -> dict:
+        """Read-only views of the trade columns by name: date, side, shares, price"""
+        self._trades.shared = True
+        return _views(self._trades, self._n_trades, self.TRADES)
+
+
+    def equity(self) -> dict:
+        """Read-only views of the equity columns by name: date, cash, shares_held, net_worth"""
+        self._equity.shared = True
+        return _views(self._equity, self._n_steps, self.EQUITY)
+
+
+    def trades_frame(self) -> pd.DataFrame:
+        """
+        The filled orders as a DataFrame indexed by date, with side (1 buys, -1 sells), shares and price columns
+        """
+        return _frame(_views(self._trades, self._n_trades, self.TRADES))
+
+
+    def equity_frame(self) -> pd.DataFrame:
+        """
+        The equity at each tick as a DataFrame indexed by date, with cash, shares_held and net_worth columns
+        """
+        return _frame(_views(self._equity, self._n_steps, self.EQUITY))
+
+
+    def to_arrow(self, table: str = "trades") -> Any:
+        """
+        The 'trades' or 'equity' table as a pyarrow Table. Requires pyarrow to be installed
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Cannot export to arrow - pyarrow has not been installed")
+
+        assert table in ("trades", "equity"), "table must be one of 'trades', 'equity'"
+        columns = self.trades() if table == "trades" else self.equity()
+        columns["date"] = _datetimes(columns["date"])
+        return pa.table(columns)
+
+
+    def events(self, ticker: str) -> List[BuyEvent|SellEvent]:
+        """
+        The filled orders as BuyEvent and SellEvent objects
+
+        ticker: str, the ticker the orders traded
+        """
+        trades = _views(self._trades, self._n_trades, self.TRADES)
+        return [
+            (BuyEvent if side == BUY else SellEvent)(
+                ticker=ticker,
+                shares=float(shares),
+                price=float(price),
+                date=datetime.fromordinal(int(date)),
+            )
+            for date, side, shares, price in zip(trades["date"], trades["side"], trades["shares"], trades["price"])
+        ]
+
+
+    def state(self) -> tuple:
+        """The rows of the episode so far, see restore. O(1), rows are not copied"""
+        self._trades.shared = self._equity.shared = True
+        return self._trades, self._n_trades, self._equity, self._n_steps
+
+
+    def restore(self, state: tuple) -> None:
+        """Rolls the ledger back or forward to a state captured by state"""
+        self._trades, self._n_trades, self._equity, self._n_steps = state
+
+
+class ActionLog:
+    """
+    The buy and sell actions entered during an episode, in order. Capturing its state is O(1), as with the
+    TradeLedger: actions are appended to a list that is shared with captured states and copies, which only see its
+    first n entries. Appending after rolling back to an earlier state, or after a copy of the log has appended to
+    the same list, first copies those n entries into a fresh list
+    """
+    __slots__ = ("_items", "_n")
+
+    # private attributes
+    _items: List[BuyAction|SellAction]  # the actions, possibly followed by entries of other branches
+    _n: int  # the number of actions of the episode
+
+
+    def __init__(self):
+        self.reset()
+
+
+    def reset(self) -> None:
+        """Starts a new, empty episode. States captured before stay valid"""
+        self._items = []
+        self._n = 0
+
+
+    def __copy__(self) -> "ActionLog":
+        """A log sharing this one's actions, see state"""
+        log = ActionLog.__new__(ActionLog)
+        log.restore(self.state())
+        return log
+
+
+    def __len__(self) -> int:
+        return self._n
+
+
+    def __iter__(self) -> Iterator[BuyAction|SellAction]:
+        return islice(self._items, self._n)
+
+
+    def append(self, action: BuyAction|SellAction) -> None:
+        """Logs an entered action"""
+        if len(self._items) != self._n:  # entries past n belong to another branch
+            self._items = self._items[:self._n]
+        self._items.append(action)
+        self._n += 1
+
+
+    def state(self) -> tuple:
+        """The actions of the episode so far, see restore. O(1), actions are not copied"""
+        return self._items, self._n
+
+
+    def restore(self, state: tuple) -> None:
+        """Rolls the log back or forward to a state captured by state"""
+        self._items, self._n = state
+
+
+def _views(columns: _Columns, n: int, dtypes: Tuple[Tuple[str, type], ...]) -> dict:
+    views = {}
+    for (name, _), array in zip(dtypes, columns.arrays):
+        view = array[:n]
+        view.flags.writeable = False
+        views[name] = view
+    return views
+
+
+def _datetimes(ordinals: np.ndarray) -> np.ndarray:
+    """Converts date ordinals to datetime64[ns]"""
+    return (ordinals - _EPOCH).astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def _frame(columns: dict) -> pd.DataFrame:
+    """A DataFrame holding a copy of the columns"""
+    dates = pd.DatetimeIndex(_datetimes(columns.pop("date")), name="Date")
+    return pd.DataFrame(columns, index=dates, copy=True)
@@ -1,8 +1,274 @@
+# standard lib
+from typing import List
+from datetime import datetime
+
 # local imports
 from swing_trader_env.env.base import BaseEnv
+from swing_trader_env.env.rewards import Reward, make_reward
+from swing_trader_env.types import BuyAction, SellAction, MultiAction, BuyEvent, SellEvent
+from swing_trader_env.core.utils import Date
+from swing_trader_env.core.data import UniverseData
+
+# external import
+import pandas as pd
+import numpy as np
 
 
 class PortfolioEnv(BaseEnv):
     """
     Implements a portfolio environment, which manages stock portfolios
-    """
\ No newline at end of file
+
+    Holdings, cost basis and prices are arrays indexed by the ticker slots of a UniverseData, so filling orders and
+    valuing the portfolio are array operations whose cost does not depend on the number of positions held.
+    Orders are entered after a close and filled at the next tick's open, selling first to free up cash and then
+    buying. Positions are valued at the latest close a ticker has, so gaps in its history carry its price forward.
+
+        universe = UniverseData.build([DataModel(t, ["daily"]) for t in tickers])
+        env = PortfolioEnv(universe, "2020-03-20", 100000)
+        env.step(MultiAction([BuyAction("AAPL", 10), SellAction("MSFT", 5)]))
+    """
+
+    # public attributes
+    universe: UniverseData  # the bars of every tradable ticker
+    tickers: List[str]  # the tradable tickers, in slot order
+    cur_date: Date  # the current date of the simulation
+    start_date: Date  # the date that the simulation starts
+    principal: float  # the starting value of the portfolio
+    cash: float  # the amount of cash
+    holdings: np.ndarray  # (tickers,) the number of shares held of each ticker. Allows fractional
+    cost_basis: np.ndarray  # (tickers,) the total price paid for the shares held of each ticker
+    cur_prices: np.ndarray  # (tickers,) the latest closing price of each ticker, 0 before its first bar
+    net_worth: float  # your current net worth, including liquid funds and assets
+    performance: float  # net worth relative to the principal
+    lookback: int  # the number of ticks in an observation
+    invalid_orders: str  # 'raise' or 'skip'
+    reward: float  # the reward of the last step, 0 after a reset
+    reward_fn: Reward  # computes the reward of each step from the net worth
+
+    # private attributes
+    _open: np.ndarray  # (time, tickers) open prices, NaN where a ticker has no bar
+    _close: np.ndarray  # (time, tickers) latest close prices on or before each tick, 0 before a ticker's first bar
+    # both are views of the universe's bars when every ticker has a bar on every date
+    _t: int  # the current position on the universe's time axis
+    _start: int  # the position of the start date
+    _actions: List[BuyAction|SellAction]  # buy and sell actions
+    _events: List[BuyEvent|SellEvent]  # buy and sell events
+
+
+    def __init__(
+            self,
+            universe: UniverseData,
+            start_date: str|datetime|Date,
+            principal: float,
+            lookback: int = 32,
+            invalid_orders: str = "raise",
+            reward: str|Reward = "change",
+    ):
+        """
+        Constructs a portfolio trading environment
+
+        universe: UniverseData, the bars of the tradable tickers, at the frequency to trade
+        start_date: Date, the date that the simulation starts. Must be a date of the universe
+        principal: float, the starting cash amount
+        lookback: int, the number of ticks in an observation
+        invalid_orders: str, 'raise' an AssertionError on an invalid order as SingleStockEnv does, or 'skip' invalid
+            orders. Sells of more shares than held or of tickers without a bar are skipped; buys are filled in
+            slot order as long as the cash lasts
+        reward: str or Reward, the reward of a step, see swing_trader_env.env.rewards. One of [change, log_return,
+            sharpe, sortino, drawdown] or a Reward instance. Defaults to the change in net worth
+        """
+        assert invalid_orders in ("raise", "skip"), "invalid_orders must be one of 'raise', 'skip'"
+        assert lookback > 0, "lookback must be positive"
+        self.universe = universe
+        self.tickers = universe.tickers
+        self.lookback = lookback
+        self.invalid_orders = invalid_orders
+        self.reward_fn = make_reward(reward)
+        self.set_principal(principal)
+
+        if universe.valid.all():  # no gaps to mask or carry prices over
+            self._open = universe.field("Open").T
+            self._close = universe.field("Close").T
+        else:
+            # time-major price arrays, so that one tick's prices are contiguous
+            valid = np.ascontiguousarray(universe.valid.T)
+            self._open = np.where(valid, universe.field("Open").T, np.nan)
+
+            latest = np.where(valid, np.arange(len(universe.dates))[:, None], 0)
+            np.maximum.accumulate(latest, axis=0, out=latest)
+            self._close = np.take_along_axis(np.ascontiguousarray(universe.field("Close").T), latest, axis=0)
+            self._close[~np.logical_or.accumulate(valid, axis=0)] = 0
+
+        self.set_start_date(start_date)
+        self.reset()
+
+
+    def set_principal(self, principal: float) -> None:
+        """
+        Sets the principal amount when beginning the scenario
+        """
+        assert principal > 0, "principal must be non-negative"
+        self.principal = principal
+
+
+    def set_start_date(self, date: str|datetime|Date) -> None:
+        """
+        Set the start date of the simulation
+        """
+        date = Date(date)
+        ts = date.as_timestamp.to_datetime64().astype("datetime64[ns]")
+        start = int(self.universe.dates.searchsorted(ts))
+        if start == len(self.universe.dates) or self.universe.dates[start] != ts:
+            raise ValueError(f"{date} is not a {self.universe.freq} tick of the universe")
+
+        self.start_date = date
+        self._start = start
+
+
+    def reset(self):
+        """
+        Reset the simulation
+        """
+        # reset public attributes
+        self._t = self._start
+        self.cur_date = self.start_date
+        self.cash = self.net_worth = self.principal
+        self.performance = 1.0
+        self.holdings = np.zeros(len(self.tickers))
+        self.cost_basis = np.zeros(len(self.tickers))
+        self.cur_prices = self._close[self._t].copy()
+        self.reward = 0.0
+        self.reward_fn.reset(self.net_worth)
+
+        # reset private attributes
+        self._events = []
+        self._actions = []
+
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the current date is the last tick of the universe
+        """
+        return self._t >= len(self.universe.dates) - 1
+
+
+    def positions(self) -> pd.DataFrame:
+        """
+        The open positions, one row per ticker held, with shares, cost basis, price and market value
+        """
+        held = np.flatnonzero(self.holdings)
+        return pd.DataFrame({
+            "shares": self.holdings[held],
+            "cost_basis": self.cost_basis[held],
+            "price": self.cur_prices[held],
+            "value": self.holdings[held] * self.cur_prices[held],
+        }, index=pd.Index([self.tickers[i] for i in held], name="ticker"))
+
+
+    def observe(self) -> np.ndarray:
+        """
+        A read-only (tickers, lookback, 5) view of the Open, High, Low, Close, Volume bars of every ticker over the
+        latest ticks. Holds fewer ticks at the very start of the data. Missing bars are NaN
+        """
+        view = self.universe.bars[:, max(self._t + 1 - self.lookback, 0):self._t + 1]
+        view.flags.writeable = False
+        return view
+
+
+    def _orders(self, action: MultiAction|BuyAction|SellAction|np.ndarray|None) -> tuple:
+        """Converts an action to (tickers,) arrays of shares to sell and to buy"""
+        sells, buys = np.zeros(len(self.tickers)), np.zeros(len(self.tickers))
+        if action is None:
+            return sells, buys
+
+        if isinstance(action, np.ndarray):
+            assert action.shape == (len(self.tickers),), "order arrays must hold one signed order per ticker"
+            np.negative(action, out=sells, where=action < 0)
+            np.copyto(buys, action, where=action > 0)
+            return sells, buys
+
+        actions = action.actions if isinstance(action, MultiAction) else [action]
+        for a in actions:
+            a.date_entered = self.cur_date.as_datetime
+            self._actions.append(a)
+            orders = buys if isinstance(a, BuyAction) else sells
+            orders[self.universe.slot(a.ticker)] += a.shares
+        return sells, buys
+
+
+    def step(self, action: MultiAction|BuyAction|SellAction|np.ndarray|None = None) -> np.ndarray:
+        """
+        Steps the environment one tick forward, filling all orders at the next tick's open: sells first, then buys.
+        Returns the observation at the new date, see observe
+
+        action: Optional, a MultiAction, a single BuyAction or SellAction, or a (tickers,) array of signed share
+            orders (positive buys, negative sells) in slot order
+
+        :returns np.ndarray, (tickers, lookback, 5) bars
+        """
+        if self.done:
+            raise IndexError(f"1 ticks after {self.cur_date} is out of bounds for the universe")
+        sells, buys = self._orders(action)
+        open_prices = self._open[self._t + 1]
+
+        # sells - verify shares held and that the ticker trades on the next tick. No short selling
+        invalid = (sells > 0) & ((self.holdings < sells) | np.isnan(open_prices))
+        if invalid.any():
+            assert self.invalid_orders == "skip", f"Unable to place sell order for {self.tickers[np.argmax(invalid)]} - insufficient shares held or no bar on {self._next_date()}. Short selling is not permitted"
+            sells[invalid] = 0
+        sold = np.flatnonzero(sells)
+        proceeds = float(open_prices[sold] @ sells[sold])
+
+        # buys - verify the ticker trades on the next tick and the cash freed up by the sells covers the total cost
+        invalid = (buys > 0) & np.isnan(open_prices)
+        if invalid.any():
+            assert self.invalid_orders == "skip", f"Unable to place buy order for {self.tickers[np.argmax(invalid)]} - no bar on {self._next_date()}"
+            buys[invalid] = 0
+        bought = np.flatnonzero(buys)
+        costs = open_prices[bought] * buys[bought]
+        spent = np.cumsum(costs)
+        if len(bought) and spent[-1] > self.cash + proceeds:
+            assert self.invalid_orders == "skip", "Unable to place buy order - insufficient funds"
+            affordable = spent <= self.cash + proceeds
+            bought, costs, spent = bought[affordable], costs[affordable], spent[affordable]
+
+        # step the date forward and fill the orders at the open
+        self._t += 1
+        self.cur_date = Date(pd.Timestamp(self.universe.dates[self._t]))
+
+        if len(sold):
+            self.cost_basis[sold] *= 1 - sells[sold] / self.holdings[sold]
+            self.holdings[sold] -= sells[sold]
+            self.cash += proceeds
+            self._record(SellEvent, sold, sells, open_prices)
+
+        if len(bought):
+            self.holdings[bought] += buys[bought]
+            self.cost_basis[bought] += costs
+            self.cash -= float(spent[-1])
+            self._record(BuyEvent, bought, buys, open_prices)
+
+        # value the portfolio at the close
+        self.cur_prices = self._close[self._t].copy()
+        self.net_worth = float(self.holdings @ self.cur_prices) + self.cash
+        self.performance = self.net_worth / self.principal
+        self.reward = self.reward_fn(self.net_worth)
+
+        return self.observe()
+
+
+    def _next_date(self) -> Date:
+        return Date(pd.Timestamp(self.universe.dates[self._t + 1]))
+
+
+    def _record(self, event: type, slots: np.ndarray, shares: np.ndarray, prices: np.ndarray) -> None:
+        """Generates one event per filled ticker"""
+        date = self.cur_date.as_datetime
+        for i in slots:
+            self._events.append(event(
+                ticker=self.tickers[i],
+                shares=float(shares[i]),
+                price=float(prices[i]),
+                date=date,
+            ))
@@ -0,0 +1,209 @@
+# standard lib
+from typing import Any, Dict, Tuple
+import abc
+
+# external import
+import numpy as np
+
+
+class Reward(abc.ABC):
+    """
+    A Base class for reward signals. A reward is computed incrementally from the net worth after each step, with a
+    constant amount of work per step, so its cost does not grow with the length of the episode.
+
+    Rewards work on a single environment's float net worth as well as on the (N,) net worth array of a batched
+    environment, in which case every episode keeps its own running state and the reward is an (N,) array.
+
+    To create a reward, subclass this class, name the attributes holding its running state in _state and implement
+    _initial and __call__
+    """
+
+    _state: Tuple[str, ...] = ()  # names of the attributes holding the running state
+
+    @abc.abstractmethod
+    def _initial(self, net_worth: float|np.ndarray) -> Dict[str, Any]:
+        """The running state at the start of an episode, by attribute name"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def __call__(self, net_worth: float|np.ndarray) -> float|np.ndarray:
+        """
+        Updates the running state with the net worth after a step
+
+        net_worth: float or (N,) array, the net worth after the step
+
+        :returns float or (N,) array, the reward of the step
+        """
+        raise NotImplementedError
+
+    def masked(self, net_worth: np.ndarray, mask: np.ndarray) -> np.ndarray:
+        """
+        Updates the running state of only the episodes of a batch where mask is set, e.g. those not yet done.
+        Returns their rewards, and 0 for the others
+        """
+        if mask.all():
+            return self(net_worth)
+        state = self.state()
+        reward = self(net_worth)
+        for name, value in state.items():
+            setattr(self, name, np.where(mask, getattr(self, name), value))
+        return np.where(mask, reward, 0.0)
+
+    def reset(self, net_worth: float|np.ndarray, indices: np.ndarray|None = None) -> None:
+        """
+        Starts a new episode from a net worth, or only the episodes at indices of a batch
+        """
+        shape = np.shape(net_worth)
+        for name, value in self._initial(net_worth).items():
+            if indices is None:
+                setattr(self, name, np.full(shape, value, dtype=np.float64) if shape else float(value))
+            else:
+                getattr(self, name)[indices] = np.broadcast_to(value, shape)[indices]
+
+    def state(self) -> Dict[str, Any]:
+        """A copy of the running state, see restore"""
+        return {name: np.copy(getattr(self, name)) if np.ndim(getattr(self, name)) else getattr(self, name) for name in self._state}
+
+    def restore(self, state: Dict[str, Any]) -> None:
+        """Returns the running state to one captured by state"""
+        for name, value in state.items():
+            setattr(self, name, np.copy(value) if np.ndim(value) else value)
+
+
+class NetWorthChange(Reward):
+    """
+    The change in net worth over the step
+    """
+    _state = ("prev",)
+
+    def _initial(self, net_worth):
+        return {"prev": net_worth}
+
+    def __call__(self, net_worth):
+        reward = net_worth - self.prev
+        self.prev = net_worth
+        return reward
+
+
+class LogReturn(Reward):
+    """
+    The log return of the net worth over the step. Sums to the log return of the episode
+    """
+    _state = ("prev",)
+
+    def _initial(self, net_worth):
+        return {"prev": net_worth}
+
+    def __call__(self, net_worth):
+        reward = np.log(net_worth / self.prev)
+        self.prev = net_worth
+        return reward
+
+
+class DifferentialSharpe(Reward):
+    """
+    The change in the Sharpe ratio of the episode's returns, mean / standard deviation, caused by the step. Sums to
+    the Sharpe ratio of the episode. The mean and variance are kept with Welford's algorithm
+
+        (1) r_t = net_worth_t / net_worth_{t-1} - 1
+        (2) mean_t = mean_{t-1} + (r_t - mean_{t-1}) / t
+        (3) m2_t = m2_{t-1} + (r_t - mean_{t-1}) * (r_t - mean_t)
+        (4) sharpe_t = mean_t / sqrt(m2_t / t), 0 while the returns have no variance
+
+    """
+    _state = ("prev", "n", "mean", "m2", "ratio")
+
+    def _initial(self, net_worth):
+        return {"prev": net_worth, "n": 0, "mean": 0, "m2": 0, "ratio": 0}
+
+    def __call__(self, net_worth):
+        r = net_worth / self.prev - 1
+        self.prev = net_worth
+
+        self.n = n = self.n + 1
+        delta = r - self.mean
+        self.mean = self.mean + delta / n
+        self.m2 = self.m2 + delta * (r - self.mean)
+
+        ratio = _ratio(self.mean, (self.m2 / n) ** 0.5)
+        reward = ratio - self.ratio
+        self.ratio = ratio
+        return reward
+
+
+class DifferentialSortino(Reward):
+    """
+    The change in the Sortino ratio of the episode's returns, mean / downside deviation, caused by the step. Sums
+    to the Sortino ratio of the episode. Only losses count towards the deviation
+
+        (1) r_t = net_worth_t / net_worth_{t-1} - 1
+        (2) downside_t = sqrt(SUM(min(r_i, 0) ^ 2) / t)
+        (3) sortino_t = mean_t / downside_t, 0 before the first loss
+
+    """
+    _state = ("prev", "n", "mean", "losses", "ratio")
+
+    def _initial(self, net_worth):
+        return {"prev": net_worth, "n": 0, "mean": 0, "losses": 0, "ratio": 0}
+
+    def __call__(self, net_worth):
+        r = net_worth / self.prev - 1
+        self.prev = net_worth
+
+        self.n = n = self.n + 1
+        self.mean = self.mean + (r - self.mean) / n
+        self.losses = self.losses + np.minimum(r, 0) ** 2
+
+        ratio = _ratio(self.mean, (self.losses / n) ** 0.5)
+        reward = ratio - self.ratio
+        self.ratio = ratio
+        return reward
+
+
+class DrawdownPenalty(Reward):
+    """
+    The log return of the step, minus a penalty on the drawdown of the net worth from its running peak
+
+        reward_t = log(net_worth_t / net_worth_{t-1}) - penalty * (1 - net_worth_t / peak_t)
+
+    """
+    _state = ("prev", "peak")
+    penalty: float
+
+    def __init__(self, penalty: float = 1.0):
+        self.penalty = penalty
+
+    def _initial(self, net_worth):
+        return {"prev": net_worth, "peak": net_worth}
+
+    def __call__(self, net_worth):
+        self.peak = np.maximum(self.peak, net_worth)
+        reward = np.log(net_worth / self.prev) - self.penalty * (1 - net_worth / self.peak)
+        self.prev = net_worth
+        return reward
+
+
+REWARDS = {
+    "change": NetWorthChange,
+    "log_return": LogReturn,
+    "sharpe": DifferentialSharpe,
+    "sortino": DifferentialSortino,
+    "drawdown": DrawdownPenalty,
+}
+
+
+def make_reward(reward: str|Reward) -> Reward:
+    """
+    Builds a reward from its name, one of [change, log_return, sharpe, sortino, drawdown], or returns a Reward
+    instance as is
+    """
+    if isinstance(reward, Reward):
+        return reward
+    assert reward in REWARDS, f"reward must be a Reward or one of {', '.join(REWARDS)}"
+    return REWARDS[reward]()
+
+
+def _ratio(a: float|np.ndarray, b: float|np.ndarray) -> float|np.ndarray:
+    """a / b, or 0 where b is 0. Works on floats and arrays alike"""
+    zero = b == 0
+    return a / (b + zero) * (1 - zero)
@@ -0,0 +1,196 @@
+# standard lib
+from typing import List, Tuple
+
+# local imports
+from swing_trader_env.env.single_stock import SingleStockEnv
+from swing_trader_env.core.utils import Date
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.data.resample import is_frequency
+
+# external import
+import numpy as np
+import pandas as pd
+
+
+class EpisodeSampler:
+    """
+    Samples (ticker, start date) episodes from a pool of preloaded DataModels, e.g. for random rollouts.
+
+    The valid start positions of every ticker are precomputed: a start must have warmup + lookback - 1 ticks of
+    history before it and horizon ticks after it. By default every valid (ticker, start) pair is equally likely; with
+    weights, tickers are drawn in proportion to them and starts uniformly within a ticker. Tickers are drawn with
+    the alias method and samples are generated in vectorized blocks, so each sample costs O(1).
+
+        sampler = EpisodeSampler([DataModel(t, ["daily"]) for t in tickers], lookback=32, horizon=250)
+        env = sampler.make_env(principal=10000)  # steps at the sampler's frequency, observing lookback ticks
+        for _ in range(n_episodes):
+            obs = sampler.reset(env)  # switches the env to a new episode in place
+    """
+
+    # public attributes
+    data: List[DataModel]  # the pool, in slot order
+    tickers: List[str]  # the tickers of the pool, in slot order
+    frequency: str  # the frequency episodes step at
+    lookback: int  # the ticks of history required before a start
+    warmup: np.ndarray  # (tickers,) the ticks of each ticker skipped before its history, e.g. while indicators warm up
+    horizon: int  # the ticks required after a start
+    lo: np.ndarray  # (tickers,) the first valid start position of each ticker
+    hi: np.ndarray  # (tickers,) one past the last valid start position of each ticker
+
+    # private attributes
+    _dates: List[np.ndarray]  # int64 nanosecond tick dates of each ticker
+    _prob: np.ndarray  # alias method acceptance probabilities
+    _alias: np.ndarray  # alias method alternatives
+    _rng: np.random.Generator
+    _block: int  # the number of samples generated at once
+    _slots: np.ndarray  # pending sampled slots
+    _positions: np.ndarray  # pending sampled start positions
+    _next: int  # the next pending sample
+
+
+    def __init__(
+            self,
+            data: List[DataModel],
+            frequency: str = "daily",
+            lookback: int = 1,
+            horizon: int = 1,
+            weights: List[float]|np.ndarray|None = None,
+            seed: int|None = None,
+            block: int = 4096,
+            warmup: int|List[int]|np.ndarray = 0,
+    ):
+        """
+        data: List[DataModel], the preloaded pool of tickers to sample from
+        frequency: str, the frequency episodes step at. One of [daily, weekly, monthly] or a custom spec like '3d', '2w'
+        lookback: int, the number of ticks an episode's first observation covers, including the start
+        horizon: int, the number of steps an episode must be able to take
+        weights: optional (tickers,) relative probability of each ticker. Defaults to its number of valid starts
+        seed: int, seed of the random generator
+        block: int, the number of samples generated per vectorized draw
+        warmup: int or (tickers,) ints, the ticks at the start of each ticker's data that no observation may cover,
+            e.g. IndicatorEnv.warmup
+        """
+        assert is_frequency(frequency), "frequency must be one of 'daily','weekly','monthly' or a spec like '3d', '2w'"
+        assert lookback > 0 and horizon >= 0, "lookback must be positive and horizon non-negative"
+
+        self.data = list(data)
+        self.tickers = [d.ticker for d in self.data]
+        self.frequency = frequency
+        self.lookback = lookback
+        self.horizon = horizon
+
+        ticks = [d.tick_prices(frequency) for d in self.data]
+        self._dates = [dates for dates, _, _ in ticks]
+        lengths = np.array([len(d) for d in self._dates], dtype=np.int64)
+        self.warmup = np.broadcast_to(np.asarray(warmup, dtype=np.int64), (len(self.data),)).copy()
+        # starts also need a daily bar, which leading weekly or monthly ticks may precede, see DataModel.tick_prices
+        priced = np.array([np.isnan(close).cumprod().sum() for _, _, close in ticks], dtype=np.int64)
+        self.lo = np.maximum(self.warmup + lookback - 1, priced)
+        self.hi = np.maximum(lengths - horizon, self.lo)
+
+        counts = (self.hi - self.lo).astype(np.float64)
+        if weights is None:
+            weights = counts
+        weights = np.where(counts > 0, np.asarray(weights, dtype=np.float64), 0.0)
+        if weights.sum() <= 0:
+            raise ValueError(f"No ticker has {lookback} ticks of history past its warm-up and {horizon} ticks ahead of any start")
+        self._prob, self._alias = _alias_table(weights)
+
+        self._rng = np.random.default_rng(seed)
+        self._block = block
+        self._next = block
+        self._slots = self._positions = None
+
+
+    def seed(self, seed: int|None) -> None:
+        """
+        Reseeds the random generator, discarding samples drawn ahead
+        """
+        self._rng = np.random.default_rng(seed)
+        self._next = self._block
+
+
+    def __len__(self) -> int:
+        """The number of valid (ticker, start) pairs"""
+        return int((self.hi - self.lo).sum())
+
+
+    def sample_positions(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draws n episodes at once
+
+        :returns Tuple[np.ndarray, np.ndarray], (n,) ticker slots and (n,) start positions in their tick dates
+        """
+        slots = self._rng.integers(len(self._prob), size=n)
+        slots = np.where(self._rng.random(n) < self._prob[slots], slots, self._alias[slots])
+        positions = self.lo[slots] + (self._rng.random(n) * (self.hi - self.lo)[slots]).astype(np.int64)
+        return slots, positions
+
+
+    def sample_slot(self) -> Tuple[int, int]:
+        """
+        Draws one episode as a (ticker slot, start position) pair
+        """
+        if self._next == self._block:
+            self._slots, self._positions = self.sample_positions(self._block)
+            self._next = 0
+        i = self._next
+        self._next += 1
+        return int(self._slots[i]), int(self._positions[i])
+
+
+    def date(self, slot: int, position: int) -> Date:
+        """
+        The tick date at a position of a ticker
+        """
+        return Date(pd.Timestamp(self._dates[slot][position]))
+
+
+    def sample(self) -> Tuple[str, Date]:
+        """
+        Draws one episode as a (ticker, start date) pair
+        """
+        slot, position = self.sample_slot()
+        return self.tickers[slot], self.date(slot, position)
+
+
+    def make_env(self, principal: float, **kwargs) -> SingleStockEnv:
+        """
+        Builds a SingleStockEnv on a newly sampled episode. kwargs are passed through to its constructor, with the
+        frequency and lookback defaulting to the sampler's
+        """
+        kwargs.setdefault("frequency", self.frequency)
+        kwargs.setdefault("lookback", self.lookback)
+        slot, position = self.sample_slot()
+        return SingleStockEnv(self.tickers[slot], self.date(slot, position), principal, data=self.data[slot], **kwargs)
+
+
+    def reset(self, env: SingleStockEnv) -> np.ndarray:
+        """
+        Switches an environment to a newly sampled episode in place, on the preloaded data. Returns its first
+        observation. Works on wrappers that pass set_data and set_start_date through, e.g. IndicatorEnv
+        """
+        assert env.frequency == self.frequency, f"env steps at {env.frequency} but episodes were sampled at {self.frequency}"
+        slot, position = self.sample_slot()
+        env.set_data(self.data[slot])
+        env.set_start_date(self.date(slot, position))
+        env.reset()
+        return env.observe()
+
+
+def _alias_table(weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vose's alias method: acceptance probabilities and alternatives for sampling in proportion to weights"""
+    n = len(weights)
+    scaled = weights * n / weights.sum()
+    prob = np.ones(n)
+    alias = np.arange(n)
+
+    small = [i for i in range(n) if scaled[i] < 1]
+    large = [i for i in range(n) if scaled[i] >= 1]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] -= 1 - scaled[s]
+        (small if scaled[l] < 1 else large).append(l)
+    return prob, alias
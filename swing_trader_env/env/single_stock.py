@@ -1,15 +1,39 @@
 # standard lib
-from typing import List
+from typing import Any, Dict, List
+from dataclasses import dataclass
 from datetime import datetime
+import copy
+import pickle
 
 # local imports
 from swing_trader_env.env.base import BaseEnv
+from swing_trader_env.env.rewards import Reward, make_reward
+from swing_trader_env.env.ledger import TradeLedger, ActionLog, BUY, SELL
 from swing_trader_env.types import BuyAction, SellAction, BuyEvent, SellEvent
-from swing_trader_env.core.utils import Date
+from swing_trader_env.core.utils import Date, instruments
 from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.data.resample import is_frequency
 
 # external import
 import pandas as pd
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SingleStockState:
+    """
+    The mutable state of a SingleStockEnv at one point of an episode. See SingleStockEnv.snapshot
+    """
+    cur_date: Date
+    cash: float
+    shares_held: float
+    net_worth: float
+    performance: float
+    cur_price: float
+    actions: tuple  # see ActionLog.state
+    ledger: tuple  # see TradeLedger.state
+    reward: float = 0.0
+    reward_state: Dict[str, Any]|None = None
 
 
 class SingleStockEnv(BaseEnv):
@@ -22,16 +46,21 @@ class SingleStockEnv(BaseEnv):
     cur_date: Date  # the current date of the simulation
     cur_price: float  # the most recent closing price of the stock
     start_date: Date  # the date that the simulation starts
-    frequency: str  # the frequency being traded [daily, weekly, monthly]
+    frequency: str  # the frequency being traded [daily, weekly, monthly] or a custom spec like '3d', '2w'
     cash: float  # the amount of cash
     shares_held: float  # the number of shares held. Allows fractional 
     net_worth: float  # your current net worth, including liquid funds and assets
+    performance: float  # net worth relative to the principal
     principal: float  # the starting value of the portfolio
+    observation: str  # what step returns, 'window' for a lookback array or 'frame' for the dataframe up to cur_date
+    lookback: int  # the number of ticks in a 'window' observation
+    reward: float  # the reward of the last step, 0 after a reset
+    reward_fn: Reward  # computes the reward of each step from the net worth
+    ledger: TradeLedger  # the filled orders and the equity at every tick of the episode
 
     # private attributes
     _data: DataModel  # the core data model modeling the stock
-    _actions: List[BuyAction|SellAction]  # buy and sell actions
-    _events: List[BuyEvent|SellEvent]  # buy and sell events
+    _actions: ActionLog  # buy and sell actions
 
 
     def __init__(
@@ -40,7 +69,11 @@ class SingleStockEnv(BaseEnv):
             start_date: str|datetime|Date,
             principal: float,
             frequency: str = "daily",
-            data_path: str|None = None
+            data_path: str|None = None,
+            data: DataModel|None = None,
+            observation: str = "window",
+            lookback: int = 32,
+            reward: str|Reward = "change",
     ):
         """
         Constructs a single-stock trading environment
@@ -48,20 +81,33 @@ class SingleStockEnv(BaseEnv):
         ticker: str, the ticker to trade
         start_date: Date, the date that the simulation starts
         principal: float, the starting cash amount
-        frequency: str, the trading frequency. One of [daily, weekly, monthly]
+        frequency: str, the trading frequency. One of [daily, weekly, monthly] or a custom spec like '3d', '2w'
+        data_path: str, optional root of the data directory the DataModel is loaded from
+        data: DataModel, optional already constructed data model for the ticker, e.g. one attached from shared memory
+        observation: str, what step returns. 'window' for a read-only (lookback, 5) OHLCV array of the latest ticks,
+            'frame' for the yfinance style dataframe up through the current date
+        lookback: int, the number of ticks in a 'window' observation
+        reward: str or Reward, the reward of a step, see swing_trader_env.env.rewards. One of [change, log_return,
+            sharpe, sortino, drawdown] or a Reward instance. Defaults to the change in net worth
         """
         # set identifying attributes
         self.set_ticker(ticker)
         self.set_start_date(start_date)
         self.set_principal(principal)
         self.set_frequency(frequency)
+        self.set_observation(observation, lookback)
+        self.set_reward(reward)
 
         # load data model
-        self._data = DataModel(
-            ticker=ticker,
-            freqs=[frequency],
-            data_path=data_path
-        )
+        if data is None:
+            data = DataModel(
+                ticker=ticker,
+                freqs=[frequency],
+                data_path=data_path
+            )
+        self._data = data
+        self.ledger = TradeLedger()
+        self._actions = ActionLog()
         # reset stateful attributes
         self.reset()
 
@@ -78,10 +124,27 @@ class SingleStockEnv(BaseEnv):
         """
         Sets the time frequency at which the environment steps
         """
-        assert frequency in {"daily", "weekly", "monthly"}, "frequency must be one of 'daily','weekly','monthly'"
+        assert is_frequency(frequency), "frequency must be one of 'daily','weekly','monthly' or a spec like '3d', '2w'"
         self.frequency = frequency
 
 
+    def set_observation(self, observation: str, lookback: int = 32) -> None:
+        """
+        Sets what step returns
+        """
+        assert observation in ("window", "frame"), "observation must be one of 'window', 'frame'"
+        assert lookback > 0, "lookback must be positive"
+        self.observation = observation
+        self.lookback = lookback
+
+
+    def set_reward(self, reward: str|Reward) -> None:
+        """
+        Sets the reward computed on every step. Takes effect on the next reset
+        """
+        self.reward_fn = make_reward(reward)
+
+
     def set_ticker(self, ticker: str) -> None:
         """
         Sets the stock that environment is stepping
@@ -90,6 +153,14 @@ class SingleStockEnv(BaseEnv):
         self.ticker = ticker
     
 
+    def set_data(self, data: DataModel) -> None:
+        """
+        Sets the data model of the stock being traded, along with its ticker. Takes effect on the next reset
+        """
+        self.set_ticker(data.ticker)
+        self._data = data
+
+
     def set_start_date(self, date: str|datetime|Date) -> None:
         """
         Set the start date of the simulation
@@ -107,17 +178,124 @@ class SingleStockEnv(BaseEnv):
         # reset public attributes
         self.cur_date = self.start_date
         self.cash = self.net_worth = self.principal
+        self.performance = 1.0
         self.cur_price = self._data.get_price_on_close(self.cur_date)
         self.shares_held = 0
+        self.reward = 0.0
+        self.reward_fn.reset(self.net_worth)
+        self.ledger.reset()
+        self.ledger.record_equity(self.cur_date.as_datetime.toordinal(), self.cash, self.shares_held, self.net_worth)
 
         # reset private attributes
-        self._events = []
-        self._actions = []
+        self._actions.reset()
     
 
-    def step(self, action: BuyAction|SellAction|None = None) -> pd.DataFrame:
+    def snapshot(self) -> SingleStockState:
+        """
+        Captures the mutable state of the episode: the current date, holdings, the action log and the ledger.
+        The data model and settings are not part of it, the running state of the reward is. Logged actions and
+        ledger rows are shared, not copied
+        """
+        return SingleStockState(
+            cur_date=self.cur_date,
+            cash=self.cash,
+            shares_held=self.shares_held,
+            net_worth=self.net_worth,
+            performance=self.performance,
+            cur_price=self.cur_price,
+            actions=self._actions.state(),
+            ledger=self.ledger.state(),
+            reward=self.reward,
+            reward_state=self.reward_fn.state(),
+        )
+
+
+    def restore(self, state: SingleStockState) -> None:
+        """
+        Returns the episode to a state captured by snapshot, e.g. to branch several rollouts from one point
+        """
+        self.cur_date = state.cur_date
+        self.cash = state.cash
+        self.shares_held = state.shares_held
+        self.net_worth = state.net_worth
+        self.performance = state.performance
+        self.cur_price = state.cur_price
+        self._actions.restore(state.actions)
+        self.ledger.restore(state.ledger)
+        self.reward = state.reward
+        if state.reward_state is not None:
+            self.reward_fn.restore(state.reward_state)
+
+
+    def clone(self) -> "SingleStockEnv":
+        """
+        An independent copy of the environment in its current state. The data model is shared, not copied
+        """
+        env = copy.copy(self)
+        env.reward_fn = copy.copy(self.reward_fn)
+        env.ledger = copy.copy(self.ledger)
+        env._actions = copy.copy(self._actions)
+        env.restore(self.snapshot())
+        return env
+
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the settings and state of the environment, without its data, e.g. to persist a live portfolio
+        between sessions. See from_bytes
+        """
+        settings = {
+            "ticker": self.ticker,
+            "start_date": self.start_date,
+            "principal": self.principal,
+            "frequency": self.frequency,
+            "observation": self.observation,
+            "lookback": self.lookback,
+            "reward": self.reward_fn,
+        }
+        return pickle.dumps((settings, self.snapshot()))
+
+
+    @classmethod
+    def from_bytes(cls, data: bytes, data_path: str|None = None, data_model: DataModel|None = None) -> "SingleStockEnv":
+        """
+        Rebuilds an environment serialized with to_bytes, loading its data model unless one is given
+
+        data: bytes, the output of to_bytes
+        data_path: str, optional root of the data directory the DataModel is loaded from
+        data_model: DataModel, optional already constructed data model for the ticker
+        """
+        settings, state = pickle.loads(data)
+        env = cls(**settings, data_path=data_path, data=data_model)
+        env.restore(state)
+        return env
+
+
+    @property
+    def done(self) -> bool:
+        """
+        Whether the current date is the last tick of the data, i.e. the episode cannot be stepped further
+        """
+        return self._data.tick_position(self.frequency, self.cur_date) >= len(getattr(self._data, self.frequency)) - 1
+
+
+    def observe(self) -> np.ndarray|pd.DataFrame:
+        """
+        The observation at the current date. In 'window' mode, a read-only (lookback, 5) array of Open, High, Low,
+        Close, Volume over the latest ticks, NaN-padded before the start of the data. It is a view into data shared
+        across steps, so its cost does not grow with the history.
+        In 'frame' mode, the dataframe up through the current date
+        """
+        if self.observation == "window":
+            return self._data.lookback(self.frequency, self.cur_date, self.lookback)
+
+        df_freq = getattr(self._data, self.frequency)
+        return df_freq.iloc[:self._data.tick_position(self.frequency, self.cur_date) + 1]
+
+
+    def step(self, action: BuyAction|SellAction|None = None) -> np.ndarray|pd.DataFrame:
         """
-        Steps the environment one tick forward. Returns a dataframe filtered by the most recent datapoint
+        Steps the environment one tick forward. Returns the observation at the new date, see observe
 
         Stepping runs through one day of trading, from pre-trading hours to open to close.
         only off-hours trading is allowed for now (day-trading support will come one day). Executes the following steps:
@@ -130,19 +308,28 @@ class SingleStockEnv(BaseEnv):
 
         action: Optional, BuyAction or SellAction denoting the ticker to sell and the number of shares
 
-        :returns pd.DataFrame, YFinance style dataframe up through the current date
+        :returns np.ndarray, (lookback, 5) OHLCV window, or pd.DataFrame, YFinance style dataframe up through the current date
         """
-        
+        # time each phase when instrumentation is enabled, see swing_trader_env.core.utils.instrument
+        phases = instruments.phases("SingleStockEnv.step") if instruments.enabled else None
+
         # record buy or sell action and annotate date
         if isinstance(action, (BuyAction, SellAction)):
             action.date_entered = self.cur_date.as_datetime
             self._actions.append(action)
+        if phases is not None:
+            phases.mark("record_order")
 
         # step the date forward
         self.cur_date = self._data.get_next_tick(self.frequency, self.cur_date)
+        if phases is not None:
+            phases.mark("next_tick")
         open_price = self._data.get_price_on_open(self.cur_date)
+        day = self.cur_date.as_datetime.toordinal()
+        if phases is not None:
+            phases.mark("open_price")
 
-        # Fill the orders at the open price of the current date, update holdings, and generate BuyEvent or Sellevent
+        # Fill the orders at the open price of the current date, update holdings, and record the fill in the ledger
         if isinstance(action, BuyAction):
 
             # verify sufficient funds
@@ -154,13 +341,8 @@ class SingleStockEnv(BaseEnv):
             # subtract from cash
             self.cash -= open_price * action.shares
 
-            # generate BuyEvent
-            self._events.append(BuyEvent(
-                ticker=self.ticker,
-                shares=action.shares,
-                price=open_price,
-                date=self.cur_date.as_datetime,
-            ))
+            # record the fill
+            self.ledger.record_trade(day, BUY, action.shares, open_price)
 
         elif isinstance(action, SellAction):
             
@@ -173,28 +355,37 @@ class SingleStockEnv(BaseEnv):
             # add to cash
             self.cash += open_price * action.shares
 
-            # generate SellEvent
-            self._events.append(SellEvent(
-                ticker=self.ticker,
-                shares=action.shares,
-                price=open_price,
-                date=self.cur_date.as_datetime,
-            ))        
+            # record the fill
+            self.ledger.record_trade(day, SELL, action.shares, open_price)
 
+        if phases is not None:
+            phases.mark("fill")
             
         # fast forward to end of day
         close_price = self._data.get_price_on_close(self.cur_date)
+        if phases is not None:
+            phases.mark("close_price")
 
         # compute current portfolio value and performance based off close price
         self.net_worth = self.shares_held * close_price + self.cash
         self.performance = self.net_worth / self.principal
         self.cur_price = close_price
+        self.reward = self.reward_fn(float(self.net_worth))
+        self.ledger.record_equity(day, self.cash, self.shares_held, self.net_worth)
+        if phases is not None:
+            phases.mark("value")
 
-        # filter data frame by cur date
-        df_freq = getattr(self._data, self.frequency)
-        df_freq = df_freq[df_freq <= self.cur_date.as_timestamp]
+        observation = self.observe()
+        if phases is not None:
+            phases.mark("observe")
+        return observation
 
-        return df_freq
+
+    def events(self) -> List[BuyEvent|SellEvent]:
+        """
+        The filled orders of the episode as BuyEvent and SellEvent objects, built from the ledger
+        """
+        return self.ledger.events(self.ticker)
 
 
     def render(self, mode: str = "plotly"):
@@ -212,10 +403,11 @@ class SingleStockEnv(BaseEnv):
 
             fig = viz_single_stock(
                 df=getattr(self._data, self.frequency),
-                actions=self._actions,
-                events=self._events,
+                actions=list(self._actions),
+                events=self.events(),
                 start_date=self.start_date.as_datetime,
                 end_date=self.cur_date.as_datetime,
+                equity=self.ledger.equity_frame(),
             )
 
             fig.show()
@@ -0,0 +1,298 @@
+# standard lib
+from typing import Any, Callable, List, Sequence, Tuple
+from multiprocessing import shared_memory, resource_tracker
+import multiprocessing as mp
+import os
+
+# local imports
+from swing_trader_env.env.base import BaseEnv
+from swing_trader_env.types import BuyAction, SellAction
+from swing_trader_env.core.data.shared import _open_shared_memory
+
+# external import
+import numpy as np
+
+
+# arrays of the shared block, besides the observations, as (name, dtype)
+_FIELDS = [("rewards", np.float64), ("dones", np.bool_), ("net_worth", np.float64), ("final_net_worth", np.float64)]
+
+
+class SubprocVectorEnv(BaseEnv):
+    """
+    Runs environments in worker processes, each owning a contiguous group of them, and collects observations,
+    rewards and done flags in arrays in shared memory rather than pickling them back through pipes. Only actions
+    and short acknowledgements cross the pipes.
+
+        fns = [functools.partial(SingleStockEnv, "AAPL", date, 10000) for date in start_dates]
+        with SubprocVectorEnv(fns, n_workers=8) as env:
+            obs = env.reset()
+            env.step_async(orders)
+            ...  # compute something else while the workers step
+            obs, rewards, dones = env.step_wait()
+
+    Environments must return fixed-shape numeric observations from step and observe, e.g. SingleStockEnv in its
+    default 'window' observation mode, and expose net_worth and done. The reward of a step is the environment's
+    reward, see SingleStockEnv's reward argument, or its change in net worth if it has none. An environment is reset automatically when
+    its episode ends: its entry in dones is set, its observation and net worth are those of the reset environment,
+    and the last observation and net worth of the finished episode are kept in final_observations and final_net_worth.
+
+    The arrays returned by reset and step_wait are views of the shared buffers, overwritten by the next step.
+    """
+
+    # public attributes
+    n: int  # the number of environments
+    observations: np.ndarray  # (N, *obs_shape) the latest observation of each environment
+    final_observations: np.ndarray  # (N, *obs_shape) the last observation of each environment's latest finished episode
+    rewards: np.ndarray  # (N,) the reward of each environment's last step
+    dones: np.ndarray  # (N,) whether each environment's episode ended on the last step
+    net_worth: np.ndarray  # (N,) the net worth of each environment after the last step
+    final_net_worth: np.ndarray  # (N,) the net worth at the end of each environment's latest finished episode
+
+    # private attributes
+    _conns: list  # parent ends of the workers' pipes
+    _processes: List[mp.Process]  # the workers
+    _bounds: List[Tuple[int, int]]  # the [lo, hi) range of environments owned by each worker
+    _shm: shared_memory.SharedMemory  # the block holding all shared arrays
+    _waiting: bool  # whether a step_async awaits its step_wait
+
+
+    def __init__(
+            self,
+            env_fns: Sequence[Callable[[], Any]],
+            n_workers: int|None = None,
+            context: str|None = None,
+    ):
+        """
+        Starts the workers and builds the environments in them
+
+        env_fns: Sequence[Callable], picklable functions each building one environment, e.g. functools.partial(SingleStockEnv, ...)
+        n_workers: int, the number of worker processes. Defaults to the number of cpus, at most one per environment
+        context: str, the multiprocessing start method, e.g. 'fork' or 'spawn'. Defaults to the platform default
+        """
+        self.n = len(env_fns)
+        n_workers = min(n_workers or os.cpu_count() or 1, self.n)
+        ctx = mp.get_context(context)
+
+        splits = np.array_split(np.arange(self.n), n_workers)
+        self._bounds = [(int(s[0]), int(s[-1]) + 1) for s in splits]
+        self._conns, self._processes = [], []
+        self._shm = None
+        self._waiting = False
+
+        # forked workers must share the parent's tracker, or each would start its own and report the block as leaked
+        resource_tracker.ensure_running()
+        for lo, hi in self._bounds:
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_worker, args=(child, list(env_fns[lo:hi]), lo), daemon=True)
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+        try:
+            # the workers report the observation shape, then attach to the block sized for it
+            shape, dtype = self._receive()[0]
+            layout = _layout(self.n, shape, dtype)
+            self._shm = shared_memory.SharedMemory(create=True, size=layout["size"])
+            for conn in self._conns:
+                conn.send(("attach", (self._shm.name, layout)))
+            self._receive()
+        except BaseException:
+            self.close()
+            raise
+
+        arrays = _views(self._shm, layout)
+        self.observations = arrays["observations"]
+        self.final_observations = arrays["final_observations"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+        self.net_worth = arrays["net_worth"]
+        self.final_net_worth = arrays["final_net_worth"]
+
+
+    def _receive(self) -> List[Any]:
+        """Waits for every worker's reply, raising the first error a worker reported"""
+        replies = [conn.recv() for conn in self._conns]
+        for status, payload in replies:
+            if status == "error":
+                raise payload
+        return [payload for _, payload in replies]
+
+
+    def reset(self) -> np.ndarray:
+        """
+        Resets every environment. Returns the (N, *obs_shape) observations
+        """
+        for conn in self._conns:
+            conn.send(("reset", None))
+        self._receive()
+        return self.observations
+
+
+    def step_async(self, actions: Sequence[Any]) -> None:
+        """
+        Sends one action per environment to the workers without waiting for them to step
+
+        actions: (N,) array of signed share orders for SingleStockEnv (positive buys, negative sells, zero holds),
+            or a sequence of whatever action objects the environments accept, None for no action
+        """
+        assert len(actions) == self.n, f"expected {self.n} actions, got {len(actions)}"
+        assert not self._waiting, "step_async called twice without step_wait"
+
+        for conn, (lo, hi) in zip(self._conns, self._bounds):
+            conn.send(("step", actions[lo:hi]))
+        self._waiting = True
+
+
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Waits for the workers to finish the step sent by step_async
+
+        :returns Tuple[np.ndarray, np.ndarray, np.ndarray], observations, rewards and dones
+        """
+        assert self._waiting, "step_wait called without step_async"
+        self._waiting = False
+        self._receive()
+        return self.observations, self.rewards, self.dones
+
+
+    def step(self, actions: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Steps every environment. See step_async and step_wait
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+
+    def close(self) -> None:
+        """
+        Stops the workers and releases the shared memory
+        """
+        for conn in self._conns:
+            try:
+                conn.send(("close", None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._conns, self._processes = [], []
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+    def __enter__(self) -> "SubprocVectorEnv":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _layout(n: int, shape: Tuple[int, ...], dtype: str) -> dict:
+    """Offsets of the shared arrays in one block: observations, final observations, then the _FIELDS"""
+    arrays, offset = [], 0
+    for name, array_shape, array_dtype in [
+        ("observations", (n, *shape), dtype),
+        ("final_observations", (n, *shape), dtype),
+        *[(name, (n,), np.dtype(field_dtype).str) for name, field_dtype in _FIELDS],
+    ]:
+        itemsize = np.dtype(array_dtype).itemsize
+        offset = -(-offset // itemsize) * itemsize
+        arrays.append((name, array_shape, array_dtype, offset))
+        offset += int(np.prod(array_shape)) * itemsize
+    return {"arrays": arrays, "size": max(offset, 1)}
+
+
+def _views(shm: shared_memory.SharedMemory, layout: dict) -> dict:
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        for name, shape, dtype, offset in layout["arrays"]
+    }
+
+
+def _to_action(ticker: str, action: Any) -> Any:
+    """Converts a signed share order to a BuyAction or SellAction. Other actions pass through"""
+    if isinstance(action, (int, float, np.number)):
+        if action > 0:
+            return BuyAction(ticker=ticker, shares=float(action))
+        if action < 0:
+            return SellAction(ticker=ticker, shares=-float(action))
+        return None
+    return action
+
+
+def _send_error(conn, error: Exception) -> None:
+    """Reports an error to the parent, falling back to its repr if it cannot be pickled"""
+    try:
+        conn.send(("error", error))
+    except Exception:
+        conn.send(("error", RuntimeError(repr(error))))
+
+
+def _worker(conn, env_fns: List[Callable[[], Any]], lo: int) -> None:
+    """Builds a group of environments, then serves commands from the parent until told to close"""
+    shm, arrays = None, None
+    try:
+        try:
+            envs = [fn() for fn in env_fns]
+            obs = np.asarray(envs[0].observe())
+            conn.send(("ok", (obs.shape, obs.dtype.str)))
+        except Exception as e:
+            _send_error(conn, e)
+            return
+
+        hi = lo + len(envs)
+        while True:
+            command, payload = conn.recv()
+            try:
+                if command == "attach":
+                    name, layout = payload
+                    shm = _open_shared_memory(name)
+                    arrays = {k: v[lo:hi] for k, v in _views(shm, layout).items()}
+                    for i, env in enumerate(envs):
+                        arrays["observations"][i] = env.observe()
+                        arrays["net_worth"][i] = env.net_worth
+
+                elif command == "reset":
+                    for i, env in enumerate(envs):
+                        env.reset()
+                        arrays["observations"][i] = env.observe()
+                        arrays["net_worth"][i] = env.net_worth
+                    arrays["rewards"][:] = 0
+                    arrays["dones"][:] = False
+
+                elif command == "step":
+                    for i, (env, action) in enumerate(zip(envs, payload)):
+                        before = env.net_worth
+                        obs = env.step(_to_action(env.ticker, action))
+                        reward = getattr(env, "reward", None)
+                        arrays["rewards"][i] = env.net_worth - before if reward is None else reward
+                        arrays["dones"][i] = done = env.done
+                        if done:
+                            arrays["final_observations"][i] = obs
+                            arrays["final_net_worth"][i] = env.net_worth
+                            env.reset()
+                            obs = env.observe()
+                        arrays["observations"][i] = obs
+                        arrays["net_worth"][i] = env.net_worth
+
+                elif command == "close":
+                    return
+
+                conn.send(("ok", None))
+            except Exception as e:
+                _send_error(conn, e)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        if shm is not None:
+            arrays = None  # views must be released before the mapping is closed
+            shm.close()
+        conn.close()
@@ -0,0 +1,240 @@
+# standard lib
+from typing import List
+from datetime import datetime
+
+# local imports
+from swing_trader_env.env.base import BaseEnv
+from swing_trader_env.env.rewards import Reward, make_reward
+from swing_trader_env.core.utils import Date
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.core.data.resample import is_frequency
+
+# external import
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+OHLCV = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class VectorSingleStockEnv(BaseEnv):
+    """
+    Steps N single stock episodes in lockstep. Each episode trades one ticker from its own start date, with the same
+    rules as SingleStockEnv: orders are entered after the close, filled at the next tick's open, and the portfolio
+    is valued at that tick's close. Buying beyond the available cash or selling more shares than held is invalid.
+
+    Episode state lives in arrays of length N, and the prices of every episode's ticker are concatenated into flat
+    arrays, so a step is a handful of vectorized operations regardless of N.
+
+        env = VectorSingleStockEnv(["AAPL", "MSFT"], ["2020-03-20", "2020-03-20"], principal=10000)
+        obs = env.step(np.array([10, 0]))  # buy 10 AAPL, hold MSFT
+    """
+
+    # public attributes
+    n: int  # the number of episodes
+    tickers: List[str]  # the ticker traded in each episode
+    start_dates: List[Date]  # the start date of each episode
+    frequency: str  # the frequency being traded [daily, weekly, monthly] or a custom spec like '3d', '2w'
+    principal: np.ndarray  # (N,) the starting value of each portfolio
+    cash: np.ndarray  # (N,) the amount of cash
+    shares_held: np.ndarray  # (N,) the number of shares held. Allows fractional
+    cur_price: np.ndarray  # (N,) the most recent closing price of each stock
+    net_worth: np.ndarray  # (N,) liquid funds and assets of each portfolio
+    performance: np.ndarray  # (N,) net worth relative to principal
+    rejected: np.ndarray  # (N,) whether each episode's last order was invalid and skipped
+    rewards: np.ndarray  # (N,) the reward of each episode's last step, 0 after a reset or once done
+    reward_fn: Reward  # computes the rewards of each step from the net worth, with running state per episode
+    lookback: int  # the number of ticks in an observation
+    invalid_orders: str  # 'raise' or 'skip'
+
+    # private attributes
+    _data: List[DataModel]  # the distinct data models the episodes trade
+    _dates: np.ndarray  # int64 nanosecond tick dates of every data model, concatenated
+    _open: np.ndarray  # the open price at each tick, concatenated like _dates
+    _close: np.ndarray  # the close price at each tick, concatenated like _dates
+    _windows: np.ndarray  # (ticks, lookback, 5) OHLCV windows over a NaN-padded concatenation of the frames
+    _base: np.ndarray  # (N,) offset of each episode's data model in the flat arrays
+    _window_base: np.ndarray  # (N,) offset of each episode's data model in _windows
+    _last: np.ndarray  # (N,) the last tick position of each episode's data model
+    _start: np.ndarray  # (N,) the tick position each episode starts from
+    _pos: np.ndarray  # (N,) the current tick position of each episode
+
+
+    def __init__(
+            self,
+            data: List[str|DataModel],
+            start_dates: List[str|datetime|Date],
+            principal: float|np.ndarray,
+            frequency: str = "daily",
+            data_path: str|None = None,
+            lookback: int = 32,
+            invalid_orders: str = "raise",
+            reward: str|Reward = "change",
+    ):
+        """
+        Constructs N single stock episodes
+
+        data: List[str|DataModel], the ticker or already constructed data model of each episode. Episodes may share a model
+        start_dates: List[Date], the start date of each episode. Must be a tick of the frequency
+        principal: float or (N,) array, the starting cash amount
+        frequency: str, the trading frequency. One of [daily, weekly, monthly] or a custom spec like '3d', '2w'
+        data_path: str, optional root of the data directory the DataModels of tickers are loaded from
+        lookback: int, the number of ticks in an observation
+        invalid_orders: str, 'raise' an AssertionError on an invalid order as SingleStockEnv does, or 'skip' invalid
+            orders, leaving those episodes' holdings unchanged and flagging them in rejected
+        reward: str or Reward, the reward of a step, see swing_trader_env.env.rewards. One of [change, log_return,
+            sharpe, sortino, drawdown] or a Reward instance. Defaults to the change in net worth
+        """
+        assert len(data) == len(start_dates), "data and start_dates must have the same length"
+        assert is_frequency(frequency), "frequency must be one of 'daily','weekly','monthly' or a spec like '3d', '2w'"
+        assert invalid_orders in ("raise", "skip"), "invalid_orders must be one of 'raise', 'skip'"
+        assert lookback > 0, "lookback must be positive"
+
+        self.n = len(data)
+        self.frequency = frequency
+        self.lookback = lookback
+        self.invalid_orders = invalid_orders
+        self.reward_fn = make_reward(reward)
+        self.start_dates = [Date(d) for d in start_dates]
+
+        # one data model per distinct ticker or model
+        models = {}
+        for d in data:
+            key = d if isinstance(d, str) else id(d)
+            if key not in models:
+                models[key] = d if isinstance(d, DataModel) else DataModel(ticker=d, freqs=[frequency], data_path=data_path)
+        self._data = list(models.values())
+        slots = {key: i for i, key in enumerate(models)}
+        slot = np.array([slots[d if isinstance(d, str) else id(d)] for d in data], dtype=np.int64)
+        self.tickers = [self._data[i].ticker for i in slot]
+
+        self._build(slot)
+
+        self.principal = np.broadcast_to(np.asarray(principal, dtype=np.float64), (self.n,)).copy()
+        assert (self.principal > 0).all(), "principal must be positive"
+
+        self.reset()
+
+
+    def _build(self, slot: np.ndarray) -> None:
+        """Concatenates the tick dates, prices and padded OHLCV frames of every data model"""
+        dates, opens, closes, frames = [], [], [], []
+        pad = np.full((self.lookback - 1, len(OHLCV)), np.nan)
+        for data in self._data:
+            d, o, c = data.tick_prices(self.frequency)
+            dates.append(d)
+            opens.append(o)
+            closes.append(c)
+            frames += [pad, getattr(data, self.frequency)[OHLCV].to_numpy(dtype=np.float64)]
+
+        lengths = np.array([len(d) for d in dates], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+        self._dates = np.concatenate(dates)
+        self._open = np.concatenate(opens)
+        self._close = np.concatenate(closes)
+        self._windows = sliding_window_view(np.concatenate(frames), self.lookback, axis=0).transpose(0, 2, 1)
+
+        self._base = offsets[slot]
+        self._window_base = (offsets + np.arange(len(lengths)) * (self.lookback - 1))[slot]
+        self._last = lengths[slot] - 1
+
+        # start positions must be ticks, as in SingleStockEnv
+        starts = np.array([Date(d).as_timestamp.value for d in self.start_dates], dtype=np.int64)
+        self._start = np.empty(self.n, dtype=np.int64)
+        for i in range(self.n):
+            ticks = self._dates[self._base[i]:self._base[i] + self._last[i] + 1]
+            pos = int(ticks.searchsorted(starts[i]))
+            if pos > self._last[i] or ticks[pos] != starts[i]:
+                raise ValueError(f"{self.start_dates[i]} is not a {self.frequency} tick")
+            if np.isnan(self._close[self._base[i] + pos]):
+                raise ValueError(f"{self.start_dates[i]} precedes the first daily bar of {self.tickers[i]}")
+            self._start[i] = pos
+
+
+    @property
+    def done(self) -> np.ndarray:
+        """(N,) whether each episode has reached the last tick of its data"""
+        return self._pos >= self._last
+
+
+    @property
+    def cur_dates(self) -> np.ndarray:
+        """(N,) the current date of each episode, as datetime64[ns]"""
+        return self._dates[self._base + self._pos].view("datetime64[ns]")
+
+
+    def reset(self, indices: np.ndarray|None = None) -> np.ndarray:
+        """
+        Reset all episodes, or only the given ones, to their start dates. Returns the observations of all episodes
+        """
+        full = indices is None
+        if full:
+            indices = slice(None)
+            self.cash = np.empty(self.n)
+            self.shares_held = np.zeros(self.n)
+            self.net_worth = np.empty(self.n)
+            self.performance = np.ones(self.n)
+            self.cur_price = np.empty(self.n)
+            self.rejected = np.zeros(self.n, dtype=bool)
+            self.rewards = np.zeros(self.n)
+            self._pos = np.empty(self.n, dtype=np.int64)
+
+        self._pos[indices] = self._start[indices]
+        self.cash[indices] = self.net_worth[indices] = self.principal[indices]
+        self.shares_held[indices] = 0
+        self.performance[indices] = 1
+        self.cur_price[indices] = self._close[self._base[indices] + self._pos[indices]]
+        self.rejected[indices] = False
+        self.rewards[indices] = 0
+        self.reward_fn.reset(self.net_worth, None if full else indices)
+        return self.observe()
+
+
+    def observe(self) -> np.ndarray:
+        """(N, lookback, 5) Open, High, Low, Close, Volume over the latest ticks of each episode, NaN-padded"""
+        return self._windows[self._window_base + self._pos]
+
+
+    def step(self, orders: np.ndarray|None = None) -> np.ndarray:
+        """
+        Steps every episode one tick forward. Episodes that are done do not move, and their orders are ignored
+
+        orders: (N,) array of signed share orders. Positive buys, negative sells, zero holds
+
+        :returns np.ndarray, (N, lookback, 5) observations
+        """
+        active = ~self.done
+        if orders is None:
+            orders = np.zeros(self.n)
+        orders = np.where(active, np.asarray(orders, dtype=np.float64), 0.0)
+
+        self._pos += active
+        i = self._base + self._pos
+        open_price, close_price = self._open[i], self._close[i]
+
+        # verify sufficient funds for buys and sufficient shares for sells - no short selling
+        buys, sells = orders > 0, orders < 0
+        insufficient_funds = buys & (self.cash < open_price * orders)
+        insufficient_shares = sells & (self.shares_held < -orders)
+        invalid = insufficient_funds | insufficient_shares
+
+        if self.invalid_orders == "raise" and invalid.any():
+            self._pos -= active
+            k = int(np.argmax(invalid))
+            if insufficient_funds[k]:
+                raise AssertionError(f"Unable to place buy order in episode {k} - insufficient funds")
+            raise AssertionError(f"Unable to place sell order in episode {k} - insufficient shares held. Short selling is not permitted")
+
+        orders[invalid] = 0
+        self.rejected = invalid
+
+        # fill at the open, value at the close
+        self.shares_held += orders
+        self.cash -= open_price * orders
+        self.net_worth = self.shares_held * close_price + self.cash
+        self.performance = self.net_worth / self.principal
+        self.cur_price = close_price
+        self.rewards = self.reward_fn.masked(self.net_worth, active)
+
+        return self.observe()
@@ -9,7 +9,7 @@ from datetime import datetime
 
 ### Action Space
 
-@ dataclass
+@dataclass(slots=True)
 class Action:
     """Action base class - functions as a market order"""
 
@@ -22,17 +22,17 @@ class Action:
     """Optional - date the order was entered. May be set externally"""
     date_entered: datetime|None = None
 
-@dataclass
+@dataclass(slots=True)
 class BuyAction(Action):
     """Buy Action. Analogous to submitting a market buy order"""
 
 
-@dataclass
+@dataclass(slots=True)
 class SellAction(Action):
     """Sell Action. Analogous to submitting a market sell order"""
 
 
-@dataclass
+@dataclass(slots=True)
 class MultiAction:
     """
     A container class for multiple Buy or Sell actions
@@ -49,7 +49,7 @@ class MultiAction:
 
 
 ### Events
-@dataclass
+@dataclass(slots=True)
 class OrderFilledEvent:
     """
     Base class representing the event of an order being filled
@@ -63,12 +63,12 @@ class OrderFilledEvent:
     def value(self) -> float:
         return self.price * self.shares
 
-@dataclass
+@dataclass(slots=True)
 class SellEvent(OrderFilledEvent):
     """Sell event. Equivalent to filling a sell order"""
 
 
-@dataclass
+@dataclass(slots=True)
 class BuyEvent(OrderFilledEvent):
     """Buy event. Equivalent to filling a buy order"""
     
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""
+Weekly and monthly bars added by append_bars follow the labels of the frame they extend: csv bars fall on the Monday
+or the 1st, trading day or not, while bars resampled from daily fall on their first trading day
+"""
+# external
+import numpy as np
+import pandas as pd
+
+# local
+from swing_trader_env.core.data import DataModel
+
+
+def _frame(index: pd.DatetimeIndex) -> pd.DataFrame:
+    close = np.linspace(50, 60, len(index))
+    df = pd.DataFrame({
+        "Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": np.full(len(index), 1000),
+    }, index=pd.DatetimeIndex(index, name="Date"))
+    df["Date"] = df.index
+    return df
+
+
+def _bars() -> pd.DataFrame:
+    """Daily bars from 2021-01-04 that skip the holiday Mondays 2021-01-18 and 2021-02-01, and Friday 2021-01-01"""
+    index = pd.bdate_range("2021-01-04", "2021-02-12").drop(pd.DatetimeIndex(["2021-01-18", "2021-02-01"]))
+    return _frame(index)[["Open", "High", "Low", "Close", "Volume"]]
+
+
+def test_csv_frames_keep_calendar_labels():
+    data = DataModel.from_frames("CAL", {
+        "daily": _frame(pd.bdate_range("2020-01-01", "2020-12-31")),
+        "weekly": _frame(pd.date_range("2019-12-30", "2020-12-28", freq="W-MON")),
+        "monthly": _frame(pd.date_range("2020-01-01", "2020-12-01", freq="MS")),
+    })
+    data.append_bars(_bars(), persist=False)
+
+    weekly = pd.date_range("2020-12-28", "2021-02-08", freq="W-MON")
+    np.testing.assert_array_equal(data.weekly.index[-len(weekly):], weekly)
+    monthly = pd.DatetimeIndex(["2020-12-01", "2021-01-01", "2021-02-01"])
+    np.testing.assert_array_equal(data.monthly.index[-3:], monthly)
+    assert data.get_next_tick("weekly", "2021-01-11").as_timestamp == pd.Timestamp("2021-01-18")
+
+
+def test_derived_frames_keep_first_trading_day_labels():
+    data = DataModel.from_frames("RES", {"daily": _frame(pd.bdate_range("2020-01-01", "2020-12-31"))})
+    assert data.weekly.index[-1] == pd.Timestamp("2020-12-28")
+    data.append_bars(_bars(), persist=False)
+
+    weekly = pd.DatetimeIndex(["2020-12-28", "2021-01-04", "2021-01-11", "2021-01-19", "2021-01-25", "2021-02-02", "2021-02-08"])
+    np.testing.assert_array_equal(data.weekly.index[-len(weekly):], weekly)
+    monthly = pd.DatetimeIndex(["2020-12-01", "2021-01-04", "2021-02-02"])
+    np.testing.assert_array_equal(data.monthly.index[-3:], monthly)
@@ -0,0 +1,41 @@
+"""
+Appending volumes beyond uint32 to a compact model grows its volume_scale, as compacting them on a reload does
+"""
+# external
+import numpy as np
+import pandas as pd
+
+# local
+from swing_trader_env.core.data import DataModel
+
+
+def _write_csv(path, index: pd.DatetimeIndex, rng: np.random.Generator) -> None:
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    pd.DataFrame({
+        "Date": index.strftime("%Y-%m-%d 00:00:00-05:00"),
+        "Open": close * 0.999,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 100_000_000, len(index)),
+    }).to_csv(path, index=False)
+
+
+def test_append_beyond_uint32_matches_reload(tmp_path):
+    (tmp_path / "daily").mkdir()
+    _write_csv(tmp_path / "daily" / "BIG-daily.csv", pd.bdate_range("2020-01-01", "2020-12-31"), np.random.default_rng(0))
+
+    data = DataModel("BIG", ["daily"], data_path=str(tmp_path), cache=True, compact=True)
+    assert data.daily.attrs["volume_scale"] == 1
+
+    index = pd.bdate_range("2021-01-04", periods=3, name="Date")
+    bars = pd.DataFrame({"Open": 60.0, "High": 61.0, "Low": 59.0, "Close": 60.5, "Volume": [5e9, 6e9, 7e9]}, index=index)
+    assert data.append_bars(bars) == 3
+    assert data.daily.attrs["volume_scale"] == 10
+    assert data.daily["Volume"].dtype == np.uint32
+
+    reloaded = DataModel("BIG", ["daily"], data_path=str(tmp_path), cache=True, compact=True)
+    assert reloaded.daily.attrs["volume_scale"] == 10
+    np.testing.assert_array_equal(reloaded.daily.index, data.daily.index)
+    np.testing.assert_array_equal(reloaded.daily["Volume"], data.daily["Volume"])
+    np.testing.assert_array_equal(data.daily["Volume"].to_numpy()[-3:].astype(np.int64) * 10, [5e9, 6e9, 7e9])
@@ -0,0 +1,34 @@
+"""
+EpisodeSampler builds and resets envs at the frequency and lookback it sampled starts for
+"""
+# external
+import numpy as np
+import pandas as pd
+import pytest
+
+# local
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.env import EpisodeSampler
+
+
+@pytest.fixture
+def data() -> DataModel:
+    index = pd.bdate_range("2015-01-01", "2020-12-31", name="Date")
+    close = np.linspace(50, 100, len(index))
+    df = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000}, index=index)
+    df["Date"] = df.index
+    return DataModel.from_frames("SMP", {"daily": df})
+
+
+def test_make_env_defaults_to_the_sampler_settings(data):
+    sampler = EpisodeSampler([data], frequency="weekly", lookback=8, horizon=4, seed=0)
+    env = sampler.make_env(10000)
+    assert env.frequency == "weekly" and env.lookback == 8
+    assert sampler.reset(env).shape[0] == 8
+
+
+def test_reset_rejects_an_env_at_another_frequency(data):
+    sampler = EpisodeSampler([data], frequency="weekly", lookback=8, horizon=4, seed=0)
+    env = sampler.make_env(10000, frequency="daily")
+    with pytest.raises(AssertionError):
+        sampler.reset(env)
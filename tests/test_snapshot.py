@@ -0,0 +1,50 @@
+"""
+Snapshots share the action log and ledger of an episode, so branches rolled back to one do not see each other's steps
+"""
+# external
+import numpy as np
+import pandas as pd
+import pytest
+
+# local
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.env import SingleStockEnv
+from swing_trader_env.types import BuyAction, SellAction
+
+
+@pytest.fixture
+def env() -> SingleStockEnv:
+    index = pd.bdate_range("2020-01-01", "2020-12-31", name="Date")
+    close = np.linspace(50, 100, len(index))
+    df = pd.DataFrame({"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000}, index=index)
+    df["Date"] = df.index
+    return SingleStockEnv("SNP", "2020-01-02", 10000, data=DataModel.from_frames("SNP", {"daily": df}))
+
+
+def test_branches_from_a_snapshot_keep_their_own_actions(env):
+    env.step(BuyAction("SNP", 10))
+    state = env.snapshot()
+
+    env.step(SellAction("SNP", 5))
+    assert [type(a) for a in env._actions] == [BuyAction, SellAction]
+
+    env.restore(state)
+    env.step(BuyAction("SNP", 3))
+    assert [a.shares for a in env._actions] == [10, 3]
+    assert env.ledger.trades_frame()["shares"].tolist() == [10, 3]
+
+    env.restore(state)
+    assert [a.shares for a in env._actions] == [10]
+
+
+def test_clones_append_independently(env):
+    env.step(BuyAction("SNP", 10))
+    clone = env.clone()
+
+    env.step(SellAction("SNP", 4))
+    clone.step(SellAction("SNP", 6))
+    assert [a.shares for a in env._actions] == [10, 4]
+    assert [a.shares for a in clone._actions] == [10, 6]
+
+    env.reset()
+    assert len(env._actions) == 0 and len(clone._actions) == 2
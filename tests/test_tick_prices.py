@@ -0,0 +1,68 @@
+"""
+Weekly and monthly csv bars are labeled on the Monday and the 1st, so a ticker listed mid-month has a leading monthly
+tick without a daily bar on or before it
+"""
+# external
+import numpy as np
+import pandas as pd
+import pytest
+
+# local
+from swing_trader_env.core.data import DataModel
+from swing_trader_env.env import VectorSingleStockEnv, EpisodeSampler, backtest
+
+
+def _frame(index: pd.DatetimeIndex, rng: np.random.Generator) -> pd.DataFrame:
+    close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    df = pd.DataFrame({
+        "Open": close * 0.999,
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000, 10_000, len(index)),
+    }, index=pd.DatetimeIndex(index, name="Date"))
+    df["Date"] = df.index
+    return df
+
+
+@pytest.fixture
+def mid_month_listing() -> DataModel:
+    """Daily bars from Wednesday 2013-07-03, monthly bars labeled on the 1st from 2013-07-01"""
+    rng = np.random.default_rng(0)
+    daily = _frame(pd.bdate_range("2013-07-03", "2021-12-31"), rng)
+    monthly = _frame(pd.date_range("2013-07-01", "2021-12-01", freq="MS"), rng)
+    return DataModel.from_frames("MID", {"daily": daily, "monthly": monthly})
+
+
+def test_leading_tick_has_no_prices(mid_month_listing):
+    dates, open_prices, close_prices = mid_month_listing.tick_prices("monthly")
+    assert dates[0] == pd.Timestamp("2013-07-01").value
+    assert np.isnan(open_prices[0]) and np.isnan(close_prices[0])
+    assert not np.isnan(close_prices[1:]).any()
+
+
+def test_backtest_starts_after_the_listing(mid_month_listing):
+    result = backtest(mid_month_listing, np.zeros(12), freq="monthly", start="2020-03-01")
+    assert (result.net_worth == 10000).all()
+
+    result = backtest(mid_month_listing, np.zeros(12), freq="monthly")
+    assert result.dates[0] == np.datetime64("2013-08-01")
+
+    with pytest.raises(ValueError):
+        backtest(mid_month_listing, np.zeros(12), freq="monthly", start="2013-07-01")
+
+
+def test_vector_env_starts_after_the_listing(mid_month_listing):
+    env = VectorSingleStockEnv([mid_month_listing], ["2020-03-01"], 10000, frequency="monthly")
+    env.step(np.array([1.0]))
+    assert not np.isnan(env.net_worth).any()
+
+    with pytest.raises(ValueError):
+        VectorSingleStockEnv([mid_month_listing], ["2013-07-01"], 10000, frequency="monthly")
+
+
+def test_sampler_skips_the_leading_tick(mid_month_listing):
+    sampler = EpisodeSampler([mid_month_listing], frequency="monthly", lookback=1, horizon=6)
+    assert sampler.lo[0] == 1
+    _, positions = sampler.sample_positions(1000)
+    assert positions.min() >= 1